@@ -0,0 +1,205 @@
+"""
+框架开销基准：在本地替身应用上测量驱动启动、页面打开、元素查找、输入、登录流程（界面登录与会话注入）、截图以及配置/数据加载的耗时
+结果保存为JSON，可与之前的结果对比，中位数变慢超过阈值时返回非零退出码
+
+用法:
+    python -m benchmarks.framework --rounds 20
+    python -m benchmarks.framework --compare reports/benchmarks/baseline.json --tolerance 0.2
+    python -m benchmarks.framework --no-browser   # 只测不需要浏览器的项目
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from src.common.config import CONFIG_PATH, PROJECT_ROOT
+from src.stub_app.server import DEFAULT_USERS, StubAppServer
+
+# 默认结果目录
+RESULT_DIR = os.path.join(PROJECT_ROOT, 'reports', 'benchmarks')
+
+def timed(func, rounds, repeat=1, setup=None):
+    """执行 rounds 轮，每轮调用 func repeat 次，返回每次调用的平均耗时(毫秒)列表"""
+    samples = []
+    for _ in range(rounds):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        samples.append((time.perf_counter() - start) * 1000 / repeat)
+    return samples
+
+def bench_config(rounds):
+    from src.common.config import Config, _parse_config_file
+    mtime = os.path.getmtime(CONFIG_PATH)
+    config = Config()
+    return {
+        'config_parse': timed(lambda: _parse_config_file(CONFIG_PATH, mtime), rounds),
+        'config_lookup': timed(config.get_timeout, rounds, repeat=1000),
+    }
+
+def bench_test_data(rounds, records=1000):
+    from src.common.test_data import TestData
+    data_dir = tempfile.mkdtemp(prefix='webauto-bench-')
+    with open(os.path.join(data_dir, 'cases.json'), 'w', encoding='utf-8') as f:
+        json.dump([{'case_id': f"case_{i:05d}", 'username': f"user{i}", 'password': 'secret'}
+                   for i in range(records)], f)
+    data = TestData()
+    data.data_dir = data_dir
+    data._ensure_initialized()
+    data.disk_cache_dir = None
+    last_case = f"case_{records - 1:05d}"
+    return {
+        'data_load_cold': timed(lambda: data.get_test_case_data('cases.json', last_case), rounds,
+                                setup=data.clear_cache),
+        'data_lookup_warm': timed(lambda: data.get_test_case_data('cases.json', last_case), rounds, repeat=100),
+    }
+
+def bench_browser(rounds, startup_rounds, server_url):
+    from src.common.config import Config
+    from src.common.driver_pool import create_driver
+    from src.common.screenshot import ScreenshotWriter
+    from src.common.session_cache import SessionCache, origin_of
+    from src.page_objects.home_page import HomePage
+    from src.page_objects.login_page import LoginPage
+    
+    config = Config()
+    results = {'driver_startup': []}
+    for _ in range(startup_rounds):
+        start = time.perf_counter()
+        driver = create_driver(config)
+        results['driver_startup'].append((time.perf_counter() - start) * 1000)
+        driver.quit()
+    
+    username, (password, _) = next(iter(DEFAULT_USERS.items()))
+    driver = create_driver(config)
+    try:
+        login_page = LoginPage(driver)
+        results['open_page'] = timed(login_page.open, rounds)
+        results['find_element'] = timed(lambda: login_page.find_element(LoginPage.USERNAME_INPUT), rounds,
+                                        setup=login_page.invalidate_cache)
+        results['find_element_cached'] = timed(lambda: login_page.find_element(LoginPage.USERNAME_INPUT), rounds)
+        results['send_keys'] = timed(lambda: login_page.send_keys(LoginPage.USERNAME_INPUT, username), rounds)
+        results['fill_form'] = timed(lambda: login_page.fill_form({
+            LoginPage.USERNAME_INPUT: username,
+            LoginPage.PASSWORD_INPUT: password,
+        }), rounds)
+        
+        def login():
+            login_page.login(username, password)
+            if not HomePage(driver).is_user_menu_displayed():
+                raise RuntimeError("登录后未显示用户菜单，替身应用或页面对象异常")
+        results['login'] = timed(login, rounds, setup=driver.delete_all_cookies)
+        
+        # 缓存的登录会话注入后打开首页，与界面登录对比
+        sessions = SessionCache(config)
+        sessions.ttl = 0
+        origin = origin_of(server_url)
+        sessions.capture(driver, username, origin)
+        results['login_restored'] = timed(
+            lambda: sessions.ensure_logged_in(driver, origin, username, lambda d: login(),
+                                              lambda d: HomePage(d).is_logged_in()),
+            rounds, setup=driver.delete_all_cookies
+        )
+        
+        writer = ScreenshotWriter(tempfile.mkdtemp(prefix='webauto-bench-'), config)
+        writer.dedup = False
+        try:
+            results['screenshot_capture'] = timed(lambda: writer.capture(driver, 'bench'), rounds)
+            results['screenshot_saved'] = timed(lambda: writer.capture(driver, 'bench').result(), rounds)
+        finally:
+            writer.shutdown()
+    finally:
+        driver.quit()
+    return results
+
+def summarize_results(raw):
+    from src.common.perf import percentile
+    results = {}
+    for name, samples in raw.items():
+        values = sorted(samples)
+        results[name] = {
+            'samples': len(values),
+            'median_ms': round(statistics.median(values), 4),
+            'p95_ms': round(percentile(values, 95), 4),
+            'min_ms': round(values[0], 4),
+        }
+    return results
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """对比中位数，返回变慢超过阈值的项目 [(名称, 基线, 本次)]"""
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            continue
+        delta = stats['median_ms'] - base['median_ms']
+        if delta > min_delta_ms and delta > base['median_ms'] * tolerance:
+            regressions.append((name, base['median_ms'], stats['median_ms']))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="框架开销基准")
+    parser.add_argument("--rounds", type=int, default=20, help="每个项目的执行轮数")
+    parser.add_argument("--startup-rounds", type=int, default=3, help="驱动启动的执行轮数")
+    parser.add_argument("--no-browser", action="store_true", help="跳过需要浏览器的项目")
+    parser.add_argument("--output", help="结果JSON路径，默认保存到 reports/benchmarks 下")
+    parser.add_argument("--compare", help="作为基线对比的结果JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="中位数允许变慢的比例")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="小于该值的变化视为噪声(毫秒)")
+    args = parser.parse_args(argv)
+    
+    # 页面对象通过配置读取基础URL，需要在第一次读取配置前指向替身应用
+    server = StubAppServer().start()
+    os.environ['WEBAUTO_TEST_BASE_URL'] = server.url
+    try:
+        raw = {}
+        raw.update(bench_config(args.rounds))
+        raw.update(bench_test_data(args.rounds))
+        if not args.no_browser:
+            raw.update(bench_browser(args.rounds, args.startup_rounds, server.url))
+    finally:
+        server.stop()
+    
+    from src.common.config import Config
+    config = Config()
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'browser': None if args.no_browser else config.get_browser_type(),
+        'headless': config.is_headless(),
+        'page_load_strategy': config.get_page_load_strategy(),
+        'blocked_urls': config.get_blocked_urls(),
+        'results': summarize_results(raw),
+    }
+    
+    output = args.output or os.path.join(RESULT_DIR, f"framework_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    
+    print(f"{'项目':<22}{'中位数(ms)':>12}{'p95(ms)':>12}{'最小(ms)':>12}")
+    for name, stats in report['results'].items():
+        print(f"{name:<22}{stats['median_ms']:>12.4f}{stats['p95_ms']:>12.4f}{stats['min_ms']:>12.4f}")
+    print(f"结果已保存: {output}")
+    
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report['results'], baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"错误: 以下项目比基线 {args.compare} 变慢超过 {args.tolerance:.0%}:")
+            for name, before, after in regressions:
+                print(f"  {name:<22} {before:.3f} ms -> {after:.3f} ms")
+            return 1
+        print(f"与基线 {args.compare} 相比没有性能回退")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
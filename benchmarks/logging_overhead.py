@@ -0,0 +1,93 @@
+"""
+日志开销基准：对比同步handler与队列异步handler下，每条 WebDriver 命令日志在业务线程中的耗时
+
+用法: python -m benchmarks.logging_overhead --count 20000
+"""
+import argparse
+import logging
+import os
+import queue
+import sys
+import tempfile
+import time
+from logging.handlers import QueueListener
+from src.common.logger import DailySizeRotatingFileHandler, LocalQueueHandler
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
+LOCATOR = ('id', 'username')
+
+def _build_handlers(log_dir, console_stream):
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = DailySizeRotatingFileHandler(log_dir, max_bytes=10 * 1024 * 1024, backup_count=5)
+    console_handler = logging.StreamHandler(console_stream)
+    for handler in (file_handler, console_handler):
+        handler.setFormatter(formatter)
+    return [file_handler, console_handler]
+
+def _run(logger, count, lazy):
+    """模拟 BasePage.find_element 的日志调用，返回业务线程中每条日志的平均耗时(微秒)"""
+    start = time.perf_counter()
+    for _ in range(count):
+        if lazy:
+            logger.info("找到元素: %s", LOCATOR)
+        else:
+            logger.info(f"找到元素: {LOCATOR}")
+    return (time.perf_counter() - start) / count * 1e6
+
+def measure(count, console_stream):
+    results = {}
+    with tempfile.TemporaryDirectory() as log_dir:
+        # 同步模式：与改造前相同，业务线程直接写文件和控制台
+        sync_logger = logging.getLogger('benchmark.sync')
+        sync_logger.propagate = False
+        sync_logger.setLevel(logging.INFO)
+        handlers = _build_handlers(log_dir, console_stream)
+        for handler in handlers:
+            sync_logger.addHandler(handler)
+        results['同步 + f-string'] = _run(sync_logger, count, lazy=False)
+        results['同步 + %-style'] = _run(sync_logger, count, lazy=True)
+        for handler in handlers:
+            sync_logger.removeHandler(handler)
+            handler.close()
+        
+        # 异步模式：业务线程只入队，后台线程输出
+        async_logger = logging.getLogger('benchmark.async')
+        async_logger.propagate = False
+        async_logger.setLevel(logging.INFO)
+        log_queue = queue.SimpleQueue()
+        async_logger.addHandler(LocalQueueHandler(log_queue))
+        handlers = _build_handlers(log_dir, console_stream)
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        results['异步 + %-style'] = _run(async_logger, count, lazy=True)
+        drain_start = time.perf_counter()
+        listener.stop()
+        results['异步队列清空耗时(ms)'] = (time.perf_counter() - drain_start) * 1000
+        for handler in handlers:
+            handler.close()
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="日志开销基准")
+    parser.add_argument("--count", type=int, default=20000, help="日志条数")
+    parser.add_argument("--console", action="store_true", help="输出到真实控制台(stderr)，默认丢弃控制台输出")
+    args = parser.parse_args(argv)
+    
+    console_stream = sys.stderr if args.console else open(os.devnull, 'w', encoding='utf-8')
+    try:
+        results = measure(args.count, console_stream)
+    finally:
+        if console_stream is not sys.stderr:
+            console_stream.close()
+    
+    baseline = results['同步 + f-string']
+    print(f"每条日志在业务线程中的平均耗时（{args.count} 条）:")
+    for name, value in results.items():
+        if name.endswith('(ms)'):
+            print(f"  {name:<16} {value:10.1f}")
+        else:
+            print(f"  {name:<16} {value:8.2f} us  ({value / baseline:.0%})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+框架启动耗时基准：使用 python -X importtime 统计导入框架模块的耗时
+超出预算或提前导入了重量级依赖时返回非零退出码，可直接用于CI门禁
+
+用法: python -m benchmarks.startup --budget-ms 300
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 收集用例时会导入的框架模块
+DEFAULT_MODULES = [
+    'src.common.config',
+    'src.common.logger',
+    'src.common.utils',
+    'src.common.test_data',
+    'src.common.assertions',
+    'src.page_objects.login_page',
+]
+
+# 这些依赖应当在首次使用时才导入，出现在导入链中视为回退
+LAZY_MODULES = ['pandas', 'yaml', 'allure', 'openpyxl']
+
+def measure_import_time(modules):
+    """
+    在干净的子进程中导入模块并解析 -X importtime 输出
+    :return: (总耗时毫秒, {模块名: 累计耗时毫秒})
+    """
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, encoding="utf-8"
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"导入模块失败:\n{result.stderr}")
+    
+    timings = {}
+    for line in result.stderr.splitlines():
+        # 格式: import time:   self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = int(cumulative) / 1000.0
+    
+    total = sum(timings[module] for module in modules if module in timings)
+    return total, timings
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="框架模块导入耗时基准")
+    parser.add_argument("--budget-ms", type=float, default=300.0, help="导入耗时预算(毫秒)")
+    parser.add_argument("--top", type=int, default=10, help="输出最慢的N个模块")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="要导入的模块")
+    args = parser.parse_args(argv)
+    
+    total, timings = measure_import_time(args.modules)
+    
+    print(f"导入 {len(args.modules)} 个框架模块共耗时 {total:.1f} ms (预算 {args.budget_ms:.1f} ms)")
+    print(f"最慢的 {args.top} 个模块(累计耗时):")
+    for name, cost in sorted(timings.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {cost:8.1f} ms  {name}")
+    
+    failed = False
+    eager = [name for name in LAZY_MODULES if name in timings]
+    if eager:
+        print(f"错误: 以下依赖应延迟导入，但在启动时被导入: {', '.join(eager)}")
+        failed = True
+    if total > args.budget_ms:
+        print(f"错误: 导入耗时超出预算 {total - args.budget_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+元素等待延迟基准：在本地页面上延迟插入元素，对比 WebDriverWait 默认轮询与事件驱动等待发现元素的时间
+
+用法: python -m benchmarks.wait_latency --delay-ms 50 --rounds 20
+"""
+import argparse
+import statistics
+import sys
+import time
+from urllib.parse import quote
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as ec
+from selenium.webdriver.support.ui import WebDriverWait
+from src.common.config import Config
+from src.common.driver_pool import create_driver
+from src.page_objects.waits import ElementWaiter
+
+LOCATOR = (By.ID, "late")
+
+def fixture_page(delay_ms):
+    """页面加载后 delay_ms 毫秒插入目标元素"""
+    html = (
+        "<html><body><script>"
+        f"setTimeout(function () {{ var el = document.createElement('div'); el.id = 'late';"
+        f" el.textContent = 'ready'; document.body.appendChild(el); }}, {delay_ms});"
+        "</script></body></html>"
+    )
+    return "data:text/html;charset=utf-8," + quote(html)
+
+def _measure(driver, url, wait, rounds):
+    """返回每轮从页面加载完成到发现元素的耗时(毫秒)"""
+    samples = []
+    for _ in range(rounds):
+        driver.get(url)
+        start = time.perf_counter()
+        wait()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="元素等待延迟基准")
+    parser.add_argument("--delay-ms", type=int, default=50, help="元素在页面加载后出现的延迟(毫秒)")
+    parser.add_argument("--rounds", type=int, default=20, help="每种等待方式的执行轮数")
+    args = parser.parse_args(argv)
+    
+    config = Config()
+    driver = create_driver(config)
+    try:
+        url = fixture_page(args.delay_ms)
+        waiter = ElementWaiter(driver, config)
+        waiter.use_events = False
+        results = {
+            "WebDriverWait(0.5s轮询)": _measure(
+                driver, url, lambda: WebDriverWait(driver, 10).until(ec.presence_of_element_located(LOCATOR)),
+                args.rounds),
+            "指数退避轮询": _measure(driver, url, lambda: waiter.until_present(LOCATOR, 10), args.rounds),
+        }
+        waiter.use_events = True
+        results["事件驱动等待"] = _measure(driver, url, lambda: waiter.until_present(LOCATOR, 10), args.rounds)
+    finally:
+        driver.quit()
+    
+    print(f"元素在页面加载后约 {args.delay_ms} ms 出现，各等待方式发现元素的耗时（{args.rounds} 轮）:")
+    for name, samples in results.items():
+        print(f"  {name:<22} 中位数 {statistics.median(samples):7.1f} ms  最大 {max(samples):7.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,45 +1,283 @@
 import os
+import re
 import sys
+import argparse
+import shutil
+import subprocess
 import pytest
-from src.common.config import Config
+from src.common.config import Config, SNAPSHOT_ENV
+from src.common.durations import CACHE_DIR, DurationStore, split_into_shards
+from src.common.impact import ImpactIndex, changed_files
 from src.common.logger import logger
+from src.common.reporter import ResultReporter, load_results
+from src.stub_app.server import StubAppServer
+
+# 项目根目录
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# 这些环境变量存在时视为CI环境
+CI_ENV_VARS = ('CI', 'GITHUB_ACTIONS', 'GITLAB_CI', 'JENKINS_URL', 'TF_BUILD', 'BUILDKITE', 'TEAMCITY_VERSION')
+
+# 在后台进程中生成allure报告，生成成功后按需打开，不阻塞测试进程退出
+ALLURE_SCRIPT = (
+    "import subprocess, sys\n"
+    "allure, results, output, open_report = sys.argv[1:5]\n"
+    "code = subprocess.call([allure, 'generate', results, '-o', output, '--clean'])\n"
+    "if code == 0 and open_report == '1':\n"
+    "    subprocess.call([allure, 'open', output])\n"
+)
+
+# 默认的pytest参数：测试目录和详细输出
+DEFAULT_PYTEST_ARGS = ["src/tests", "-v"]
+
+# 输出详细程度参数，收集用例ID时需要去掉
+VERBOSITY_ARG = re.compile(r"^(-[vq]+|--verbose|--quiet|--verbosity=.*)$")
+
+def parse_args(argv):
+    """解析运行参数，未识别的参数原样传给 pytest"""
+    parser = argparse.ArgumentParser(description="Web自动化测试执行入口", add_help=False)
+    parser.add_argument("--workers", type=int, default=1, help="并行worker进程数")
+    parser.add_argument("--stub-app", action="store_true", help="启动本地替身应用，并把 base_url 指向它")
+    parser.add_argument("--changed-since", metavar="REF",
+                        help="只执行受自 REF（git提交、分支或标签）以来修改的文件影响的用例")
+    return parser.parse_known_args(argv)
+
+def collect_node_ids(pytest_args):
+    """
+    在子进程中收集用例ID，不启动浏览器
+    :return: 用例ID列表，收集失败时返回 None
+    """
+    # 只有 -q（verbosity 为 -1）时 --collect-only 才逐行输出用例ID，-v 或 -qq 会改变输出格式
+    collect_args = [arg for arg in pytest_args if not VERBOSITY_ARG.match(arg)]
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "--collect-only", "-q", *collect_args],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, encoding="utf-8"
+    )
+    if result.returncode not in (0, 5):
+        logger.error(f"收集测试用例失败:\n{result.stdout}\n{result.stderr}")
+        return None
+    return [line.strip() for line in result.stdout.splitlines() if "::" in line]
+
+def select_affected(pytest_args, ref):
+    """
+    按依赖索引选出受自 ref 以来修改影响的用例
+    :return: 用例ID列表；索引过期、无法判断或全局文件修改时返回 None，表示执行全部用例
+    """
+    try:
+        changed = changed_files(ref)
+    except RuntimeError as e:
+        logger.warning(f"获取修改文件失败，执行全部用例: {str(e)}")
+        return None
+    node_ids = collect_node_ids(pytest_args)
+    # 收集失败或没有收集到用例时无法判断影响范围，不能当作"没有受影响的用例"跳过
+    if not node_ids:
+        logger.warning("收集测试用例失败或未收集到用例，执行全部用例")
+        return None
+    index = ImpactIndex()
+    selected, reason = index.select(node_ids, changed)
+    # 保存静态解析缓存，下次只重新解析修改过的文件
+    index.save()
+    if selected is None:
+        logger.info(f"影响分析: {reason}，执行全部用例")
+    else:
+        logger.info(f"影响分析: {reason}")
+    return selected
+
+def run_parallel(pytest_args, workers, node_ids=None):
+    """
+    并行执行测试：按历史耗时把用例分片给多个worker进程
+    每个worker独立启动浏览器，tab/context 执行模式下共用主进程启动的浏览器，allure结果写入同一个目录
+    :param node_ids: 要执行的用例，默认收集全部用例
+    """
+    if node_ids is None:
+        node_ids = collect_node_ids(pytest_args)
+    if not node_ids:
+        logger.warning("未收集到测试用例")
+        return pytest.ExitCode.NO_TESTS_COLLECTED
+    
+    store = DurationStore()
+    # worker直接复用父进程解析好的配置，不再读取配置文件
+    config = Config()
+    config_snapshot = config.export_snapshot()
+    # 各worker向同一组结果文件追加，由父进程在启动前清空
+    if config.is_native_report_enabled():
+        ResultReporter(config=config).reset()
+    shards = split_into_shards(node_ids, workers, store)
+    logger.info(f"共 {len(node_ids)} 个用例，分为 {len(shards)} 个分片: "
+                f"{[f'{total:.1f}s/{len(ids)}' for total, ids in shards]}")
+    
+    # tab/context 模式下所有worker在同一个浏览器中打开标签页
+    shared_browser, extra_env = None, {}
+    if config.get_execution_mode() != "browser":
+        # 只在需要时导入，避免主进程加载 selenium
+        from src.common.tabs import SHARED_BROWSER_ENV, SharedBrowser
+        if SharedBrowser.is_supported():
+            shared_browser = SharedBrowser(config).start()
+            extra_env[SHARED_BROWSER_ENV] = shared_browser.info_path
+        else:
+            logger.warning("当前系统不支持跨进程共用浏览器，每个worker使用各自的浏览器")
+    try:
+        return _run_shards(pytest_args, shards, store, config_snapshot, extra_env)
+    finally:
+        if shared_browser is not None:
+            shared_browser.stop()
+
+def _run_shards(pytest_args, shards, store, config_snapshot, extra_env):
+    """启动各分片的worker进程并等待结束，合并耗时历史和依赖索引"""
+    shard_dir = os.path.join(CACHE_DIR, "shards")
+    os.makedirs(shard_dir, exist_ok=True)
+    processes = []
+    for worker_id, (_, ids) in enumerate(shards):
+        shard_file = os.path.join(shard_dir, f"worker{worker_id}.txt")
+        with open(shard_file, "w", encoding="utf-8") as f:
+            f.write("\n".join(ids))
+        durations_path = os.path.join(shard_dir, f"durations.worker{worker_id}.json")
+        impact_path = os.path.join(shard_dir, f"impact.worker{worker_id}.json")
+        for path in (durations_path, impact_path):
+            if os.path.exists(path):
+                os.remove(path)
+        
+        env = dict(os.environ,
+                   WEBAUTO_WORKER_ID=str(worker_id),
+                   WEBAUTO_SHARD_FILE=shard_file,
+                   WEBAUTO_DURATIONS_PATH=durations_path,
+                   WEBAUTO_IMPACT_PATH=impact_path)
+        env[SNAPSHOT_ENV] = config_snapshot
+        env.update(extra_env)
+        output_path = os.path.join(shard_dir, f"worker{worker_id}.out")
+        output = open(output_path, "w", encoding="utf-8")
+        process = subprocess.Popen(
+            [sys.executable, "-m", "pytest", *pytest_args],
+            cwd=PROJECT_ROOT, env=env, stdout=output, stderr=subprocess.STDOUT
+        )
+        processes.append((worker_id, process, output, output_path, durations_path, impact_path))
+    
+    exit_codes = []
+    index = ImpactIndex()
+    for worker_id, process, output, output_path, durations_path, impact_path in processes:
+        exit_codes.append(process.wait())
+        output.close()
+        logger.info(f"worker {worker_id} 执行结束，退出码: {exit_codes[-1]}，输出: {output_path}")
+        if os.path.exists(durations_path):
+            store.merge(durations_path)
+            os.remove(durations_path)
+        if os.path.exists(impact_path):
+            index.merge(impact_path)
+            os.remove(impact_path)
+    store.save()
+    index.save()
+    
+    return merge_exit_codes(exit_codes)
+
+def is_ci():
+    """是否在CI环境中运行"""
+    return any(os.environ.get(name) for name in CI_ENV_VARS)
+
+def start_allure_generation(config):
+    """
+    在后台进程中生成allure报告，立即返回
+    无头模式或CI环境下只生成不打开
+    """
+    allure = shutil.which("allure")
+    if not allure:
+        logger.warning("未找到 allure 命令行工具，跳过生成allure报告")
+        return None
+    report_dir = config.get_allure_report_dir()
+    html_report_dir = os.path.join(report_dir, "html")
+    open_report = config.is_open_allure() and not config.is_headless() and not is_ci()
+    
+    os.makedirs(report_dir, exist_ok=True)
+    log_path = os.path.join(report_dir, "generate.log")
+    with open(log_path, "w", encoding="utf-8") as log:
+        process = subprocess.Popen(
+            [sys.executable, "-c", ALLURE_SCRIPT, allure, report_dir, html_report_dir, "1" if open_report else "0"],
+            cwd=PROJECT_ROOT, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+            start_new_session=True
+        )
+    logger.info(f"allure报告在后台生成(pid {process.pid})，输出目录: {html_report_dir}，日志: {log_path}")
+    return process
+
+def log_native_summary(config):
+    """输出内置结果报告的统计"""
+    reporter = ResultReporter(config=config)
+    if not os.path.exists(reporter.results_path):
+        return
+    counts = {}
+    for result in load_results(reporter.results_path):
+        counts[result['outcome']] = counts.get(result['outcome'], 0) + 1
+    logger.info(f"测试结果: {counts}，详细结果: {reporter.summary_path}")
+
+def merge_exit_codes(exit_codes):
+    """合并各worker的退出码：有失败返回失败，全部无用例返回无用例"""
+    if pytest.ExitCode.TESTS_FAILED in exit_codes:
+        return pytest.ExitCode.TESTS_FAILED
+    errors = [code for code in exit_codes if code not in (pytest.ExitCode.OK, pytest.ExitCode.NO_TESTS_COLLECTED)]
+    if errors:
+        return errors[0]
+    if exit_codes and all(code == pytest.ExitCode.NO_TESTS_COLLECTED for code in exit_codes):
+        return pytest.ExitCode.NO_TESTS_COLLECTED
+    return pytest.ExitCode.OK
 
 def main():
     """测试执行入口函数"""
+    options, extra_args = parse_args(sys.argv[1:])
+    
+    # 替身应用需要在第一次读取配置前启动，base_url 通过环境变量覆盖，worker进程也会继承
+    stub_server = None
+    if options.stub_app:
+        stub_server = StubAppServer().start()
+        os.environ['WEBAUTO_TEST_BASE_URL'] = stub_server.url
+    
     # 读取配置
     config = Config()
     
     # 构建pytest命令行参数
-    pytest_args = [
-        "src/tests",  # 默认测试目录
-        "--alluredir", config.get_allure_report_dir(),  # allure报告数据目录
-        "-v"  # 详细输出
-    ]
+    pytest_args = list(DEFAULT_PYTEST_ARGS)
     
     # 如果有命令行参数，使用用户指定的参数
-    if len(sys.argv) > 1:
-        pytest_args = sys.argv[1:] + ["--alluredir", config.get_allure_report_dir()]
+    if extra_args:
+        pytest_args = list(extra_args)
+    
+    # allure报告数据目录
+    if config.generate_allure():
+        pytest_args += ["--alluredir", config.get_allure_report_dir()]
     
     logger.info(f"开始执行测试，参数: {pytest_args}")
     
+    # 影响分析：只执行受修改影响的用例
+    node_ids = select_affected(pytest_args, options.changed_since) if options.changed_since else None
+    if node_ids is not None and not node_ids:
+        logger.info("没有受影响的用例，跳过执行")
+        if stub_server:
+            stub_server.stop()
+        sys.exit(pytest.ExitCode.OK)
+    
     # 执行测试
-    exit_code = pytest.main(pytest_args)
+    try:
+        if options.workers > 1:
+            exit_code = run_parallel(pytest_args, options.workers, node_ids)
+        else:
+            if node_ids is not None:
+                # 复用分片文件机制，收集阶段只保留选中的用例
+                selection_file = os.path.join(CACHE_DIR, "shards", "selected.txt")
+                os.makedirs(os.path.dirname(selection_file), exist_ok=True)
+                with open(selection_file, "w", encoding="utf-8") as f:
+                    f.write("\n".join(node_ids))
+                os.environ['WEBAUTO_SHARD_FILE'] = selection_file
+            exit_code = pytest.main(pytest_args)
+    finally:
+        if stub_server:
+            stub_server.stop()
     
-    # 生成并打开allure报告（如果配置了）
+    if config.is_native_report_enabled():
+        log_native_summary(config)
+    
+    # 在后台生成allure报告（如果配置了），不等待生成完成
     if config.generate_allure():
-        logger.info("测试执行完成，开始生成allure报告")
-        report_dir = config.get_allure_report_dir()
-        html_report_dir = os.path.join(report_dir, "html")
-        
-        # 生成HTML报告
-        os.system(f"allure generate {report_dir} -o {html_report_dir} --clean")
-        
-        # 打开报告
-        os.system(f"allure open {html_report_dir}")
+        start_allure_generation(config)
     
     logger.info(f"测试执行结束，退出码: {exit_code}")
     sys.exit(exit_code)
 
 if __name__ == "__main__":
     main()
-    
\ No newline at end of file
@@ -1,114 +1,235 @@
-import allure
+import threading
+from src.common.exceptions import SoftAssertionError
+from src.common.failure_capture import failure_capture
+from src.common.lazy_import import allure_step, lazy_import
 from src.common.logger import logger
-from src.common.utils import take_screenshot
+
+allure = lazy_import('allure')
+
+# assert_element_state 支持的预期状态
+ELEMENT_STATE_KEYS = ('present', 'displayed', 'text', 'text_contains', 'value', 'enabled', 'selected', 'attributes')
+
+# 每个线程当前生效的软断言上下文（支持嵌套，最内层的生效）
+_soft_local = threading.local()
+
+def _soft_stack():
+    stack = getattr(_soft_local, 'stack', None)
+    if stack is None:
+        stack = _soft_local.stack = []
+    return stack
+
+def _handle_failure(error, driver=None):
+    """
+    处理断言失败：登记一次失败现场采集请求（由失败钩子统一截图），
+    在软断言上下文中时只记录失败并返回 True，否则返回 False 由调用方继续抛出
+    """
+    stack = _soft_stack()
+    soft = stack[-1] if stack else None
+    driver = driver or next((context.driver for context in reversed(stack) if context.driver), None)
+    if driver:
+        failure_capture.request(driver, str(error))
+    if soft is None:
+        return False
+    soft.failures.append(str(error))
+    return True
+
+class SoftAssertions:
+    """
+    软断言上下文：块内的断言失败只记录不中断，退出时汇总抛出一个 SoftAssertionError
+    用法:
+        with assertions.soft(driver):
+            assertions.assert_equal(...)
+            assertions.assert_true(...)
+    """
+    
+    def __init__(self, driver=None):
+        self.driver = driver
+        self.failures = []
+    
+    def __enter__(self):
+        _soft_stack().append(self)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        stack = _soft_stack()
+        stack.remove(self)
+        if not self.failures:
+            return False
+        if exc is not None:
+            # 块内出现其他异常时保留原异常，把已记录的断言失败附加到异常说明中
+            logger.error(f"软断言块因异常中断，已记录 {len(self.failures)} 个断言失败")
+            for failure in self.failures:
+                # add_note 需要 Python 3.11+，更早的版本只记录到日志
+                if hasattr(exc, 'add_note'):
+                    exc.add_note(f"软断言失败: {failure}")
+                else:
+                    logger.error(f"软断言失败: {failure}")
+            return False
+        if stack:
+            # 嵌套时并入外层，由最外层统一抛出
+            stack[-1].failures.extend(self.failures)
+            return False
+        raise SoftAssertionError(self.failures)
 
 class Assertions:
-    """自定义断言类，增强断言功能并集成日志和报告"""
+    """
+    自定义断言类，增强断言功能并集成日志和报告
+    断言失败时不直接截图，由失败钩子在用例结束时统一采集一次失败现场
+    """
+    
+    @staticmethod
+    def soft(driver=None):
+        """
+        返回软断言上下文，块内的断言失败在退出时汇总抛出
+        :param driver: 浏览器驱动，块内断言未传 driver 时用于采集失败现场
+        """
+        return SoftAssertions(driver)
     
     @staticmethod
-    @allure.step("断言相等: 实际值 '{actual}' 应该等于 预期值 '{expected}'")
+    @allure_step("断言相等: 实际值 '{actual}' 应该等于 预期值 '{expected}'")
     def assert_equal(actual, expected, message=None, driver=None):
         """断言两个值相等"""
         try:
             assert actual == expected, message or f"实际值: {actual} 不等于 预期值: {expected}"
-            logger.info(f"断言成功: {actual} == {expected}")
+            logger.info("断言成功: %s == %s", actual, expected)
         except AssertionError as e:
             logger.error(f"断言失败: {str(e)}")
-            # 如果提供了driver，测试失败时截图
-            if driver:
-                take_screenshot(driver, "assert_equal_failure")
             # 将失败信息添加到allure报告
             allure.attach(str(actual), name="实际值")
             allure.attach(str(expected), name="预期值")
-            raise
+            if not _handle_failure(e, driver):
+                raise
     
     @staticmethod
-    @allure.step("断言不相等: 实际值 '{actual}' 应该不等于 预期值 '{expected}'")
+    @allure_step("断言不相等: 实际值 '{actual}' 应该不等于 预期值 '{expected}'")
     def assert_not_equal(actual, expected, message=None, driver=None):
         """断言两个值不相等"""
         try:
             assert actual != expected, message or f"实际值: {actual} 等于 预期值: {expected}"
-            logger.info(f"断言成功: {actual} != {expected}")
+            logger.info("断言成功: %s != %s", actual, expected)
         except AssertionError as e:
             logger.error(f"断言失败: {str(e)}")
-            if driver:
-                take_screenshot(driver, "assert_not_equal_failure")
             allure.attach(str(actual), name="实际值")
             allure.attach(str(expected), name="预期值")
-            raise
+            if not _handle_failure(e, driver):
+                raise
     
     @staticmethod
-    @allure.step("断言包含: 实际值 '{actual}' 应该包含 预期值 '{expected}'")
+    @allure_step("断言包含: 实际值 '{actual}' 应该包含 预期值 '{expected}'")
     def assert_contains(actual, expected, message=None, driver=None):
         """断言实际值包含预期值"""
         try:
             assert expected in actual, message or f"实际值: {actual} 不包含 预期值: {expected}"
-            logger.info(f"断言成功: {actual} 包含 {expected}")
+            logger.info("断言成功: %s 包含 %s", actual, expected)
         except AssertionError as e:
             logger.error(f"断言失败: {str(e)}")
-            if driver:
-                take_screenshot(driver, "assert_contains_failure")
             allure.attach(str(actual), name="实际值")
             allure.attach(str(expected), name="预期值")
-            raise
+            if not _handle_failure(e, driver):
+                raise
     
     @staticmethod
-    @allure.step("断言为真: '{condition}' 应该为 True")
+    @allure_step("断言为真: '{condition}' 应该为 True")
     def assert_true(condition, message=None, driver=None):
         """断言条件为真"""
         try:
             assert condition, message or "条件应为True，但实际为False"
-            logger.info(f"断言成功: 条件为True")
+            logger.info("断言成功: 条件为True")
         except AssertionError as e:
             logger.error(f"断言失败: {str(e)}")
-            if driver:
-                take_screenshot(driver, "assert_true_failure")
             allure.attach(str(condition), name="实际条件结果")
-            raise
+            if not _handle_failure(e, driver):
+                raise
     
     @staticmethod
-    @allure.step("断言为假: '{condition}' 应该为 False")
+    @allure_step("断言为假: '{condition}' 应该为 False")
     def assert_false(condition, message=None, driver=None):
         """断言条件为假"""
         try:
             assert not condition, message or "条件应为False，但实际为True"
-            logger.info(f"断言成功: 条件为False")
+            logger.info("断言成功: 条件为False")
         except AssertionError as e:
             logger.error(f"断言失败: {str(e)}")
-            if driver:
-                take_screenshot(driver, "assert_false_failure")
             allure.attach(str(condition), name="实际条件结果")
-            raise
+            if not _handle_failure(e, driver):
+                raise
     
     @staticmethod
-    @allure.step("断言URL包含: '{url}' 应该包含 '{expected}'")
+    @allure_step("断言URL包含: '{url}' 应该包含 '{expected}'")
     def assert_url_contains(driver, expected, message=None):
         """断言当前URL包含预期字符串"""
         actual_url = driver.current_url
         try:
             assert expected in actual_url, message or f"URL: {actual_url} 不包含: {expected}"
-            logger.info(f"断言成功: URL {actual_url} 包含 {expected}")
+            logger.info("断言成功: URL %s 包含 %s", actual_url, expected)
         except AssertionError as e:
             logger.error(f"断言失败: {str(e)}")
-            take_screenshot(driver, "assert_url_contains_failure")
             allure.attach(actual_url, name="实际URL")
             allure.attach(expected, name="预期包含内容")
-            raise
+            if not _handle_failure(e, driver):
+                raise
     
     @staticmethod
-    @allure.step("断言元素可见: {locator} 应该可见")
+    @allure_step("断言元素可见: {locator} 应该可见")
     def assert_element_visible(element, locator=None, message=None, driver=None):
         """断言元素可见"""
         try:
             assert element.is_displayed(), message or f"元素 {locator or ''} 不可见"
-            logger.info(f"断言成功: 元素 {locator or ''} 可见")
+            logger.info("断言成功: 元素 %s 可见", locator or '')
         except AssertionError as e:
             logger.error(f"断言失败: {str(e)}")
-            if driver:
-                take_screenshot(driver, "assert_element_visible_failure")
             allure.attach(str(locator), name="元素定位器")
-            raise
+            if not _handle_failure(e, driver):
+                raise
+    
+    @staticmethod
+    @allure_step("断言快照URL包含: '{expected}'")
+    def assert_snapshot_url_contains(snapshot, expected, message=None, driver=None):
+        """断言页面快照中的URL包含预期字符串，不访问浏览器"""
+        try:
+            assert expected in snapshot.url, message or f"URL: {snapshot.url} 不包含: {expected}"
+            logger.info("断言成功: URL %s 包含 %s", snapshot.url, expected)
+        except AssertionError as e:
+            logger.error(f"断言失败: {str(e)}")
+            allure.attach(snapshot.url, name="实际URL")
+            allure.attach(expected, name="预期包含内容")
+            if not _handle_failure(e, driver):
+                raise
+    
+    @staticmethod
+    @allure_step("断言元素状态: {locator}")
+    def assert_element_state(snapshot, locator, message=None, driver=None, **expected):
+        """
+        断言页面快照中元素的状态，不访问浏览器
+        :param expected: 预期的状态，可选 present、displayed、text、text_contains、value、enabled、selected，
+            以及 attributes={属性名: 值}；所有不一致的项在一条失败信息中列出
+        """
+        # 不支持的状态是用法错误，直接抛出，不作为断言失败记录
+        unknown = [name for name in expected if name not in ELEMENT_STATE_KEYS]
+        if unknown:
+            raise ValueError(f"assert_element_state 不支持的状态: {', '.join(unknown)}，可选: {', '.join(ELEMENT_STATE_KEYS)}")
+        # 步骤标题只能引用具名参数，预期状态作为附件添加到步骤中
+        allure.attach(str(expected), name="预期元素状态")
+        state = snapshot[locator]
+        mismatches = []
+        for name, value in expected.items():
+            if name == 'text_contains':
+                if value not in (state.text or ''):
+                    mismatches.append(f"文本 {state.text!r} 不包含 {value!r}")
+            elif name == 'attributes':
+                for attribute, attribute_value in value.items():
+                    if state.attributes.get(attribute) != attribute_value:
+                        mismatches.append(f"属性 {attribute}: {state.attributes.get(attribute)!r} != {attribute_value!r}")
+            elif getattr(state, name) != value:
+                mismatches.append(f"{name}: {getattr(state, name)!r} != {value!r}")
+        try:
+            assert not mismatches, (f"{message}: " if message else "") + f"元素 {locator} 状态不一致: {'; '.join(mismatches)}"
+            logger.info("断言成功: 元素 %s 状态为 %s", locator, expected)
+        except AssertionError as e:
+            logger.error(f"断言失败: {str(e)}")
+            allure.attach(str(state.to_dict()), name="实际元素状态")
+            if not _handle_failure(e, driver):
+                raise
 
 # 实例化断言工具
 assertions = Assertions()
-    
\ No newline at end of file
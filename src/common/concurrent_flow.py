@@ -0,0 +1,109 @@
+import asyncio
+import inspect
+import json
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from src.common.exceptions import AutomationException
+from src.common.logger import logger
+from src.common.perf import summarize
+
+class FlowResult:
+    """一次并发流程的结果：每个会话的耗时和失败信息"""
+    
+    def __init__(self, sessions):
+        self.sessions = sessions
+        self.durations = [None] * sessions
+        self.errors = {}
+        self.wall_ms = 0.0
+    
+    @property
+    def failed(self):
+        return len(self.errors)
+    
+    def summary(self):
+        """成功会话的耗时统计(p50/p95/p99)，以及失败数、总耗时和吞吐量"""
+        durations = [duration for index, duration in enumerate(self.durations)
+                     if duration is not None and index not in self.errors]
+        summary = summarize(durations)
+        summary.update(
+            sessions=self.sessions,
+            failed=self.failed,
+            wall_ms=round(self.wall_ms, 2),
+            throughput_per_s=round(len(durations) / (self.wall_ms / 1000), 2) if self.wall_ms else 0.0,
+        )
+        return summary
+    
+    def to_json(self):
+        return json.dumps({
+            'summary': self.summary(),
+            'durations_ms': [round(duration, 2) if duration is not None else None for duration in self.durations],
+            'errors': {str(index): error for index, error in sorted(self.errors.items())},
+        }, ensure_ascii=False, indent=2)
+    
+    def raise_for_errors(self):
+        """有会话失败时抛出 AutomationException，列出每个失败会话的错误"""
+        if self.errors:
+            details = '\n'.join(f"  会话 {index}: {error.strip().splitlines()[-1]}"
+                                for index, error in sorted(self.errors.items()))
+            raise AutomationException(f"{self.failed}/{self.sessions} 个会话执行失败:\n{details}")
+        return self
+    
+    def __repr__(self):
+        summary = self.summary()
+        return (f"<FlowResult {self.sessions} 个会话, 失败 {self.failed}, "
+                f"p50 {summary['p50_ms']}ms, p95 {summary['p95_ms']}ms, p99 {summary['p99_ms']}ms>")
+
+def run_flow(flow, drivers, max_workers=None):
+    """
+    在多个浏览器会话上同时执行同一个页面对象流程
+    :param flow: flow(driver, index)，普通函数在线程池中执行；
+        协程函数在同一个事件循环中并发执行，其中通过 AsyncPage 调用页面对象
+    :param drivers: 每个会话使用的浏览器驱动
+    :param max_workers: 普通函数流程的最大并发数，默认与会话数相同
+    :return: FlowResult
+    """
+    result = FlowResult(len(drivers))
+    
+    def record(index, start, error=None):
+        result.durations[index] = (time.perf_counter() - start) * 1000
+        if error is not None:
+            result.errors[index] = error
+    
+    def run_one(index, driver):
+        start = time.perf_counter()
+        try:
+            flow(driver, index)
+        except Exception:
+            record(index, start, traceback.format_exc())
+        else:
+            record(index, start)
+    
+    async def run_one_async(index, driver):
+        start = time.perf_counter()
+        try:
+            await flow(driver, index)
+        except Exception:
+            record(index, start, traceback.format_exc())
+        else:
+            record(index, start)
+    
+    async def run_all_async():
+        await asyncio.gather(*(run_one_async(index, driver) for index, driver in enumerate(drivers)))
+    
+    start = time.perf_counter()
+    if inspect.iscoroutinefunction(flow):
+        asyncio.run(run_all_async())
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers or len(drivers) or 1,
+                                thread_name_prefix='flow') as executor:
+            list(executor.map(run_one, range(len(drivers)), drivers))
+    result.wall_ms = (time.perf_counter() - start) * 1000
+    
+    summary = result.summary()
+    logger.info(f"并发流程 {getattr(flow, '__name__', flow)} 完成: {result.sessions} 个会话，失败 {result.failed}，"
+                f"p50 {summary['p50_ms']}ms，p95 {summary['p95_ms']}ms，p99 {summary['p99_ms']}ms，"
+                f"总耗时 {summary['wall_ms']}ms")
+    for index, error in sorted(result.errors.items()):
+        logger.error(f"会话 {index} 执行失败:\n{error}")
+    return result
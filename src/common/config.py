@@ -1,42 +1,188 @@
 import configparser
+import json
+import logging
 import os
-from src.common.logger import logger
+import threading
+import time
+from types import MappingProxyType
+
+# 直接使用标准库logger，避免与 src.common.logger 循环导入
+logger = logging.getLogger('web_automation')
+
+# 项目根目录和默认配置文件路径
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CONFIG_PATH = os.path.join(PROJECT_ROOT, 'configs', 'config.ini')
+
+# 环境变量覆盖前缀，如 WEBAUTO_BROWSER_HEADLESS=true 覆盖 [browser] headless
+ENV_PREFIX = 'WEBAUTO_'
+# 父进程导出的配置快照，worker进程直接使用，不再读取配置文件
+SNAPSHOT_ENV = 'WEBAUTO_CONFIG_SNAPSHOT'
+
+# 同一进程内检查配置文件是否修改的最小间隔(秒)
+RELOAD_CHECK_INTERVAL = 1.0
+
+_snapshot_cache = {}
+_snapshot_lock = threading.Lock()
+
+class ConfigSnapshot:
+    """不可变的配置快照，接口与 configparser 的取值方法保持一致"""
+    
+    def __init__(self, sections, path, mtime):
+        self._sections = MappingProxyType({
+            name: MappingProxyType(dict(options)) for name, options in sections.items()
+        })
+        self.path = path
+        self.mtime = mtime
+    
+    def sections(self):
+        return list(self._sections)
+    
+    def has_section(self, section):
+        return section in self._sections
+    
+    def has_option(self, section, option):
+        return option in self._sections.get(section, {})
+    
+    def items(self, section):
+        return dict(self._sections.get(section, {}))
+    
+    def get(self, section, option, fallback=None):
+        return self._sections.get(section, {}).get(option, fallback)
+    
+    def getint(self, section, option, fallback=None):
+        value = self.get(section, option)
+        return fallback if value is None else int(value)
+    
+    def getfloat(self, section, option, fallback=None):
+        value = self.get(section, option)
+        return fallback if value is None else float(value)
+    
+    def getboolean(self, section, option, fallback=None):
+        value = self.get(section, option)
+        if value is None:
+            return fallback
+        if value.lower() not in configparser.ConfigParser.BOOLEAN_STATES:
+            raise ValueError(f"配置项不是合法的布尔值: [{section}] {option} = {value}")
+        return configparser.ConfigParser.BOOLEAN_STATES[value.lower()]
+    
+    def getlist(self, section, option, fallback=None):
+        """读取逗号或换行分隔的列表配置"""
+        value = self.get(section, option)
+        if value is None:
+            return list(fallback or [])
+        return [item.strip() for item in value.replace('\n', ',').split(',') if item.strip()]
+    
+    def to_json(self):
+        """导出为JSON字符串，供子进程共享"""
+        return json.dumps({
+            'path': self.path,
+            'mtime': self.mtime,
+            'sections': {name: dict(options) for name, options in self._sections.items()}
+        }, ensure_ascii=False)
+    
+    @classmethod
+    def from_json(cls, data):
+        data = json.loads(data)
+        return cls(data['sections'], data['path'], data['mtime'])
+
+def _apply_env_overrides(sections):
+    """应用 WEBAUTO_<SECTION>_<OPTION> 形式的环境变量覆盖"""
+    # 按名称长度倒序匹配，避免 test 抢先匹配 test_data 之类的段名
+    section_names = sorted(sections, key=len, reverse=True)
+    for name, value in os.environ.items():
+        if not name.startswith(ENV_PREFIX) or name == SNAPSHOT_ENV:
+            continue
+        key = name[len(ENV_PREFIX):].lower()
+        for section in section_names:
+            if key.startswith(section + '_'):
+                sections[section][key[len(section) + 1:]] = value
+                logger.info(f"环境变量覆盖配置: [{section}] {key[len(section) + 1:]} <- {name}")
+                break
+
+def _parse_config_file(path, mtime):
+    """解析配置文件并应用环境变量覆盖，生成快照"""
+    parser = configparser.ConfigParser(interpolation=None)
+    try:
+        parser.read(path, encoding='utf-8')
+        logger.info(f"成功加载配置文件: {path}")
+    except Exception as e:
+        logger.error(f"加载配置文件失败: {str(e)}")
+        raise
+    
+    sections = {section: dict(parser.items(section)) for section in parser.sections()}
+    _apply_env_overrides(sections)
+    snapshot = ConfigSnapshot(sections, path, mtime)
+    _check_configs(snapshot)
+    return snapshot
+
+def _check_configs(snapshot):
+    """检查必要的配置项是否存在"""
+    required_sections = ['browser', 'test', 'log', 'report']
+    for section in required_sections:
+        if not snapshot.has_section(section):
+            raise ValueError(f"配置文件缺少必要的部分: {section}")
+
+def load_snapshot(path=CONFIG_PATH):
+    """
+    获取配置快照：同一进程内只解析一次，文件修改时间变化时重新加载
+    存在 WEBAUTO_CONFIG_SNAPSHOT 环境变量时直接使用父进程导出的快照
+    """
+    with _snapshot_lock:
+        cached = _snapshot_cache.get(path)
+        now = time.monotonic()
+        if cached and now - cached[0] < RELOAD_CHECK_INTERVAL:
+            return cached[1]
+        
+        if cached is None and path == CONFIG_PATH and os.environ.get(SNAPSHOT_ENV):
+            snapshot = ConfigSnapshot.from_json(os.environ[SNAPSHOT_ENV])
+            _snapshot_cache[path] = (float('inf'), snapshot)
+            return snapshot
+        
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"配置文件不存在: {path}")
+        
+        mtime = os.path.getmtime(path)
+        if cached and cached[1].mtime == mtime:
+            snapshot = cached[1]
+        else:
+            snapshot = _parse_config_file(path, mtime)
+        _snapshot_cache[path] = (now, snapshot)
+        return snapshot
 
 class Config:
     """配置管理类，负责解析和提供配置文件中的各项配置"""
     
-    def __init__(self):
+    def __init__(self, config_path=None):
         # 配置文件路径
-        self.config_path = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))),
-            'configs', 'config.ini'
-        )
-        
-        # 初始化配置解析器
-        self.config = configparser.ConfigParser()
-        self._load_config()
+        self.config_path = config_path or CONFIG_PATH
         
-        # 确保所有必要的配置项存在
-        self._check_configs()
+        # 首次创建时解析配置文件，之后复用进程内缓存的快照
+        load_snapshot(self.config_path)
     
-    def _load_config(self):
-        """加载配置文件"""
-        if not os.path.exists(self.config_path):
-            raise FileNotFoundError(f"配置文件不存在: {self.config_path}")
-        
-        try:
-            self.config.read(self.config_path, encoding='utf-8')
-            logger.info(f"成功加载配置文件: {self.config_path}")
-        except Exception as e:
-            logger.error(f"加载配置文件失败: {str(e)}")
-            raise
-    
-    def _check_configs(self):
-        """检查必要的配置项是否存在"""
-        required_sections = ['browser', 'test', 'log', 'report']
-        for section in required_sections:
-            if not self.config.has_section(section):
-                raise ValueError(f"配置文件缺少必要的部分: {section}")
+    @property
+    def config(self):
+        """当前配置快照"""
+        return load_snapshot(self.config_path)
+    
+    def export_snapshot(self):
+        """导出配置快照，设置到子进程的 WEBAUTO_CONFIG_SNAPSHOT 环境变量即可共享"""
+        return self.config.to_json()
+    
+    # 通用类型化取值
+    def get(self, section, option, fallback=None):
+        return self.config.get(section, option, fallback=fallback)
+    
+    def getint(self, section, option, fallback=None):
+        return self.config.getint(section, option, fallback=fallback)
+    
+    def getfloat(self, section, option, fallback=None):
+        return self.config.getfloat(section, option, fallback=fallback)
+    
+    def getboolean(self, section, option, fallback=None):
+        return self.config.getboolean(section, option, fallback=fallback)
+    
+    def getlist(self, section, option, fallback=None):
+        return self.config.getlist(section, option, fallback=fallback)
     
     # 浏览器相关配置
     def get_browser_type(self):
@@ -51,6 +197,71 @@ class Config:
         """获取浏览器窗口大小"""
         return self.config.get('browser', 'window_size', fallback='1920,1080')
     
+    def get_pool_size(self):
+        """获取浏览器池大小"""
+        return max(1, self.config.getint('browser', 'pool_size', fallback=1))
+    
+    def get_pool_max_uses(self):
+        """获取单个浏览器最大复用次数，0 表示不限制"""
+        return max(0, self.config.getint('browser', 'max_uses', fallback=50))
+    
+    def get_execution_mode(self):
+        """执行模式：browser 每个用例独占浏览器，tab/context 多个用例共用一个浏览器的标签页/浏览器上下文"""
+        return self.config.get('browser', 'execution_mode', fallback='browser').lower()
+    
+    def get_tabs_per_browser(self):
+        """tab/context 模式下同一进程内同时打开的标签页上限"""
+        return max(1, self.config.getint('browser', 'tabs_per_browser', fallback=4))
+    
+    def get_prewarm_count(self):
+        """测试会话开始时在后台预启动的浏览器数量，0 表示不预启动"""
+        return max(0, self.config.getint('browser', 'prewarm', fallback=0))
+    
+    def get_startup_timeout(self):
+        """等待预启动的浏览器就绪的最长时间(秒)"""
+        return self.config.getfloat('browser', 'startup_timeout', fallback=60)
+    
+    def get_page_load_strategy(self):
+        """页面加载策略：normal 等待所有资源，eager 只等待DOM解析完成，none 不等待"""
+        return self.config.get('browser', 'page_load_strategy', fallback='normal').lower()
+    
+    def get_blocked_urls(self):
+        """浏览器拦截的URL模式列表，支持 * 通配符"""
+        return self.config.getlist('browser', 'blocked_urls')
+    
+    # 远程浏览器节点相关配置
+    def is_grid_enabled(self):
+        """是否在远程 WebDriver 节点上启动浏览器"""
+        return self.config.getboolean('grid', 'enabled', fallback=False)
+    
+    def get_grid_endpoints(self):
+        """远程节点列表，每项为 URL 或 URL|容量"""
+        return self.config.getlist('grid', 'endpoints')
+    
+    def get_grid_capacity(self):
+        """未指定容量的节点可同时运行的会话数"""
+        return max(1, self.config.getint('grid', 'capacity', fallback=1))
+    
+    def get_grid_strategy(self):
+        """节点选择策略：least_loaded 或 round_robin"""
+        return self.config.get('grid', 'strategy', fallback='least_loaded').lower()
+    
+    def get_grid_retries(self):
+        """创建会话失败时换节点重试的次数"""
+        return max(0, self.config.getint('grid', 'retries', fallback=2))
+    
+    def get_grid_cooldown(self):
+        """创建会话失败的节点暂停分配的时间(秒)"""
+        return max(0.0, self.config.getfloat('grid', 'cooldown', fallback=30))
+    
+    def get_grid_connections(self):
+        """每个节点复用的 HTTP 连接数，0 表示与浏览器池大小相同"""
+        return max(0, self.config.getint('grid', 'connections', fallback=0))
+    
+    def get_grid_command_timeout(self):
+        """远程命令的 HTTP 超时时间(秒)"""
+        return self.config.getfloat('grid', 'command_timeout', fallback=120)
+    
     # 测试相关配置
     def get_base_url(self):
         """获取测试基础URL"""
@@ -60,6 +271,36 @@ class Config:
         """获取超时时间(秒)"""
         return self.config.getint('test', 'timeout', fallback=10)
     
+    def get_test_order(self):
+        """用例排序策略列表，如 ['failed_first', 'longest_first']"""
+        return self.config.getlist('test', 'order', fallback=['name'])
+    
+    def is_element_cache_enabled(self):
+        """页面对象是否缓存已找到的元素"""
+        return self.config.getboolean('test', 'element_cache', fallback=True)
+    
+    # 等待相关配置
+    def get_wait_strategy(self):
+        """元素等待策略：event 为页面内事件驱动，poll 为轮询"""
+        return self.config.get('wait', 'strategy', fallback='event').lower()
+    
+    def get_wait_poll_floor(self):
+        """轮询等待的初始间隔(秒)"""
+        return max(0.001, self.config.getfloat('wait', 'poll_floor', fallback=0.05))
+    
+    def get_wait_poll_max(self):
+        """轮询等待的最大间隔(秒)"""
+        return max(self.get_wait_poll_floor(), self.config.getfloat('wait', 'poll_max', fallback=0.5))
+    
+    # 测试数据相关配置
+    def get_data_cache_size(self):
+        """获取测试数据内存缓存的文件数量上限"""
+        return max(1, self.config.getint('test_data', 'cache_size', fallback=16))
+    
+    def use_data_disk_cache(self):
+        """是否启用测试数据磁盘编译缓存"""
+        return self.config.getboolean('test_data', 'disk_cache', fallback=True)
+    
     # 日志相关配置
     def get_log_level(self):
         """获取日志级别"""
@@ -68,16 +309,99 @@ class Config:
     def get_log_format(self):
         """获取日志格式"""
         return self.config.get(
-            'log', 'format', 
+            'log', 'format',
             fallback='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
     
+    def is_async_log(self):
+        """是否通过后台线程异步输出日志"""
+        return self.config.getboolean('log', 'async', fallback=True)
+    
+    def get_log_max_bytes(self):
+        """单个日志文件大小上限(字节)，0 表示只按日期分割"""
+        return max(0, self.config.getint('log', 'max_bytes', fallback=10 * 1024 * 1024))
+    
+    def get_log_backup_count(self):
+        """同一天按大小轮转时保留的日志文件数量"""
+        return max(0, self.config.getint('log', 'backup_count', fallback=5))
+    
+    # 截图相关配置
+    def get_screenshot_workers(self):
+        """后台写入截图的线程数"""
+        return max(1, self.config.getint('screenshot', 'workers', fallback=2))
+    
+    def get_screenshot_max_width(self):
+        """截图最大宽度(像素)，超过时等比缩小，0 表示保持原始尺寸"""
+        return max(0, self.config.getint('screenshot', 'max_width', fallback=0))
+    
+    def is_screenshot_optimize(self):
+        """是否重新压缩截图"""
+        return self.config.getboolean('screenshot', 'optimize', fallback=False)
+    
+    def is_screenshot_dedup(self):
+        """内容相同的截图是否只保存一份"""
+        return self.config.getboolean('screenshot', 'dedup', fallback=True)
+    
+    def is_capture_failure_dom(self):
+        """用例失败时是否保存页面DOM"""
+        return self.config.getboolean('screenshot', 'failure_dom', fallback=True)
+    
+    def is_capture_failure_console_log(self):
+        """用例失败时是否保存浏览器控制台日志（仅 Chrome）"""
+        return self.config.getboolean('screenshot', 'failure_console_log', fallback=True)
+    
+    # 并发流程相关配置
+    def get_concurrency_sessions(self):
+        """concurrent_flow fixture 默认的并发会话数"""
+        return max(1, self.config.getint('concurrency', 'sessions', fallback=5))
+    
+    def get_concurrency_workers(self):
+        """执行并发流程和 AsyncPage 调用的线程数上限"""
+        return max(1, self.config.getint('concurrency', 'workers', fallback=16))
+    
+    # 登录会话缓存相关配置
+    def is_session_cache_enabled(self):
+        """是否缓存登录会话，后续用例直接注入Cookie和Storage而不再通过界面登录"""
+        return self.config.getboolean('session', 'cache', fallback=True)
+    
+    def get_session_ttl(self):
+        """登录会话快照的有效期(秒)，0 表示不过期"""
+        return max(0, self.config.getint('session', 'ttl', fallback=1800))
+    
+    # 性能统计相关配置
+    def is_perf_enabled(self):
+        """是否记录每条 WebDriver 命令的耗时"""
+        return self.config.getboolean('perf', 'enabled', fallback=True)
+    
+    def is_navigation_timing_enabled(self):
+        """打开页面后是否读取并记录 performance.timing 导航耗时"""
+        return self.config.getboolean('perf', 'navigation_timing', fallback=True)
+    
+    def get_perf_report_dir(self):
+        """WebDriver命令耗时报告目录"""
+        return self.config.get('perf', 'report_dir', fallback='reports/perf')
+    
+    def get_perf_top(self):
+        """会话结束时输出的最慢定位器/页面数量"""
+        return max(0, self.config.getint('perf', 'top', fallback=10))
+    
     # 报告相关配置
     def generate_allure(self):
-        """是否生成allure报告"""
+        """是否生成allure报告（测试结束后在后台进程中生成，不阻塞）"""
         return self.config.getboolean('report', 'generate_allure', fallback=True)
     
     def get_allure_report_dir(self):
         """获取allure报告目录"""
         return self.config.get('report', 'allure_report_dir', fallback='reports/allure')
-    
\ No newline at end of file
+    
+    def is_open_allure(self):
+        """生成allure报告后是否自动打开（无头模式和CI环境下始终不打开）"""
+        return self.config.getboolean('report', 'open_allure', fallback=True)
+    
+    def is_native_report_enabled(self):
+        """是否生成内置的流式结果报告（results.jsonl 和 summary.html）"""
+        return self.config.getboolean('report', 'native_report', fallback=True)
+    
+    def get_native_report_dir(self):
+        """内置结果报告目录"""
+        return self.config.get('report', 'native_report_dir', fallback='reports/native')
@@ -0,0 +1,370 @@
+import threading
+import time
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from selenium.webdriver.remote.command import Command
+from src.common.config import Config
+from src.common.exceptions import BrowserStartupException
+from src.common.logger import logger
+
+# 清理当前源下的 localStorage / sessionStorage
+CLEAR_STORAGE_SCRIPT = """
+try { window.localStorage && window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage && window.sessionStorage.clear(); } catch (e) {}
+"""
+
+PAGE_LOAD_STRATEGIES = ('normal', 'eager', 'none')
+
+# 多个用例共用浏览器（tab/context 执行模式）时，避免后台标签页被降频导致等待变慢
+BACKGROUND_TAB_ARGUMENTS = (
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding',
+)
+
+# Firefox 不支持按URL模式拦截，拦截列表中出现这些扩展名时通过首选项整体禁用对应资源
+FIREFOX_IMAGE_EXTENSIONS = ('png', 'jpg', 'jpeg', 'gif', 'webp', 'svg', 'ico', 'bmp')
+FIREFOX_FONT_EXTENSIONS = ('woff', 'woff2', 'ttf', 'otf', 'eot')
+
+def create_driver(config, browser_type=None):
+    """
+    根据配置创建浏览器驱动
+    :param config: Config 实例
+    :param browser_type: 浏览器类型，默认读取配置
+    :return: WebDriver 实例
+    """
+    browser_type = browser_type or config.get_browser_type()
+    logger.info(f"开始初始化 {browser_type} 浏览器驱动")
+    
+    page_load_strategy = config.get_page_load_strategy()
+    if page_load_strategy not in PAGE_LOAD_STRATEGIES:
+        raise ValueError(f"不支持的页面加载策略: {page_load_strategy}")
+    blocked_urls = config.get_blocked_urls()
+    
+    if browser_type == 'chrome':
+        options = ChromeOptions()
+        if config.is_headless():
+            options.add_argument('--headless')
+            options.add_argument('--disable-gpu')
+        # 添加其他常用配置
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        if config.get_execution_mode() != 'browser':
+            for argument in BACKGROUND_TAB_ARGUMENTS:
+                options.add_argument(argument)
+        options.page_load_strategy = page_load_strategy
+        if config.is_capture_failure_console_log():
+            # 默认只记录 SEVERE 级别的控制台日志
+            options.set_capability('goog:loggingPrefs', {'browser': 'ALL'})
+    elif browser_type == 'firefox':
+        options = FirefoxOptions()
+        if config.is_headless():
+            options.add_argument('--headless')
+        options.page_load_strategy = page_load_strategy
+        for name, value in _firefox_block_prefs(blocked_urls).items():
+            options.set_preference(name, value)
+    else:
+        raise ValueError(f"不支持的浏览器类型: {browser_type}")
+    
+    if config.is_grid_enabled():
+        # 远程节点上的浏览器，延迟导入避免未启用时加载
+        from src.common.grid import get_grid_backend
+        driver = get_grid_backend(config).create_driver(options)
+    elif browser_type == 'chrome':
+        driver = webdriver.Chrome(options=options)
+    else:
+        driver = webdriver.Firefox(options=options)
+    if browser_type == 'chrome' and blocked_urls:
+        _block_urls_by_devtools(driver, blocked_urls)
+    
+    # 设置窗口大小
+    width, height = _parse_window_size(config.get_window_size())
+    driver.set_window_size(width, height)
+    
+    logger.info(f"{browser_type} 浏览器驱动初始化完成")
+    return driver
+
+def _block_urls_by_devtools(driver, patterns):
+    """通过 Chrome DevTools 拦截匹配的请求，设置对该浏览器的后续导航一直有效"""
+    if not hasattr(driver, 'execute_cdp_cmd'):
+        logger.warning("远程浏览器不支持 DevTools 命令，忽略URL拦截配置")
+        return
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        logger.info(f"已拦截 {len(patterns)} 个URL模式: {patterns}")
+    except WebDriverException as e:
+        logger.warning(f"DevTools 设置URL拦截失败: {str(e)}")
+
+def _firefox_block_prefs(patterns):
+    """把拦截列表转换为 Firefox 首选项：只能按图片/字体类型整体禁用，其余模式忽略并提示"""
+    prefs = {}
+    unsupported = []
+    for pattern in patterns:
+        extension = pattern.rsplit('.', 1)[-1].strip('*').lower()
+        if extension in FIREFOX_IMAGE_EXTENSIONS:
+            prefs['permissions.default.image'] = 2
+        elif extension in FIREFOX_FONT_EXTENSIONS:
+            prefs['gfx.downloadable_fonts.enabled'] = False
+        else:
+            unsupported.append(pattern)
+    if unsupported:
+        logger.warning(f"Firefox 不支持按URL模式拦截，已忽略: {unsupported}")
+    return prefs
+
+def _parse_window_size(window_size):
+    """将 '1920,1080' 格式的窗口大小解析为 (宽, 高)"""
+    width, height = map(int, window_size.split(','))
+    return width, height
+
+def _origin_of(url):
+    """http/https URL 的源，其他URL（about:blank、data: 等）返回 None"""
+    parts = urlsplit(url or '')
+    if parts.scheme not in ('http', 'https'):
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+def _track_origins(driver):
+    """记录浏览器通过 get 访问过的源，归还时逐个清理这些源下的存储，同一个驱动只安装一次"""
+    if hasattr(driver, '_visited_origins'):
+        return driver
+    execute = driver.execute
+    origins = driver._visited_origins = set()
+    
+    def tracked_execute(driver_command, params=None):
+        if driver_command == Command.GET and params:
+            origin = _origin_of(params.get('url'))
+            if origin:
+                origins.add(origin)
+        return execute(driver_command, params)
+    driver.execute = tracked_execute
+    return driver
+
+class PooledDriver:
+    """池中的浏览器实例，记录复用次数"""
+    
+    def __init__(self, driver, browser_type):
+        self.driver = driver
+        self.browser_type = browser_type
+        self.uses = 0
+
+class DriverPool:
+    """
+    浏览器池：在多个测试之间复用已启动的浏览器
+    每次归还时重置浏览器状态（Cookie、Storage、多余窗口、about:blank），
+    健康检查失败或复用次数达到上限时回收并重新启动
+    可通过 prewarm 在后台线程中提前并行启动浏览器，acquire 优先使用已就绪的浏览器
+    """
+    
+    def __init__(self, config=None, browser_type=None, size=None, max_uses=None):
+        self.config = config or Config()
+        self.browser_type = browser_type or self.config.get_browser_type()
+        self.size = size or self.config.get_pool_size()
+        self.max_uses = self.config.get_pool_max_uses() if max_uses is None else max_uses
+        self.window_size = _parse_window_size(self.config.get_window_size())
+        self.startup_timeout = self.config.get_startup_timeout()
+        
+        self._idle = []
+        self._starting = []
+        self._total = 0
+        self._closed = False
+        self._executor = None
+        self._condition = threading.Condition()
+    
+    def prewarm(self, count=None):
+        """
+        在后台线程中并行启动浏览器，立即返回
+        :param count: 启动数量，默认读取配置，不超过池中的空闲名额
+        """
+        count = self.config.get_prewarm_count() if count is None else count
+        with self._condition:
+            count = min(count, self.size - self._total)
+            if self._closed or count <= 0:
+                return 0
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix='browser-startup')
+            self._total += count
+            for _ in range(count):
+                self._starting.append(self._executor.submit(self._start_driver))
+        logger.info(f"开始在后台预启动 {count} 个 {self.browser_type} 浏览器")
+        return count
+    
+    def _start_driver(self):
+        start = time.perf_counter()
+        try:
+            driver = create_driver(self.config, self.browser_type)
+        except Exception as e:
+            logger.error(f"预启动 {self.browser_type} 浏览器失败: {str(e)}")
+            raise
+        logger.info(f"预启动 {self.browser_type} 浏览器完成，耗时 {time.perf_counter() - start:.2f} 秒")
+        return driver
+    
+    def _wait_started(self, future):
+        """等待预启动的浏览器就绪，失败或超时时释放名额并抛出 BrowserStartupException"""
+        try:
+            driver = future.result(timeout=self.startup_timeout or None)
+        except FutureTimeoutError:
+            # 启动完成后直接关闭，不再放回池中
+            future.add_done_callback(self._quit_started)
+            self._discard_slot()
+            raise BrowserStartupException(
+                f"预启动的 {self.browser_type} 浏览器在 {self.startup_timeout} 秒内未就绪，"
+                f"请检查浏览器和驱动版本，或调大 [browser] startup_timeout"
+            )
+        except Exception as e:
+            self._discard_slot()
+            raise BrowserStartupException(f"预启动 {self.browser_type} 浏览器失败: {str(e).strip()}") from e
+        return PooledDriver(driver, self.browser_type)
+    
+    def _quit_started(self, future):
+        if not future.cancelled() and future.exception() is None:
+            self._quit(future.result())
+    
+    def acquire(self):
+        """
+        从池中获取一个可用的浏览器，优先使用空闲的和预启动的浏览器，池满时等待其他测试归还
+        等待超过 startup_timeout 仍没有浏览器归还时抛出 BrowserStartupException
+        """
+        starting = None
+        deadline = time.monotonic() + self.startup_timeout if self.startup_timeout else None
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("浏览器池已关闭")
+                if self._idle:
+                    pooled = self._idle.pop()
+                    break
+                if self._starting:
+                    starting = self._starting.pop(0)
+                    pooled = None
+                    break
+                if self._total < self.size:
+                    self._total += 1
+                    pooled = None
+                    break
+                remaining = deadline - time.monotonic() if deadline else None
+                if remaining is not None and remaining <= 0:
+                    raise BrowserStartupException(
+                        f"浏览器池已满({self.size} 个)，等待 {self.startup_timeout} 秒仍没有浏览器归还"
+                    )
+                self._condition.wait(remaining)
+        
+        if starting is not None:
+            pooled = self._wait_started(starting)
+        elif pooled is not None and not self._is_healthy(pooled.driver):
+            logger.warning(f"浏览器健康检查失败，重新启动 {self.browser_type} 浏览器")
+            self._quit(pooled.driver)
+            pooled = None
+        
+        if pooled is None:
+            try:
+                pooled = PooledDriver(create_driver(self.config, self.browser_type), self.browser_type)
+            except Exception:
+                self._discard_slot()
+                raise
+        
+        _track_origins(pooled.driver)
+        pooled.uses += 1
+        logger.info(f"从浏览器池获取 {self.browser_type} 浏览器，第 {pooled.uses} 次使用")
+        return pooled
+    
+    def release(self, pooled, broken=False):
+        """
+        归还浏览器
+        :param pooled: acquire 返回的 PooledDriver
+        :param broken: 为 True 时直接回收，不再复用
+        """
+        recycle = broken or (self.max_uses and pooled.uses >= self.max_uses)
+        if not recycle:
+            try:
+                self._reset(pooled.driver)
+            except Exception as e:
+                # 浏览器驱动进程退出时抛出的是连接错误（如 urllib3 的 MaxRetryError）而不是 WebDriverException
+                logger.warning(f"重置浏览器状态失败，回收该浏览器: {str(e)}")
+                recycle = True
+        
+        if recycle or self._closed:
+            logger.info(f"回收 {self.browser_type} 浏览器，已使用 {pooled.uses} 次")
+            self._quit(pooled.driver)
+            self._discard_slot()
+            return
+        
+        with self._condition:
+            self._idle.append(pooled)
+            self._condition.notify()
+    
+    def close(self):
+        """关闭浏览器池中的所有浏览器，尚未启动完成的预启动浏览器在启动完成后关闭"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            starting, self._starting = self._starting, []
+            self._total -= len(idle) + len(starting)
+            self._condition.notify_all()
+        for future in starting:
+            if not future.cancel():
+                future.add_done_callback(self._quit_started)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        for pooled in idle:
+            logger.info(f"关闭 {self.browser_type} 浏览器驱动")
+            self._quit(pooled.driver)
+    
+    def _reset(self, driver):
+        """
+        重置浏览器状态，保证测试之间相互隔离
+        Chrome 通过 DevTools 清理所有 Cookie 和用例访问过的每个源的存储（localStorage、IndexedDB 等），
+        其他浏览器只能清理当前源的存储
+        """
+        origins = set(getattr(driver, '_visited_origins', ()))
+        # 关闭多余窗口，只保留第一个；链接跳转等不经过 get 的页面按各窗口当前的URL补充
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            origins.add(_origin_of(driver.current_url))
+            driver.close()
+        driver.switch_to.window(handles[0])
+        origins.add(_origin_of(driver.current_url))
+        origins.discard(None)
+        
+        # 清理当前源的存储和 Cookie
+        driver.execute_script(CLEAR_STORAGE_SCRIPT)
+        driver.delete_all_cookies()
+        if hasattr(driver, 'execute_cdp_cmd'):
+            try:
+                driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            except WebDriverException as e:
+                logger.warning(f"DevTools 清理 Cookie 失败: {str(e).strip()}")
+            for origin in sorted(origins):
+                try:
+                    driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+                except WebDriverException as e:
+                    logger.warning(f"DevTools 清理 {origin} 的存储失败: {str(e).strip()}")
+        if hasattr(driver, '_visited_origins'):
+            driver._visited_origins.clear()
+        
+        driver.get('about:blank')
+        driver.set_window_size(*self.window_size)
+    
+    def _is_healthy(self, driver):
+        """健康检查：浏览器进程仍能正常响应命令"""
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+    
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"关闭浏览器失败: {str(e)}")
+    
+    def _discard_slot(self):
+        with self._condition:
+            self._total -= 1
+            self._condition.notify()
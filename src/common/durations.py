@@ -0,0 +1,113 @@
+import json
+import os
+from src.common.logger import logger
+
+# 本地缓存目录
+CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    '.cache'
+)
+
+# 没有历史记录的用例按该耗时估算(秒)
+DEFAULT_DURATION = 1.0
+
+# 用例结果，多个阶段结果不同时取最严重的
+OUTCOME_SEVERITY = {'passed': 0, 'skipped': 1, 'failed': 2}
+
+class DurationStore:
+    """测试用例耗时和结果历史，持久化到本地JSON文件，用于并行分片和用例排序"""
+    
+    def __init__(self, path=None):
+        self.path = path or os.path.join(CACHE_DIR, 'durations.json')
+        self.durations = {}
+        self.outcomes = {}
+        self._pending = {}
+        self._pending_outcomes = {}
+        self._load()
+    
+    def _load(self):
+        """加载历史耗时数据"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"耗时历史文件损坏，忽略: {self.path}, {str(e)}")
+            return
+        # 旧格式只有 {用例ID: 耗时}
+        if 'durations' in data and isinstance(data['durations'], dict):
+            self.durations = data['durations']
+            self.outcomes = data.get('outcomes') or {}
+        else:
+            self.durations = data
+    
+    def get(self, node_id, default=None):
+        """获取用例的历史耗时，没有记录时返回已知耗时的中位数"""
+        if node_id in self.durations:
+            return self.durations[node_id]
+        if default is not None:
+            return default
+        return self.median()
+    
+    def median(self):
+        """已知耗时的中位数"""
+        if not self.durations:
+            return DEFAULT_DURATION
+        values = sorted(self.durations.values())
+        return values[len(values) // 2]
+    
+    def record(self, node_id, duration, weight=0.5):
+        """记录一次耗时，与历史值做指数平滑，避免单次波动影响分片"""
+        previous = self.durations.get(node_id)
+        if previous is None:
+            self.durations[node_id] = duration
+        else:
+            self.durations[node_id] = previous * (1 - weight) + duration * weight
+    
+    def record_phase(self, node_id, when, duration, outcome=None):
+        """累计 setup/call/teardown 各阶段耗时和结果，teardown 结束时记录总耗时和最终结果"""
+        self._pending[node_id] = self._pending.get(node_id, 0.0) + duration
+        if outcome is not None:
+            previous = self._pending_outcomes.get(node_id)
+            if previous is None or OUTCOME_SEVERITY.get(outcome, 0) > OUTCOME_SEVERITY.get(previous, 0):
+                self._pending_outcomes[node_id] = outcome
+        if when == 'teardown':
+            self.record(node_id, self._pending.pop(node_id))
+            outcome = self._pending_outcomes.pop(node_id, None)
+            if outcome is not None:
+                self.outcomes[node_id] = outcome
+    
+    def failed(self, node_id):
+        """用例上一次执行是否失败"""
+        return self.outcomes.get(node_id) == 'failed'
+    
+    def merge(self, other_path):
+        """合并其他进程写出的耗时文件"""
+        other = DurationStore(other_path)
+        for node_id, duration in other.durations.items():
+            self.record(node_id, duration)
+        self.outcomes.update(other.outcomes)
+    
+    def save(self):
+        """保存耗时和结果数据"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'durations': self.durations, 'outcomes': self.outcomes},
+                      f, ensure_ascii=False, indent=0, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+def split_into_shards(node_ids, workers, store):
+    """
+    按历史耗时把用例分配给多个worker，使各分片总耗时接近
+    采用最长处理时间优先的贪心算法：用例按耗时倒序，依次放入当前总耗时最小的分片
+    :return: 分片列表，每个分片为 (预计耗时, 用例ID列表)
+    """
+    shards = [[0.0, []] for _ in range(max(1, workers))]
+    default = store.median()
+    for node_id in sorted(node_ids, key=lambda n: store.get(n, default), reverse=True):
+        shard = min(shards, key=lambda s: s[0])
+        shard[0] += store.get(node_id, default)
+        shard[1].append(node_id)
+    return [(total, ids) for total, ids in shards if ids]
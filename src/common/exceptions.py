@@ -16,6 +16,10 @@ class TimeoutException(AutomationException):
     """超时异常"""
     pass
 
+class BrowserStartupException(AutomationException):
+    """浏览器启动失败或超时"""
+    pass
+
 class TestDataException(AutomationException):
     """测试数据异常"""
     pass
@@ -23,4 +27,12 @@ class TestDataException(AutomationException):
 class ConfigurationException(AutomationException):
     """配置异常"""
     pass
-    
\ No newline at end of file
+
+class SoftAssertionError(AutomationException, AssertionError):
+    """软断言异常，汇总软断言上下文中的所有断言失败"""
+    
+    def __init__(self, failures):
+        self.failures = list(failures)
+        lines = [f"{len(self.failures)} 个断言失败:"]
+        lines += [f"  {index}. {failure}" for index, failure in enumerate(self.failures, 1)]
+        super().__init__('\n'.join(lines))
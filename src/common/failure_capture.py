@@ -0,0 +1,73 @@
+import threading
+from src.common.config import Config
+from src.common.logger import logger
+from src.common.perf import current_test_id
+from src.common.screenshot import get_screenshot_writer
+
+def _format_console_log(entries):
+    return '\n'.join(f"{entry.get('timestamp', '')} {entry.get('level', '')} {entry.get('message', '')}"
+                     for entry in entries)
+
+def capture_failure_artifacts(driver, name_prefix="test_failure", config=None):
+    """
+    采集失败现场：截图、页面DOM和浏览器控制台日志，文件在后台线程中写入
+    :return: {'screenshot': 路径, 'dom': 路径, 'console_log': 路径}，没有采集到的项不在结果中
+    """
+    config = config or Config()
+    writer = get_screenshot_writer()
+    futures = {}
+    try:
+        futures['screenshot'] = writer.capture(driver, name_prefix)
+    except Exception as e:
+        logger.error(f"截图失败: {str(e)}")
+    if config.is_capture_failure_dom():
+        try:
+            futures['dom'] = writer.save_text(driver.page_source, name_prefix, 'html')
+        except Exception as e:
+            logger.warning(f"获取页面DOM失败: {str(e)}")
+    if config.is_capture_failure_console_log():
+        # 只有 Chrome 支持读取控制台日志，其他浏览器跳过
+        try:
+            entries = driver.get_log('browser')
+        except Exception as e:
+            logger.debug(f"无法读取浏览器控制台日志: {str(e)}")
+            entries = None
+        if entries:
+            futures['console_log'] = writer.save_text(_format_console_log(entries), name_prefix, 'log')
+    
+    artifacts = {}
+    for name, future in futures.items():
+        path = future.result()
+        if path:
+            artifacts[name] = path
+    return artifacts
+
+class FailureCapture:
+    """
+    失败现场采集请求：用例中的断言失败时只登记请求，由 pytest 的失败钩子在用例结束时统一采集一次，
+    同一用例的多个断言失败不会重复截图
+    """
+    
+    def __init__(self):
+        self._requests = {}
+        self._lock = threading.Lock()
+    
+    def request(self, driver, reason):
+        """
+        登记采集请求，同一用例保留第一次登记的 driver
+        不在 pytest 用例中执行时没有失败钩子，立即采集
+        """
+        test_id = current_test_id()
+        if not test_id:
+            capture_failure_artifacts(driver, "assert_failure")
+            return
+        with self._lock:
+            pending = self._requests.setdefault(test_id, {'driver': driver, 'reasons': []})
+            pending['reasons'].append(reason)
+    
+    def pop(self, test_id):
+        """取出用例的采集请求，没有时返回 None"""
+        with self._lock:
+            return self._requests.pop(test_id, None)
+
+failure_capture = FailureCapture()
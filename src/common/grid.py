@@ -0,0 +1,199 @@
+import itertools
+import threading
+import time
+from src.common.config import Config
+from src.common.exceptions import BrowserStartupException, ConfigurationException
+from src.common.logger import logger
+
+GRID_STRATEGIES = ('least_loaded', 'round_robin')
+
+def parse_endpoint(value, default_capacity):
+    """解析 'http://host:4444|4' 形式的节点配置，省略容量时使用默认容量"""
+    url, _, capacity = value.partition('|')
+    url = url.strip().rstrip('/')
+    try:
+        capacity = int(capacity) if capacity.strip() else default_capacity
+    except ValueError:
+        raise ConfigurationException(f"节点容量必须是整数: {value}")
+    if not url.startswith(('http://', 'https://')) or capacity < 1:
+        raise ConfigurationException(f"无效的远程节点配置: {value}")
+    return url, capacity
+
+class GridNode:
+    """远程 WebDriver 节点：容量、当前会话数和复用的 HTTP 连接池"""
+    
+    def __init__(self, url, capacity):
+        self.url = url
+        self.capacity = capacity
+        self.active = 0
+        self.sessions = 0
+        self.failures = 0
+        self.unavailable_until = 0.0
+        self.pool_manager = None
+    
+    @property
+    def load(self):
+        return self.active / self.capacity
+    
+    def is_available(self, now):
+        return self.active < self.capacity and now >= self.unavailable_until
+    
+    def __repr__(self):
+        return f"<GridNode {self.url} {self.active}/{self.capacity}>"
+
+class GridBackend:
+    """
+    远程浏览器后端：把会话分配到多个 Selenium 节点（Grid、standalone 或直接启动的 chromedriver/geckodriver）
+    按 least_loaded 或 round_robin 选择有空闲容量的节点，创建会话失败时换一个节点重试，
+    失败的节点在冷却时间内不再分配；同一节点的所有会话共用一个 keep-alive 连接池
+    """
+    
+    def __init__(self, config=None):
+        config = config or Config()
+        capacity = config.get_grid_capacity()
+        self.nodes = [GridNode(*parse_endpoint(value, capacity)) for value in config.get_grid_endpoints()]
+        if not self.nodes:
+            raise ConfigurationException("已启用 [grid]，但没有配置 endpoints")
+        self.strategy = config.get_grid_strategy()
+        if self.strategy not in GRID_STRATEGIES:
+            raise ConfigurationException(f"不支持的节点选择策略: {self.strategy}，可选: {', '.join(GRID_STRATEGIES)}")
+        self.retries = config.get_grid_retries()
+        self.cooldown = config.get_grid_cooldown()
+        self.connections = config.get_grid_connections() or config.get_pool_size()
+        self.command_timeout = config.get_grid_command_timeout()
+        self.wait_timeout = config.get_startup_timeout()
+        self._round_robin = itertools.cycle(range(len(self.nodes)))
+        self._condition = threading.Condition()
+    
+    def _pick(self, excluded):
+        now = time.monotonic()
+        candidates = [node for node in self.nodes if node not in excluded and node.is_available(now)]
+        if not candidates:
+            return None
+        if self.strategy == 'least_loaded':
+            return min(candidates, key=lambda node: node.load)
+        for _ in range(len(self.nodes)):
+            node = self.nodes[next(self._round_robin)]
+            if node in candidates:
+                return node
+        return None
+    
+    def _reserve(self, excluded):
+        """占用一个节点的名额，所有节点都满时等待其他会话结束"""
+        deadline = time.monotonic() + self.wait_timeout if self.wait_timeout else None
+        with self._condition:
+            while True:
+                node = self._pick(excluded)
+                if node is not None:
+                    node.active += 1
+                    return node
+                # 其余节点都试过或在冷却中时不再等待
+                now = time.monotonic()
+                if all(node in excluded or node.unavailable_until > now for node in self.nodes):
+                    return None
+                remaining = deadline - now if deadline else None
+                if remaining is not None and remaining <= 0:
+                    raise BrowserStartupException(
+                        f"等待远程节点空闲名额超时({self.wait_timeout} 秒)，节点: {self.nodes}"
+                    )
+                self._condition.wait(remaining)
+    
+    def _release(self, node):
+        with self._condition:
+            node.active -= 1
+            self._condition.notify()
+    
+    def _connection(self, node):
+        """节点的命令连接，复用该节点共享的 urllib3 连接池"""
+        from selenium.webdriver.remote.remote_connection import RemoteConnection
+        import urllib3
+        
+        with self._condition:
+            if node.pool_manager is None:
+                node.pool_manager = urllib3.PoolManager(
+                    num_pools=1, maxsize=self.connections, block=False,
+                    timeout=urllib3.Timeout(total=self.command_timeout)
+                )
+        connection = RemoteConnection(node.url, keep_alive=True)
+        # RemoteConnection 默认为每个会话新建连接池，替换为节点共享的连接池
+        if hasattr(connection, '_conn'):
+            connection._conn.clear()
+            connection._conn = node.pool_manager
+        else:
+            logger.warning(f"当前 selenium 版本的 RemoteConnection 没有 _conn 属性，"
+                           f"节点 {node.url} 的会话无法共用连接池，每个会话使用各自的连接")
+        return connection
+    
+    def create_driver(self, options):
+        """
+        在远程节点上创建会话
+        :param options: 浏览器 Options，决定远程启动的浏览器类型和参数
+        :return: Remote WebDriver，quit 时自动释放节点名额
+        """
+        from selenium import webdriver
+        
+        tried, errors = [], []
+        for _ in range(self.retries + 1):
+            node = self._reserve(tried)
+            if node is None:
+                break
+            tried.append(node)
+            start = time.perf_counter()
+            try:
+                driver = webdriver.Remote(command_executor=self._connection(node), options=options)
+            except Exception as e:
+                self._release(node)
+                node.failures += 1
+                node.unavailable_until = time.monotonic() + self.cooldown
+                errors.append(f"{node.url}: {str(e).strip()}")
+                logger.warning(f"远程节点 {node.url} 创建会话失败，{self.cooldown} 秒内不再分配: {str(e).strip()}")
+                continue
+            node.sessions += 1
+            logger.info(f"远程节点 {node.url} 创建会话完成，耗时 {time.perf_counter() - start:.2f} 秒，"
+                        f"当前 {node.active}/{node.capacity}")
+            self._bind_release(driver, node)
+            return driver
+        raise BrowserStartupException(
+            f"在远程节点上创建会话失败，已尝试 {len(tried)} 个节点: {'; '.join(errors) or '没有可用节点'}"
+        )
+    
+    def _bind_release(self, driver, node):
+        """driver.quit() 后释放节点名额，重复 quit 只释放一次"""
+        quit = driver.quit
+        released = threading.Event()
+        
+        def quit_and_release():
+            try:
+                quit()
+            finally:
+                if not released.is_set():
+                    released.set()
+                    self._release(node)
+        driver.quit = quit_and_release
+        driver._grid_node = node
+    
+    def close(self):
+        """关闭所有节点的连接池"""
+        for node in self.nodes:
+            if node.pool_manager is not None:
+                node.pool_manager.clear()
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_grid_backend(config=None):
+    """获取进程内共享的远程浏览器后端，第一次使用时创建"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = GridBackend(config)
+    return _backend
+
+def shutdown_grid_backend():
+    """关闭远程浏览器后端的连接池，测试会话结束、所有浏览器关闭后调用"""
+    global _backend
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+            _backend = None
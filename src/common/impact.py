@@ -0,0 +1,249 @@
+import ast
+import inspect
+import json
+import os
+import subprocess
+import threading
+from src.common.config import PROJECT_ROOT
+from src.common.logger import logger
+from src.common.perf import current_test_id
+
+# 依赖索引默认路径
+INDEX_PATH = os.path.join(PROJECT_ROOT, '.cache', 'impact_index.json')
+
+# 索引格式版本，修改结构时递增
+INDEX_VERSION = 1
+
+# 测试数据文件扩展名，测试代码中以字符串出现时视为依赖的数据文件
+DATA_EXTENSIONS = ('.json', '.jsonl', '.yaml', '.yml', '.xlsx', '.xls', '.csv')
+
+# 修改后影响所有用例的文件（相对项目根目录，以 / 结尾的为目录）
+GLOBAL_FILES = ('configs/', 'requirements.txt', 'pytest.ini', 'setup.cfg', 'tox.ini', 'pyproject.toml')
+
+def relative_path(path):
+    """转换为相对项目根目录的 posix 路径，项目外的文件返回 None"""
+    path = os.path.relpath(os.path.abspath(path), PROJECT_ROOT)
+    if path.startswith('..'):
+        return None
+    return path.replace(os.sep, '/')
+
+def changed_files(ref):
+    """自 ref 以来修改的文件（含未提交和未跟踪的文件），返回相对项目根目录的路径集合"""
+    def git(*args):
+        result = subprocess.run(['git', *args], cwd=PROJECT_ROOT, capture_output=True, text=True, encoding='utf-8')
+        if result.returncode != 0:
+            raise RuntimeError(f"git {' '.join(args)} 执行失败: {result.stderr.strip()}")
+        return result.stdout
+    
+    toplevel = git('rev-parse', '--show-toplevel').strip()
+    names = git('diff', '--name-only', ref).splitlines()
+    names += git('ls-files', '--others', '--exclude-standard', '--full-name').splitlines()
+    files = set()
+    for name in names:
+        path = relative_path(os.path.join(toplevel, name)) if name.strip() else None
+        if path:
+            files.add(path)
+    return files
+
+class DependencyRecorder:
+    """运行时依赖记录：用例执行过程中实际使用的页面对象类文件和测试数据文件"""
+    
+    def __init__(self):
+        self.dependencies = {}
+        self.page_files = set()
+        self._class_files = {}
+        self._lock = threading.Lock()
+    
+    def touch(self, node_id):
+        """登记执行过的用例，没有任何依赖的用例也会记录，避免被视为索引缺失"""
+        with self._lock:
+            self.dependencies.setdefault(node_id, set())
+    
+    def note(self, path):
+        """当前用例依赖 path"""
+        node_id = current_test_id()
+        path = relative_path(path) if path else None
+        if not node_id or not path:
+            return
+        with self._lock:
+            self.dependencies.setdefault(node_id, set()).add(path)
+    
+    def note_class(self, cls):
+        """当前用例使用了 cls，记录其继承链上所有项目内类所在的文件（页面对象及其定位器）"""
+        files = self._class_files.get(cls)
+        if files is None:
+            files = []
+            for klass in cls.__mro__:
+                try:
+                    path = relative_path(inspect.getfile(klass))
+                except TypeError:
+                    continue
+                if path and path not in files:
+                    files.append(path)
+            self._class_files[cls] = files
+            self.page_files.update(files)
+        for path in files:
+            self.note(os.path.join(PROJECT_ROOT, path))
+
+dependency_recorder = DependencyRecorder()
+
+def _module_file(module, project_root):
+    """把模块名解析为项目内的文件，不在项目内时返回 None"""
+    base = os.path.join(project_root, *module.split('.'))
+    for candidate in (base + '.py', os.path.join(base, '__init__.py')):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+def parse_file(path, project_root=PROJECT_ROOT):
+    """
+    解析单个 Python 文件
+    :return: (导入的项目内文件列表, 以字符串出现的测试数据文件列表)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    package = os.path.relpath(os.path.dirname(path), project_root).replace(os.sep, '.')
+    imports, data_files = set(), set()
+    for node in ast.walk(tree):
+        modules = []
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                parts = package.split('.')
+                prefix = '.'.join(parts[:len(parts) - node.level + 1])
+                base = f"{prefix}.{node.module}" if node.module else prefix
+            else:
+                base = node.module or ''
+            # from a.b import c 中的 c 可能是模块，也可能是 a.b 中的名称
+            modules = [base] + [f"{base}.{alias.name}" for alias in node.names]
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+            if node.value.lower().endswith(DATA_EXTENSIONS) and '\n' not in node.value:
+                data_files.add(f"test_data/{node.value}")
+        for module in modules:
+            module_file = _module_file(module, project_root) if module else None
+            if module_file:
+                imports.add(relative_path(module_file))
+    return sorted(imports), sorted(data_files)
+
+class ImpactIndex:
+    """
+    用例依赖索引：静态部分为测试文件的导入闭包和引用的数据文件，
+    运行时部分为每个用例实际使用的页面对象文件和数据文件
+    页面对象文件以运行时记录为准：用例所在文件导入了但用例没有使用的页面对象不算依赖
+    静态解析结果按文件修改时间缓存，运行时部分在每次执行后更新
+    """
+    
+    def __init__(self, path=None):
+        self.path = path or INDEX_PATH
+        self.files = {}
+        self.runtime = {}
+        self.page_files = set()
+        self._closures = {}
+        self._load()
+    
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"依赖索引文件损坏，忽略: {self.path}, {str(e)}")
+            return
+        if data.get('version') != INDEX_VERSION:
+            logger.info("依赖索引版本不一致，重新建立")
+            return
+        self.files = data.get('files', {})
+        self.runtime = data.get('runtime', {})
+        self.page_files = set(data.get('page_files', []))
+    
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'files': self.files, 'runtime': self.runtime,
+                       'page_files': sorted(self.page_files)},
+                      f, ensure_ascii=False, indent=0, sort_keys=True)
+        os.replace(tmp_path, self.path)
+    
+    def update_runtime(self, recorder):
+        """用本次执行的运行时依赖（DependencyRecorder）覆盖对应用例的记录"""
+        for node_id, paths in recorder.dependencies.items():
+            self.runtime[node_id] = sorted(paths)
+        self.page_files.update(recorder.page_files)
+        return self
+    
+    def merge(self, other_path):
+        """合并其他进程写出的索引（并行执行时各worker分别记录）"""
+        other = ImpactIndex(other_path)
+        self.runtime.update(other.runtime)
+        self.files.update(other.files)
+        self.page_files.update(other.page_files)
+    
+    def _parsed(self, path):
+        """静态解析结果，文件未修改时直接使用缓存"""
+        full_path = os.path.join(PROJECT_ROOT, path)
+        stat = os.stat(full_path)
+        entry = self.files.get(path)
+        if entry and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size:
+            return entry['imports'], entry['data']
+        imports, data_files = parse_file(full_path)
+        self.files[path] = {'mtime': stat.st_mtime, 'size': stat.st_size, 'imports': imports, 'data': data_files}
+        return imports, data_files
+    
+    def static_dependencies(self, test_file, skip=frozenset()):
+        """
+        测试文件的静态依赖：导入闭包、引用的数据文件和所在目录及上级目录的 conftest.py
+        :param skip: 不计入也不继续展开的文件（用例没有使用的页面对象）
+        """
+        key = (test_file, skip)
+        if key in self._closures:
+            return self._closures[key]
+        roots = [test_file]
+        directory = os.path.dirname(test_file)
+        while directory:
+            roots.append(f"{directory}/conftest.py")
+            directory = os.path.dirname(directory)
+        
+        deps, pending = set(), roots
+        while pending:
+            path = pending.pop()
+            if path in deps or path in skip or not os.path.isfile(os.path.join(PROJECT_ROOT, path)):
+                continue
+            deps.add(path)
+            imports, data_files = self._parsed(path)
+            if path == test_file:
+                deps.update(data_files)
+            pending.extend(imports)
+        self._closures[key] = deps
+        return deps
+    
+    def select(self, node_ids, changed):
+        """
+        选出受修改影响的用例
+        :return: (用例ID列表, 原因)，需要执行全部用例时用例ID列表为 None
+        """
+        global_changes = sorted(
+            path for path in changed
+            if any(path.startswith(name) if name.endswith('/') else path == name for name in GLOBAL_FILES)
+        )
+        if global_changes:
+            return None, f"全局文件已修改: {global_changes}"
+        
+        unknown = [node_id for node_id in node_ids
+                   if node_id not in self.runtime and node_id.split('::', 1)[0] not in changed]
+        if unknown:
+            return None, f"依赖索引已过期，{len(unknown)} 个用例没有运行时依赖记录（如 {unknown[0]}）"
+        
+        selected = []
+        for node_id in node_ids:
+            test_file = node_id.split('::', 1)[0]
+            if test_file in changed:
+                selected.append(node_id)
+                continue
+            runtime = self.runtime[node_id]
+            static = self.static_dependencies(test_file, frozenset(self.page_files.difference(runtime)))
+            if changed & static or changed.intersection(runtime):
+                selected.append(node_id)
+        return selected, f"{len(changed)} 个文件修改，影响 {len(selected)}/{len(node_ids)} 个用例"
@@ -0,0 +1,50 @@
+"""延迟导入工具：重量级依赖在第一次使用时才导入，缩短用例收集和启动时间"""
+import functools
+import importlib
+import threading
+
+class _LazyModule:
+    """模块代理，第一次访问属性时才真正导入模块"""
+    
+    def __init__(self, module_name):
+        self._module_name = module_name
+        self._module = None
+        self._lock = threading.Lock()
+    
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._module_name)
+        return self._module
+    
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+    
+    def __repr__(self):
+        state = "已加载" if self._module is not None else "未加载"
+        return f"<延迟导入模块 {self._module_name} ({state})>"
+
+def lazy_import(module_name):
+    """
+    返回延迟导入的模块代理
+    :param module_name: 模块名，如 'allure'、'pandas'
+    """
+    return _LazyModule(module_name)
+
+def allure_step(title):
+    """
+    与 allure.step 等价的装饰器，但在函数第一次被调用时才导入 allure
+    :param title: 步骤标题，支持 allure.step 的参数占位符
+    """
+    def decorator(func):
+        step_func = None
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal step_func
+            if step_func is None:
+                step_func = importlib.import_module('allure').step(title)(func)
+            return step_func(*args, **kwargs)
+        return wrapper
+    return decorator
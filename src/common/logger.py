@@ -1,24 +1,72 @@
+import atexit
 import logging
 import os
-from datetime import datetime
-from src.common.config import Config
+import queue
+import threading
+from datetime import datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from src.common.config import Config, PROJECT_ROOT
+
+class DailySizeRotatingFileHandler(RotatingFileHandler):
+    """
+    按日期切换日志文件（test_YYYY-MM-DD.log），单个文件超过大小上限时再按序号轮转
+    按大小轮转不支持多个进程写同一个文件，并行执行时每个worker通过 name_suffix 写入各自的文件
+    """
+    
+    def __init__(self, log_dir, max_bytes=0, backup_count=0, name_suffix=''):
+        self.log_dir = log_dir
+        self.name_suffix = name_suffix
+        self._set_date(datetime.now())
+        super().__init__(self._file_for_date(), maxBytes=max_bytes, backupCount=backup_count,
+                         encoding='utf-8', delay=True)
+    
+    def _set_date(self, now):
+        self.current_date = now.strftime('%Y-%m-%d')
+        next_day = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        self.next_date_rollover = next_day.timestamp()
+    
+    def _file_for_date(self):
+        return os.path.join(self.log_dir, f"test_{self.current_date}{self.name_suffix}.log")
+    
+    def shouldRollover(self, record):
+        if record.created >= self.next_date_rollover:
+            return True
+        return super().shouldRollover(record)
+    
+    def doRollover(self):
+        if datetime.now().timestamp() >= self.next_date_rollover:
+            # 日期变化：关闭旧文件，后续日志写入新日期的文件
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+            self._set_date(datetime.now())
+            self.baseFilename = os.path.abspath(self._file_for_date())
+            return
+        super().doRollover()
+
+class LocalQueueHandler(QueueHandler):
+    """
+    进程内日志队列handler
+    队列只在本进程内消费，日志记录无需序列化，消息格式化和磁盘/控制台输出都在后台线程完成
+    """
+    
+    def prepare(self, record):
+        return record
 
 class Logger:
-    """日志管理类，支持控制台和文件输出，按日期分割日志文件"""
+    """日志管理类，支持控制台和文件输出，按日期和大小分割日志文件，可选后台线程异步输出"""
     
     def __init__(self):
         # 读取配置
         self.config = Config()
         self.log_level = self._get_log_level()
         self.log_format = self.config.get_log_format()
+        self.listener = None
         
         # 创建日志目录
-        self.log_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'logs')
+        self.log_dir = os.path.join(PROJECT_ROOT, 'logs')
         if not os.path.exists(self.log_dir):
             os.makedirs(self.log_dir)
-            
-        # 日志文件名按日期生成
-        self.log_file = os.path.join(self.log_dir, f"test_{datetime.now().strftime('%Y-%m-%d')}.log")
         
         # 初始化logger
         self.logger = logging.getLogger('web_automation')
@@ -45,8 +93,15 @@ class Logger:
         # 格式化器
         formatter = logging.Formatter(self.log_format)
         
-        # 文件handler
-        file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
+        # 文件handler：按日期切换文件，并按大小轮转；并行执行的worker写入各自的文件，避免轮转时互相覆盖
+        worker_id = os.environ.get('WEBAUTO_WORKER_ID')
+        file_handler = DailySizeRotatingFileHandler(
+            self.log_dir,
+            max_bytes=self.config.get_log_max_bytes(),
+            backup_count=self.config.get_log_backup_count(),
+            name_suffix=f".worker{worker_id}" if worker_id else ''
+        )
+        self.log_file = file_handler.baseFilename
         file_handler.setLevel(self.log_level)
         file_handler.setFormatter(formatter)
         
@@ -55,14 +110,63 @@ class Logger:
         console_handler.setLevel(self.log_level)
         console_handler.setFormatter(formatter)
         
-        # 添加handler
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        if self.config.is_async_log():
+            # 异步模式：业务线程只把日志记录放入队列，由后台线程写文件和控制台
+            log_queue = queue.SimpleQueue()
+            self.logger.addHandler(LocalQueueHandler(log_queue))
+            self.listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+            self.listener.start()
+            self._listening = True
+            atexit.register(self.stop)
+        else:
+            # 添加handler
+            self.logger.addHandler(file_handler)
+            self.logger.addHandler(console_handler)
+    
+    def flush(self):
+        """等待队列中的日志全部输出，异步模式下继续接收后续日志"""
+        if self.listener and self._listening:
+            self.listener.stop()
+            self.listener.start()
+        for handler in self.logger.handlers:
+            handler.flush()
+    
+    def stop(self):
+        """停止后台输出线程，队列中剩余的日志会先全部输出"""
+        if self.listener and self._listening:
+            self._listening = False
+            self.listener.stop()
     
     def get_logger(self):
         """获取logger实例"""
         return self.logger
 
-# 单例模式，全局使用同一个logger实例
-logger = Logger().get_logger()
-    
\ No newline at end of file
+class _LazyLogger:
+    """
+    logger代理：导入模块时不读取配置、不创建日志目录，
+    第一次记录日志时才初始化 Logger
+    """
+    
+    def __init__(self):
+        self._logger = None
+        self._manager = None
+        self._lock = threading.Lock()
+    
+    def _get_logger(self):
+        if self._logger is None:
+            with self._lock:
+                if self._logger is None:
+                    self._manager = Logger()
+                    self._logger = self._manager.get_logger()
+        return self._logger
+    
+    def flush(self):
+        """输出队列中积压的日志，未初始化时无需处理"""
+        if self._logger is not None:
+            self._manager.flush()
+    
+    def __getattr__(self, name):
+        return getattr(self._get_logger(), name)
+
+# 单例模式，全局使用同一个logger实例（首次使用时初始化）
+logger = _LazyLogger()
@@ -0,0 +1,67 @@
+from src.common.logger import logger
+
+# 支持的排序策略，可以组合使用，靠前的策略优先
+ORDER_STRATEGIES = ('name', 'failed_first', 'longest_first', 'fixture_group', 'none')
+
+def parse_strategies(value):
+    """解析 'failed_first,longest_first' 形式的排序策略，返回策略列表"""
+    if isinstance(value, str):
+        value = value.replace('\n', ',').split(',')
+    strategies = [strategy.strip().lower() for strategy in value if strategy.strip()]
+    unknown = [strategy for strategy in strategies if strategy not in ORDER_STRATEGIES]
+    if unknown:
+        raise ValueError(f"不支持的用例排序策略: {unknown}，可选: {', '.join(ORDER_STRATEGIES)}")
+    return [strategy for strategy in strategies if strategy != 'none']
+
+def _fixture_group_key(item, cache):
+    """
+    按非 function 作用域的 fixture（及其参数）分组，相同分组的用例相邻执行，减少浏览器等资源的重建
+    同一个测试函数的参数化用例共享 fixture 信息，按其缓存避免重复计算
+    """
+    info = getattr(item, '_fixtureinfo', None)
+    group = cache.get(id(info))
+    if group is None:
+        names = []
+        for name, fixture_defs in (info.name2fixturedefs.items() if info is not None else ()):
+            if fixture_defs and fixture_defs[-1].scope != 'function':
+                names.append(name)
+        # 不使用浏览器的用例排在一起，不占用浏览器
+        group = ('driver' not in item.fixturenames, tuple(sorted(names)))
+        cache[id(info)] = group
+    callspec = getattr(item, 'callspec', None)
+    if callspec is None:
+        return group
+    return group + tuple(repr(callspec.params[name]) for name in group[1] if name in callspec.params)
+
+def order_items(items, strategies, store):
+    """
+    按策略原地排序用例
+    :param items: pytest 收集到的用例列表
+    :param strategies: 策略列表，见 ORDER_STRATEGIES
+        name: 按用例名称；failed_first: 上次失败的用例优先；longest_first: 历史耗时长的优先；
+        fixture_group: 按会话/模块级 fixture 分组
+    :param store: DurationStore，提供历史耗时和结果
+    """
+    if not strategies:
+        return items
+    durations = store.durations
+    outcomes = store.outcomes
+    default = store.median() if 'longest_first' in strategies else 0.0
+    group_cache = {}
+    key_funcs = {
+        'name': lambda item: item.name,
+        'failed_first': lambda item: outcomes.get(item.nodeid) != 'failed',
+        'longest_first': lambda item: -durations.get(item.nodeid, default),
+        'fixture_group': lambda item: _fixture_group_key(item, group_cache),
+    }
+    funcs = [key_funcs[strategy] for strategy in strategies]
+    if len(funcs) == 1:
+        key = funcs[0]
+    elif len(funcs) == 2:
+        first, second = funcs
+        key = lambda item: (first(item), second(item))
+    else:
+        key = lambda item: tuple([func(item) for func in funcs])
+    items.sort(key=key)
+    logger.info(f"按 {','.join(strategies)} 排序 {len(items)} 个测试用例")
+    return items
@@ -0,0 +1,204 @@
+import bisect
+import functools
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from src.common.logger import logger
+
+# 直方图的分桶上限(毫秒)
+HISTOGRAM_BUCKETS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+_context = threading.local()
+
+def current_test_id():
+    """当前执行的用例ID，来自 pytest 设置的 PYTEST_CURRENT_TEST 环境变量"""
+    return os.environ.get('PYTEST_CURRENT_TEST', '').rsplit(' (', 1)[0]
+
+@contextmanager
+def command_context(page, method, locator=None):
+    """
+    标记接下来的 WebDriver 命令来自哪个页面对象方法和定位器
+    同一页面对象内嵌套调用（如 click 内部的 find_element）时保留外层方法名，只补充定位器
+    """
+    previous = getattr(_context, 'value', None)
+    if previous is not None and previous[0] == page:
+        _context.value = (page, previous[1], previous[2] or locator)
+    else:
+        _context.value = (page, method, locator)
+    try:
+        yield
+    finally:
+        _context.value = previous
+
+def instrumented(func):
+    """页面对象方法装饰器：第一个参数为定位器时一并记录"""
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        locator = args[0] if args and isinstance(args[0], tuple) else None
+        with command_context(type(self).__name__, func.__name__, locator):
+            return func(self, *args, **kwargs)
+    return wrapper
+
+def percentile(sorted_values, percent):
+    """最近秩法计算百分位数，sorted_values 需已排序"""
+    if not sorted_values:
+        return 0.0
+    # 最近秩：第 ceil(p/100 * n) 个值，先乘后除避免浮点误差多进一位
+    rank = math.ceil(percent * len(sorted_values) / 100.0)
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+def summarize(durations):
+    """耗时列表(毫秒)的统计：次数、总耗时、p50/p95/p99、最大值和直方图"""
+    values = sorted(durations)
+    histogram = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+    for value in values:
+        histogram[bisect.bisect_left(HISTOGRAM_BUCKETS, value)] += 1
+    return {
+        'count': len(values),
+        'total_ms': round(sum(values), 2),
+        'p50_ms': round(percentile(values, 50), 2),
+        'p95_ms': round(percentile(values, 95), 2),
+        'p99_ms': round(percentile(values, 99), 2),
+        'max_ms': round(values[-1], 2) if values else 0.0,
+        'histogram': {
+            (f"<={bound}ms" if index < len(HISTOGRAM_BUCKETS) else f">{HISTOGRAM_BUCKETS[-1]}ms"): count
+            for index, (bound, count) in enumerate(zip(HISTOGRAM_BUCKETS + [None], histogram))
+        },
+    }
+
+class CommandRecorder:
+    """
+    WebDriver 命令耗时记录器
+    替换 driver.execute，记录每条命令的耗时，并标记所属用例、页面对象方法和定位器
+    """
+    
+    def __init__(self):
+        self._samples = defaultdict(list)
+        self._navigations = defaultdict(list)
+        self._lock = threading.Lock()
+    
+    def instrument(self, driver):
+        """为驱动安装计时钩子，同一个驱动只安装一次"""
+        if getattr(driver, '_command_recorder', None) is self:
+            return driver
+        original_execute = driver.execute
+        recorder = self
+        
+        def timed_execute(driver_command, params=None):
+            start = time.perf_counter()
+            try:
+                return original_execute(driver_command, params)
+            finally:
+                recorder.record(driver_command, (time.perf_counter() - start) * 1000)
+        
+        driver.execute = timed_execute
+        driver._command_recorder = self
+        return driver
+    
+    def record(self, command, duration_ms):
+        page, method, locator = getattr(_context, 'value', None) or (None, None, None)
+        test_id = current_test_id()
+        sample = (test_id, page, method, str(locator) if locator else None, command, duration_ms)
+        with self._lock:
+            self._samples[test_id].append(sample)
+    
+    def record_navigation(self, timing):
+        """记录一次页面导航的耗时（BasePage.open 读取的 performance.timing）"""
+        with self._lock:
+            self._navigations[current_test_id()].append(timing)
+    
+    def navigations(self, test_id=None):
+        with self._lock:
+            if test_id is not None:
+                return list(self._navigations.get(test_id, ()))
+            return [timing for timings in self._navigations.values() for timing in timings]
+    
+    def samples(self, test_id=None):
+        """命令记录 (用例ID, 页面, 方法, 定位器, 命令, 耗时毫秒)，指定用例ID时只返回该用例的记录"""
+        with self._lock:
+            if test_id is not None:
+                return list(self._samples.get(test_id, ()))
+            return [sample for samples in self._samples.values() for sample in samples]
+    
+    def _group(self, samples, key):
+        groups = defaultdict(list)
+        for sample in samples:
+            name = key(sample)
+            if name:
+                groups[name].append(sample[5])
+        return {name: summarize(durations) for name, durations in groups.items()}
+    
+    def test_report(self, test_id):
+        """单个用例的命令耗时统计，按命令、页面方法和定位器分组"""
+        samples = self.samples(test_id)
+        return {
+            'test': test_id,
+            'overall': summarize([sample[5] for sample in samples]),
+            'by_command': self._group(samples, lambda s: s[4]),
+            'by_page_method': self._group(samples, lambda s: f"{s[1]}.{s[2]}" if s[1] else None),
+            'by_locator': self._group(samples, lambda s: s[3]),
+            'navigations': self.navigations(test_id),
+        }
+    
+    def session_report(self):
+        """整个会话的命令耗时统计"""
+        samples = self.samples()
+        return {
+            'overall': summarize([sample[5] for sample in samples]),
+            'by_test': self._group(samples, lambda s: s[0]),
+            'by_page': self._group(samples, lambda s: s[1]),
+            'by_page_method': self._group(samples, lambda s: f"{s[1]}.{s[2]}" if s[1] else None),
+            'by_locator': self._group(samples, lambda s: s[3]),
+            'by_command': self._group(samples, lambda s: s[4]),
+            'navigation': self._navigation_summary(self.navigations()),
+        }
+    
+    def _navigation_summary(self, navigations):
+        """按URL汇总导航耗时（get 命令、TTFB、DOMContentLoaded、load）"""
+        groups = defaultdict(list)
+        for timing in navigations:
+            groups[timing.get('url')].append(timing)
+        return {
+            url: {
+                metric: summarize([t[metric] for t in timings if t.get(metric)])
+                for metric in ('get_ms', 'ttfb', 'dom_content_loaded', 'load')
+            }
+            for url, timings in groups.items()
+        }
+    
+    def dump_json(self, path):
+        """把会话统计和原始命令记录写入JSON文件"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        report = self.session_report()
+        report['commands'] = [
+            {'test': s[0], 'page': s[1], 'method': s[2], 'locator': s[3], 'command': s[4],
+             'duration_ms': round(s[5], 3)}
+            for s in self.samples()
+        ]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info("WebDriver命令耗时报告已保存: %s", path)
+        return path
+    
+    def format_summary(self, top=10):
+        """最慢定位器和最慢页面的文本摘要，按总耗时排序"""
+        report = self.session_report()
+        if not report['overall']['count']:
+            return []
+        overall = report['overall']
+        lines = [
+            f"WebDriver命令 {overall['count']} 条，总耗时 {overall['total_ms'] / 1000:.2f}s，"
+            f"p50 {overall['p50_ms']}ms / p95 {overall['p95_ms']}ms / p99 {overall['p99_ms']}ms"
+        ]
+        for title, group in (("最慢的定位器", report['by_locator']), ("最慢的页面", report['by_page'])):
+            lines.append(f"{title}（按总耗时）:")
+            ranked = sorted(group.items(), key=lambda item: item[1]['total_ms'], reverse=True)[:top]
+            for name, stats in ranked:
+                lines.append(
+                    f"  {stats['total_ms']:10.1f}ms  {stats['count']:5d}次  p95 {stats['p95_ms']:8.1f}ms  {name}"
+                )
+        return lines
@@ -0,0 +1,144 @@
+import html
+import json
+import os
+import time
+from datetime import datetime
+from src.common.config import Config, PROJECT_ROOT
+from src.common.durations import OUTCOME_SEVERITY
+from src.common.logger import logger
+
+RESULTS_FILE = 'results.jsonl'
+SUMMARY_FILE = 'summary.html'
+
+# 失败信息在HTML摘要中最多显示的字符数，完整内容在 JSONL 中
+MAX_MESSAGE_LENGTH = 4000
+
+# 失败现场附件（来自 pytest 报告的 user_properties）及其在摘要页中的链接文字
+ATTACHMENT_LABELS = {'screenshot': '截图', 'dom': 'DOM', 'console_log': '控制台日志'}
+
+# 摘要页头部：统计和筛选在浏览器中根据已写入的行计算，执行过程中刷新页面即可看到最新结果
+SUMMARY_HEADER = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>测试结果 {started}</title>
+<style>
+body {{ font-family: sans-serif; margin: 20px; }}
+table {{ border-collapse: collapse; width: 100%; }}
+td, th {{ border: 1px solid #ddd; padding: 4px 8px; text-align: left; vertical-align: top; font-size: 13px; }}
+tr.passed td.outcome {{ color: #2e7d32; }}
+tr.failed td.outcome {{ color: #c62828; font-weight: bold; }}
+tr.skipped td.outcome {{ color: #9e9e9e; }}
+pre {{ white-space: pre-wrap; margin: 0; }}
+#summary span {{ margin-right: 16px; cursor: pointer; }}
+</style>
+<script>
+function refreshSummary() {{
+    var rows = document.querySelectorAll('#results tbody tr');
+    var counts = {{passed: 0, failed: 0, skipped: 0}}, total = 0;
+    rows.forEach(function (row) {{ counts[row.className] = (counts[row.className] || 0) + 1; total += 1; }});
+    document.getElementById('summary').innerHTML =
+        '<span onclick="filterRows()">全部 ' + total + '</span>' +
+        Object.keys(counts).map(function (name) {{
+            return '<span onclick="filterRows(\\'' + name + '\\')">' + name + ' ' + counts[name] + '</span>';
+        }}).join('');
+}}
+function filterRows(outcome) {{
+    document.querySelectorAll('#results tbody tr').forEach(function (row) {{
+        row.style.display = !outcome || row.className === outcome ? '' : 'none';
+    }});
+}}
+document.addEventListener('DOMContentLoaded', refreshSummary);
+</script>
+</head>
+<body>
+<h2>测试结果（开始于 {started}）</h2>
+<div id="summary"></div>
+<table id="results">
+<thead><tr><th>结果</th><th>用例</th><th>耗时(s)</th><th>worker</th><th>详情</th></tr></thead>
+<tbody>
+"""
+
+class ResultReporter:
+    """
+    内置的流式结果报告：每个用例结束时向 results.jsonl 和 summary.html 各追加一行，不需要 Java/allure
+    两个文件都只追加不重写，并行执行时各worker进程写入同一组文件（每行一次写入）
+    """
+    
+    def __init__(self, report_dir=None, config=None):
+        config = config or Config()
+        self.report_dir = report_dir or os.path.join(PROJECT_ROOT, config.get_native_report_dir())
+        self.results_path = os.path.join(self.report_dir, RESULTS_FILE)
+        self.summary_path = os.path.join(self.report_dir, SUMMARY_FILE)
+        self.worker_id = os.environ.get('WEBAUTO_WORKER_ID', '')
+        self._pending = {}
+    
+    def reset(self):
+        """开始新的一次执行：清空结果文件并写入摘要页头部"""
+        os.makedirs(self.report_dir, exist_ok=True)
+        open(self.results_path, 'w', encoding='utf-8').close()
+        with open(self.summary_path, 'w', encoding='utf-8') as f:
+            f.write(SUMMARY_HEADER.format(started=datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+        logger.info("测试结果将实时写入: %s", self.summary_path)
+    
+    def log_report(self, report):
+        """处理 pytest 的阶段报告，teardown 结束时写入该用例的最终结果"""
+        pending = self._pending.setdefault(report.nodeid, {
+            'outcome': 'passed', 'duration': 0.0, 'message': None, 'phase': None, 'attachments': []
+        })
+        pending['duration'] += report.duration
+        if OUTCOME_SEVERITY.get(report.outcome, 0) > OUTCOME_SEVERITY.get(pending['outcome'], 0):
+            pending['outcome'] = report.outcome
+            pending['phase'] = report.when
+            pending['message'] = self._message(report)
+        for name, value in getattr(report, 'user_properties', ()):
+            if name in ATTACHMENT_LABELS and value:
+                pending['attachments'].append([name, value])
+        if report.when == 'teardown':
+            self._write(report.nodeid, self._pending.pop(report.nodeid))
+    
+    def _message(self, report):
+        if report.outcome == 'skipped' and isinstance(report.longrepr, tuple):
+            return report.longrepr[2]
+        return report.longreprtext or None
+    
+    def _write(self, node_id, result):
+        record = dict(result, nodeid=node_id, worker=self.worker_id, timestamp=time.time())
+        record['duration'] = round(record['duration'], 3)
+        self._append(self.results_path, json.dumps(record, ensure_ascii=False) + '\n')
+        self._append(self.summary_path, self._row(record))
+    
+    def _row(self, record):
+        details = ''
+        if record['message']:
+            message = record['message']
+            if len(message) > MAX_MESSAGE_LENGTH:
+                message = message[:MAX_MESSAGE_LENGTH] + '\n...'
+            details += (f"<details><summary>{html.escape(record['phase'] or '')}</summary>"
+                        f"<pre>{html.escape(message)}</pre></details>")
+        for name, path in record['attachments']:
+            link = os.path.relpath(path, self.report_dir).replace(os.sep, '/')
+            details += f'<a href="{html.escape(link, quote=True)}">{ATTACHMENT_LABELS[name]}</a> '
+        return (f'<tr class="{record["outcome"]}"><td class="outcome">{record["outcome"]}</td>'
+                f'<td>{html.escape(record["nodeid"])}</td><td>{record["duration"]:.2f}</td>'
+                f'<td>{html.escape(record["worker"])}</td><td>{details}</td></tr>\n')
+    
+    def _append(self, path, text):
+        """单次 write 追加一整行，多个进程同时追加时行之间不会交错"""
+        os.makedirs(self.report_dir, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, text.encode('utf-8'))
+        finally:
+            os.close(fd)
+
+def load_results(path):
+    """读取 results.jsonl，跳过未写完的最后一行"""
+    results = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                results.append(json.loads(line))
+            except ValueError:
+                continue
+    return results
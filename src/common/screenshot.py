@@ -0,0 +1,132 @@
+import hashlib
+import io
+import itertools
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from src.common.config import Config, PROJECT_ROOT
+from src.common.logger import logger
+
+def current_test_name():
+    """从 pytest 设置的 PYTEST_CURRENT_TEST 环境变量中获取当前用例ID，并转换为可用作文件名的形式"""
+    node_id = os.environ.get('PYTEST_CURRENT_TEST', '').rsplit(' (', 1)[0]
+    if not node_id:
+        return ''
+    name = node_id.split('/')[-1].replace('::', '.')
+    return re.sub(r'[^\w.-]+', '_', name)[:120]
+
+class ScreenshotWriter:
+    """
+    截图写入器：业务线程只负责从浏览器获取PNG数据，
+    写文件、缩放/重新压缩和按内容去重都在后台线程池中完成
+    """
+    
+    def __init__(self, screenshot_dir=None, config=None):
+        config = config or Config()
+        self.screenshot_dir = screenshot_dir or os.path.join(PROJECT_ROOT, 'screenshots')
+        self.max_width = config.get_screenshot_max_width()
+        self.optimize = config.is_screenshot_optimize()
+        self.dedup = config.is_screenshot_dedup()
+        self._executor = ThreadPoolExecutor(
+            max_workers=config.get_screenshot_workers(), thread_name_prefix='screenshot'
+        )
+        self._sequence = itertools.count(1)
+        self._written = {}
+        self._lock = threading.Lock()
+        self._pillow_warned = False
+    
+    def capture(self, driver, name_prefix="screenshot"):
+        """
+        截取当前页面，返回 Future，结果为截图文件路径（失败时为 None）
+        文件名包含用例ID、毫秒时间戳、进程号和序号，同一秒内多次截图也不会互相覆盖
+        """
+        png = driver.get_screenshot_as_png()
+        return self._executor.submit(self._write, png, self._file_path(name_prefix, 'png'))
+    
+    def save_text(self, text, name_prefix, extension):
+        """在后台写入文本类的失败现场（页面DOM、控制台日志），返回 Future，命名规则与截图相同"""
+        return self._executor.submit(self._write_text, text, self._file_path(name_prefix, extension))
+    
+    def _file_path(self, name_prefix, extension):
+        timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S-%f')[:-3]
+        parts = [current_test_name(), name_prefix, timestamp, f"{os.getpid()}-{next(self._sequence)}"]
+        return os.path.join(self.screenshot_dir, '_'.join(part for part in parts if part) + '.' + extension)
+    
+    def _write_text(self, text, path):
+        try:
+            os.makedirs(self.screenshot_dir, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            logger.info("失败现场已保存: %s", path)
+            return path
+        except Exception as e:
+            logger.error(f"失败现场保存失败: {str(e)}")
+            return None
+    
+    def _write(self, png, screenshot_path):
+        try:
+            digest = hashlib.sha1(png).hexdigest()
+            if self.dedup:
+                with self._lock:
+                    existing = self._written.get(digest)
+                if existing and os.path.exists(existing):
+                    logger.info("截图内容与已保存的截图相同，复用: %s", existing)
+                    return existing
+            
+            if self.max_width or self.optimize:
+                png = self._recompress(png)
+            
+            os.makedirs(self.screenshot_dir, exist_ok=True)
+            with open(screenshot_path, 'wb') as f:
+                f.write(png)
+            with self._lock:
+                self._written[digest] = screenshot_path
+            logger.info("截图成功，保存路径: %s", screenshot_path)
+            return screenshot_path
+        except Exception as e:
+            logger.error(f"截图保存失败: {str(e)}")
+            return None
+    
+    def _recompress(self, png):
+        """按配置缩小宽度并重新压缩，未安装 Pillow 时原样保存"""
+        try:
+            from PIL import Image
+        except ImportError:
+            if not self._pillow_warned:
+                self._pillow_warned = True
+                logger.warning("未安装 Pillow，截图不做缩放和压缩")
+            return png
+        
+        image = Image.open(io.BytesIO(png))
+        if self.max_width and image.width > self.max_width:
+            height = int(image.height * self.max_width / image.width)
+            image = image.resize((self.max_width, height), Image.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, format='PNG', optimize=self.optimize)
+        return output.getvalue()
+    
+    def shutdown(self, wait=True):
+        """等待所有截图写入完成"""
+        self._executor.shutdown(wait=wait)
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_screenshot_writer():
+    """获取进程内共享的截图写入器，第一次截图时创建"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = ScreenshotWriter()
+    return _writer
+
+def shutdown_screenshot_writer():
+    """等待所有截图写入完成，测试会话结束时调用"""
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.shutdown(wait=True)
+            _writer = None
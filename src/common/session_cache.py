@@ -0,0 +1,179 @@
+import hashlib
+import threading
+import time
+from urllib.parse import urlsplit
+from selenium.common.exceptions import WebDriverException
+from src.common.config import Config
+from src.common.driver_pool import CLEAR_STORAGE_SCRIPT
+from src.common.logger import logger
+
+# 导出当前源下的 localStorage / sessionStorage
+CAPTURE_STORAGE_SCRIPT = """
+function dump(storage) {
+    var data = {};
+    try {
+        for (var i = 0; i < storage.length; i++) {
+            var key = storage.key(i);
+            data[key] = storage.getItem(key);
+        }
+    } catch (e) {}
+    return data;
+}
+return {local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+# 写回 localStorage / sessionStorage：arguments[0] 为 {local: {...}, session: {...}}
+RESTORE_STORAGE_SCRIPT = """
+var snapshot = arguments[0];
+Object.keys(snapshot.local).forEach(function (key) { window.localStorage.setItem(key, snapshot.local[key]); });
+Object.keys(snapshot.session).forEach(function (key) { window.sessionStorage.setItem(key, snapshot.session[key]); });
+"""
+
+def origin_of(url):
+    """URL 的源，如 https://example.com:8443"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+class SessionSnapshot:
+    """已登录会话的快照：Cookie 和当前源下的 localStorage / sessionStorage"""
+    
+    def __init__(self, user, origin, cookies, local_storage, session_storage):
+        self.user = user
+        self.origin = origin
+        self.cookies = cookies
+        self.local_storage = local_storage
+        self.session_storage = session_storage
+        self.created_at = time.monotonic()
+    
+    def is_expired(self, ttl):
+        return bool(ttl) and time.monotonic() - self.created_at >= ttl
+
+class SessionCache:
+    """
+    登录会话缓存：每个用户在每个进程内只通过界面登录一次，之后把快照注入新的浏览器
+    快照只保存在内存中，超过 TTL 或服务端不再认可（恢复后校验失败）时丢弃并重新登录
+    """
+    
+    def __init__(self, config=None):
+        config = config or Config()
+        self.enabled = config.is_session_cache_enabled()
+        self.ttl = config.get_session_ttl()
+        self._snapshots = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def _key(self, origin, user, credential):
+        # 缓存键包含凭据的摘要，同一用户使用不同的密码登录时不会命中其他密码的会话
+        digest = hashlib.sha256(credential.encode('utf-8')).hexdigest() if credential is not None else None
+        return origin, user, digest
+    
+    def get(self, origin, user, credential=None):
+        """获取未过期的快照，没有时返回 None"""
+        key = self._key(origin, user, credential)
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None and snapshot.is_expired(self.ttl):
+                logger.info("用户 %s 的登录会话快照已过期", user)
+                del self._snapshots[key]
+                snapshot = None
+        return snapshot
+    
+    def capture(self, driver, user, key_origin=None, credential=None):
+        """
+        在已登录的浏览器中保存会话快照
+        :param key_origin: 缓存键使用的源，默认为当前页面的源
+        :param credential: 登录使用的凭据（如密码），只以摘要形式作为缓存键的一部分
+        """
+        origin = origin_of(driver.current_url)
+        storage = driver.execute_script(CAPTURE_STORAGE_SCRIPT) or {}
+        snapshot = SessionSnapshot(
+            user, origin, driver.get_cookies(), storage.get('local') or {}, storage.get('session') or {}
+        )
+        with self._lock:
+            self._snapshots[self._key(key_origin or origin, user, credential)] = snapshot
+        logger.info("已保存用户 %s 的登录会话快照: %d 个Cookie，%d/%d 项 local/sessionStorage",
+                    user, len(snapshot.cookies), len(snapshot.local_storage), len(snapshot.session_storage))
+        return snapshot
+    
+    def invalidate(self, origin, user, credential=None):
+        with self._lock:
+            self._snapshots.pop(self._key(origin, user, credential), None)
+    
+    def restore(self, driver, snapshot):
+        """
+        把快照注入浏览器
+        Chrome 通过 DevTools 直接写入 Cookie，无需先打开页面；其他浏览器和 Storage 需要先打开同源页面
+        """
+        on_origin = False
+        if not self._set_cookies_by_devtools(driver, snapshot):
+            driver.get(snapshot.origin)
+            on_origin = True
+            for cookie in snapshot.cookies:
+                driver.add_cookie({key: value for key, value in cookie.items() if key != 'sameSite' or value})
+        if snapshot.local_storage or snapshot.session_storage:
+            if not on_origin:
+                driver.get(snapshot.origin)
+            driver.execute_script(RESTORE_STORAGE_SCRIPT, {
+                'local': snapshot.local_storage, 'session': snapshot.session_storage
+            })
+        logger.info("已恢复用户 %s 的登录会话快照", snapshot.user)
+    
+    def clear(self, driver, snapshot):
+        """清除注入的快照：Cookie 和快照所在源的 localStorage / sessionStorage，避免重新登录时使用失效的令牌"""
+        driver.delete_all_cookies()
+        if snapshot.local_storage or snapshot.session_storage:
+            if origin_of(driver.current_url) != snapshot.origin:
+                driver.get(snapshot.origin)
+            driver.execute_script(CLEAR_STORAGE_SCRIPT)
+    
+    def _set_cookies_by_devtools(self, driver, snapshot):
+        if not hasattr(driver, 'execute_cdp_cmd'):
+            return False
+        cookies = []
+        for cookie in snapshot.cookies:
+            item = {
+                'name': cookie['name'],
+                'value': cookie['value'],
+                'url': snapshot.origin + cookie.get('path', '/'),
+                'path': cookie.get('path', '/'),
+                'secure': cookie.get('secure', False),
+                'httpOnly': cookie.get('httpOnly', False),
+            }
+            # 以点开头的是域 Cookie，其余为仅限当前主机的 Cookie，由 url 决定
+            if cookie.get('domain', '').startswith('.'):
+                item['domain'] = cookie['domain']
+            if cookie.get('expiry'):
+                item['expires'] = cookie['expiry']
+            if cookie.get('sameSite'):
+                item['sameSite'] = cookie['sameSite']
+            cookies.append(item)
+        try:
+            driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+            return True
+        except WebDriverException as e:
+            logger.debug("DevTools 写入Cookie失败，改为打开页面后写入: %s", str(e).strip())
+            return False
+    
+    def ensure_logged_in(self, driver, origin, user, login, verify, credential=None):
+        """
+        使浏览器处于 user 的登录状态
+        :param login: 通过界面登录的函数，login(driver)
+        :param verify: 判断当前是否已登录的函数，verify(driver)，恢复快照后用于确认服务端仍认可该会话
+        :param credential: 登录使用的凭据，凭据不同时不复用其他凭据登录得到的会话
+        """
+        snapshot = self.get(origin, user, credential) if self.enabled else None
+        if snapshot is not None:
+            self.restore(driver, snapshot)
+            if verify(driver):
+                self.hits += 1
+                return driver
+            logger.info("服务端不再认可用户 %s 的登录会话快照，重新登录", user)
+            self.invalidate(origin, user, credential)
+            self.clear(driver, snapshot)
+        
+        self.misses += 1
+        login(driver)
+        if self.enabled:
+            self.capture(driver, user, origin, credential)
+        return driver
@@ -0,0 +1,432 @@
+import copy
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.switch_to import SwitchTo
+from src.common.config import Config
+from src.common.driver_pool import DriverPool, PooledDriver, create_driver
+from src.common.durations import CACHE_DIR
+from src.common.exceptions import BrowserStartupException
+from src.common.logger import logger
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# 执行模式：browser 每个用例独占浏览器；tab 多个用例共用一个浏览器，各用一个标签页；
+# context 同 tab，但每个用例在独立的浏览器上下文中（Cookie/Storage 隔离，仅 Chrome）
+EXECUTION_MODES = ('browser', 'tab', 'context')
+
+# 并行执行时由 run_tests 启动的共享浏览器信息文件，worker 连接到该浏览器而不是各自启动
+SHARED_BROWSER_ENV = 'WEBAUTO_SHARED_BROWSER'
+
+# 这些命令执行后浏览器回到顶层文档，之前切换到的 frame 失效
+TOP_LEVEL_COMMANDS = (Command.GET, Command.GO_BACK, Command.GO_FORWARD, Command.REFRESH)
+
+class TabLock:
+    """
+    同一浏览器上所有标签页共用的命令锁，同时记录浏览器当前所在的窗口和各标签页占用的窗口
+    多个进程共用一个浏览器时，通过文件锁互斥，状态保存在锁文件中
+    """
+    
+    def __init__(self, path=None):
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644) if path else None
+        self._state = {'current': None, 'claimed': []}
+        self._dirty = False
+    
+    def __enter__(self):
+        self._lock.acquire()
+        if self._depth == 0 and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            data = os.pread(self._fd, 1 << 16, 0)
+            self._state = json.loads(data) if data.strip() else {'current': None, 'claimed': []}
+            self._dirty = False
+        self._depth += 1
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            if self._dirty:
+                data = json.dumps(self._state).encode('utf-8')
+                os.ftruncate(self._fd, 0)
+                os.pwrite(self._fd, data, 0)
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._lock.release()
+    
+    @property
+    def current(self):
+        return self._state['current']
+    
+    @current.setter
+    def current(self, handle):
+        self._state['current'] = handle
+        self._dirty = True
+    
+    @property
+    def claimed(self):
+        return self._state['claimed']
+    
+    def claim(self, handle):
+        self._state['claimed'].append(handle)
+        self._dirty = True
+    
+    def unclaim(self, handles):
+        self._state['claimed'] = [handle for handle in self._state['claimed'] if handle not in handles]
+        self._dirty = True
+    
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+def make_tab_driver(base, handle, lock, context_id=None):
+    """
+    返回只操作 handle 所在标签页的驱动：与 base 共用同一个会话，
+    每条命令执行前在锁内切换到自己的窗口，页面对象、元素和 allure/perf 工具都无需感知
+    切换窗口会让会话回到顶层文档，因此每个窗口记录用例切换到的 frame 路径，切回时按路径重新进入
+    命令在锁内执行，耗时长的命令（异步脚本等待、normal 策略的页面加载）期间其他标签页的命令都需要等待
+    """
+    tab = copy.copy(base)
+    tab._switch_to = SwitchTo(tab)
+    execute = type(base).execute
+    # 本标签页打开或切换过的窗口，current[0] 为当前窗口
+    windows = [handle]
+    current = [handle]
+    # 各窗口中用例切换到的 frame 路径，元素为 switch_to.frame 的 id 参数
+    frames = {}
+    
+    def restore_frames():
+        path = frames.get(current[0])
+        try:
+            for frame in path or ():
+                execute(base, Command.SWITCH_TO_FRAME, {'id': frame})
+        except WebDriverException as e:
+            # frame 已不存在（页面已变化），之后的命令在顶层文档执行
+            logger.warning(f"切回标签页后无法重新进入 frame，改为在顶层文档执行: {str(e).strip()}")
+            frames.pop(current[0], None)
+    
+    def track_frames(driver_command, params):
+        if driver_command == Command.SWITCH_TO_FRAME:
+            if params.get('id') is None:
+                frames.pop(current[0], None)
+            else:
+                frames.setdefault(current[0], []).append(params['id'])
+        elif driver_command == Command.SWITCH_TO_PARENT_FRAME:
+            if frames.get(current[0]):
+                frames[current[0]].pop()
+        elif driver_command == Command.SWITCH_TO_WINDOW:
+            # 切换窗口后回到目标窗口的顶层文档
+            frames.pop(params.get('handle'), None)
+        elif driver_command in TOP_LEVEL_COMMANDS:
+            frames.pop(current[0], None)
+    
+    def tab_execute(driver_command, params=None):
+        with lock:
+            if lock.current != current[0]:
+                execute(base, Command.SWITCH_TO_WINDOW, {'handle': current[0]})
+                lock.current = current[0]
+                restore_frames()
+            response = execute(tab, driver_command, params)
+            track_frames(driver_command, params or {})
+            if driver_command == Command.SWITCH_TO_WINDOW:
+                # 用例主动切换到其他窗口（如页面打开的弹出窗口），之后的命令都在该窗口执行
+                current[0] = lock.current = params['handle']
+                if current[0] not in windows:
+                    windows.append(current[0])
+                    lock.claim(current[0])
+            elif driver_command == Command.NEW_WINDOW:
+                windows.append(response['value']['handle'])
+                lock.claim(response['value']['handle'])
+            elif driver_command == Command.CLOSE:
+                if current[0] in windows:
+                    windows.remove(current[0])
+                lock.unclaim([current[0]])
+                lock.current = None
+            elif driver_command == Command.W3C_GET_WINDOW_HANDLES:
+                # 不返回其他用例的标签页
+                others = set(lock.claimed).difference(windows)
+                response['value'] = [value for value in response['value'] if value not in others]
+            return response
+    
+    def close_tab():
+        """关闭本标签页打开的所有窗口，不结束共用的浏览器会话"""
+        with lock:
+            for window in windows:
+                try:
+                    execute(base, Command.SWITCH_TO_WINDOW, {'handle': window})
+                    execute(base, Command.CLOSE, None)
+                except WebDriverException:
+                    pass
+            lock.unclaim(windows)
+            lock.current = None
+            del windows[:]
+            if context_id:
+                try:
+                    base.execute_cdp_cmd('Target.disposeBrowserContext', {'browserContextId': context_id})
+                except WebDriverException as e:
+                    logger.debug(f"释放浏览器上下文失败: {str(e)}")
+    
+    tab.execute = tab_execute
+    tab.quit = close_tab
+    tab.tab_handle = handle
+    tab.browser_context_id = context_id
+    return tab
+
+def open_tab(base, lock, isolated=False):
+    """
+    在 base 浏览器中打开新的标签页，返回只操作该标签页的驱动
+    :param isolated: 是否在独立的浏览器上下文中打开（Cookie/Storage 隔离，需要 Chrome DevTools）
+    """
+    with lock:
+        if isolated and hasattr(base, 'execute_cdp_cmd'):
+            context_id = base.execute_cdp_cmd(
+                'Target.createBrowserContext', {'disposeOnDetach': True}
+            )['browserContextId']
+            target_id = base.execute_cdp_cmd('Target.createTarget', {
+                'url': 'about:blank', 'browserContextId': context_id
+            })['targetId']
+            # chromedriver 中窗口句柄即 DevTools 的 targetId
+            if target_id in type(base).execute(base, Command.W3C_GET_WINDOW_HANDLES)['value']:
+                lock.claim(target_id)
+                return make_tab_driver(base, target_id, lock, context_id)
+            logger.warning("浏览器驱动不支持切换到独立上下文中的窗口，改为使用普通标签页")
+            base.execute_cdp_cmd('Target.disposeBrowserContext', {'browserContextId': context_id})
+        elif isolated:
+            logger.warning("浏览器不支持 DevTools，无法创建独立的浏览器上下文，改为使用普通标签页")
+        handle = type(base).execute(base, Command.NEW_WINDOW, {'type': 'tab'})['value']['handle']
+        lock.claim(handle)
+        return make_tab_driver(base, handle, lock)
+
+class AttachedDriver(webdriver.Remote):
+    """连接到其他进程创建的浏览器会话，不新建也不结束会话"""
+    
+    def __init__(self, command_executor, session_id, capabilities, options):
+        self._attach_to = (session_id, capabilities)
+        super().__init__(command_executor=command_executor, options=options)
+    
+    def start_session(self, *args, **kwargs):
+        self.session_id, self.caps = self._attach_to
+    
+    def quit(self):
+        """会话由创建它的进程结束"""
+        pass
+
+class AttachedChromeDriver(AttachedDriver):
+    """连接到其他进程创建的 Chrome 会话，支持 DevTools 命令"""
+    
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self.execute('executeCdpCommand', {'cmd': cmd, 'params': cmd_args})['value']
+
+def _executor_url(driver):
+    service = getattr(driver, 'service', None)
+    if service is not None:
+        return service.service_url
+    executor = driver.command_executor
+    url = getattr(executor, '_url', None)
+    return url or executor._client_config.remote_server_addr
+
+def attach_shared_browser(info):
+    """连接到 SharedBrowser 启动的浏览器"""
+    if info['browser_type'] == 'chrome':
+        from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection
+        connection = ChromeRemoteConnection(info['executor_url'], keep_alive=True)
+        return AttachedChromeDriver(connection, info['session_id'], info['capabilities'], ChromeOptions())
+    from selenium.webdriver.remote.remote_connection import RemoteConnection
+    connection = RemoteConnection(info['executor_url'], keep_alive=True)
+    return AttachedDriver(connection, info['session_id'], info['capabilities'], FirefoxOptions())
+
+class SharedBrowser:
+    """
+    并行执行时由 run_tests 启动、供所有 worker 进程共用的浏览器
+    会话信息写入文件，worker 通过 SHARED_BROWSER_ENV 找到并连接，各自在其中打开标签页
+    """
+    
+    def __init__(self, config=None):
+        self.config = config or Config()
+        self.info_path = os.path.join(CACHE_DIR, 'shared_browser.json')
+        self.driver = None
+    
+    @staticmethod
+    def is_supported():
+        """跨进程共用浏览器依赖文件锁，目前只支持类 Unix 系统"""
+        return fcntl is not None
+    
+    def start(self):
+        browser_type = self.config.get_browser_type()
+        self.driver = create_driver(self.config, browser_type)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        lock_path = self.info_path + '.lock'
+        # 浏览器的初始窗口只用于保持浏览器不退出，不出现在各标签页的 window_handles 中
+        with open(lock_path, 'w', encoding='utf-8') as f:
+            json.dump({'current': self.driver.current_window_handle,
+                       'claimed': [self.driver.current_window_handle]}, f)
+        with open(self.info_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'browser_type': browser_type,
+                'executor_url': _executor_url(self.driver),
+                'session_id': self.driver.session_id,
+                'capabilities': self.driver.caps,
+                'lock_path': lock_path,
+            }, f)
+        logger.info(f"已启动供所有worker共用的 {browser_type} 浏览器，会话: {self.driver.session_id}")
+        return self
+    
+    def stop(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                logger.warning(f"关闭共用浏览器失败: {str(e)}")
+            self.driver = None
+
+class TabPool:
+    """
+    标签页池：与 DriverPool 接口相同，但多个用例共用一个浏览器进程，
+    每次 acquire 打开新的标签页（tab 模式）或独立的浏览器上下文（context 模式），release 时关闭
+    同一浏览器上的命令由 TabLock 串行执行，每条命令前切换到对应的窗口
+    """
+    
+    def __init__(self, config=None, browser_type=None, mode=None, size=None):
+        self.config = config or Config()
+        self.browser_type = browser_type or self.config.get_browser_type()
+        self.mode = mode or self.config.get_execution_mode()
+        self.size = size or self.config.get_tabs_per_browser()
+        self.startup_timeout = self.config.get_startup_timeout()
+        self.shared_info = None
+        shared_path = os.environ.get(SHARED_BROWSER_ENV)
+        if shared_path:
+            with open(shared_path, 'r', encoding='utf-8') as f:
+                self.shared_info = json.load(f)
+            self.browser_type = self.shared_info['browser_type']
+        
+        self._base = None
+        self._lock = None
+        self._starting = None
+        self._executor = None
+        self._active = 0
+        self._closed = False
+        self._condition = threading.Condition()
+    
+    def prewarm(self, count=None):
+        """在后台启动共用的浏览器"""
+        with self._condition:
+            if self._closed or self._base is not None or self._starting is not None or self.shared_info:
+                return 0
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='browser-startup')
+            self._starting = self._executor.submit(create_driver, self.config, self.browser_type)
+        logger.info(f"开始在后台预启动共用的 {self.browser_type} 浏览器")
+        return 1
+    
+    def _browser(self):
+        with self._condition:
+            if self._base is not None:
+                return self._base, self._lock
+            starting, self._starting = self._starting, None
+            if self.shared_info:
+                self._base = attach_shared_browser(self.shared_info)
+                self._lock = TabLock(self.shared_info['lock_path'])
+                logger.info(f"已连接到共用的 {self.browser_type} 浏览器，会话: {self._base.session_id}")
+            else:
+                if starting is None:
+                    self._base = create_driver(self.config, self.browser_type)
+                else:
+                    try:
+                        self._base = starting.result(timeout=self.startup_timeout or None)
+                    except FutureTimeoutError:
+                        starting.add_done_callback(_quit_started)
+                        raise BrowserStartupException(
+                            f"预启动的 {self.browser_type} 浏览器在 {self.startup_timeout} 秒内未就绪"
+                        )
+                    except Exception as e:
+                        raise BrowserStartupException(
+                            f"预启动 {self.browser_type} 浏览器失败: {str(e).strip()}"
+                        ) from e
+                # 浏览器的初始窗口只用于保持浏览器不退出，不出现在各标签页的 window_handles 中
+                self._lock = TabLock()
+                with self._lock:
+                    self._lock.current = self._base.current_window_handle
+                    self._lock.claim(self._lock.current)
+            return self._base, self._lock
+    
+    def acquire(self):
+        """打开一个新的标签页，同时使用的标签页达到上限时等待"""
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("浏览器池已关闭")
+                if self._active < self.size:
+                    self._active += 1
+                    break
+                self._condition.wait()
+        try:
+            base, lock = self._browser()
+            pooled = PooledDriver(open_tab(base, lock, isolated=self.mode == 'context'), self.browser_type)
+        except Exception:
+            self._discard_slot()
+            raise
+        pooled.uses += 1
+        logger.info(f"在 {self.browser_type} 浏览器中打开新的{'浏览器上下文' if self.mode == 'context' else '标签页'}，"
+                    f"当前 {self._active} 个")
+        return pooled
+    
+    def release(self, pooled, broken=False):
+        """关闭用例的标签页"""
+        try:
+            pooled.driver.quit()
+        except WebDriverException as e:
+            logger.warning(f"关闭标签页失败: {str(e)}")
+        finally:
+            self._discard_slot()
+    
+    def close(self):
+        """关闭共用的浏览器，连接的是其他进程启动的浏览器时只断开连接"""
+        with self._condition:
+            self._closed = True
+            base, self._base = self._base, None
+            starting, self._starting = self._starting, None
+            self._condition.notify_all()
+        if starting is not None and not starting.cancel():
+            # 启动完成后直接关闭
+            starting.add_done_callback(_quit_started)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        if base is not None:
+            logger.info(f"关闭共用的 {self.browser_type} 浏览器")
+            try:
+                base.quit()
+            except Exception as e:
+                logger.warning(f"关闭浏览器失败: {str(e)}")
+        if self._lock is not None:
+            self._lock.close()
+    
+    def _discard_slot(self):
+        with self._condition:
+            self._active -= 1
+            self._condition.notify()
+
+def _quit_started(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().quit()
+
+def create_pool(config=None, browser_type=None, size=None):
+    """
+    按 [browser] execution_mode 创建浏览器池
+    :param size: 浏览器池大小（tab/context 模式下为同时打开的标签页上限），默认读取配置
+    """
+    config = config or Config()
+    mode = config.get_execution_mode()
+    if mode not in EXECUTION_MODES:
+        raise ValueError(f"不支持的执行模式: {mode}，可选: {', '.join(EXECUTION_MODES)}")
+    if mode == 'browser':
+        return DriverPool(config, browser_type, size)
+    return TabPool(config, browser_type, mode, size)
@@ -1,9 +1,62 @@
 import os
+import codecs
 import json
-import yaml
-import pandas as pd
+import pickle
+import threading
+from collections import OrderedDict
+from src.common.config import Config, PROJECT_ROOT
+from src.common.exceptions import TestDataException
+from src.common.impact import dependency_recorder
+from src.common.lazy_import import lazy_import
 from src.common.logger import logger
 
+# pandas/yaml 导入耗时较长，只在第一次读取对应格式的数据时导入
+pd = lazy_import('pandas')
+yaml = lazy_import('yaml')
+openpyxl = lazy_import('openpyxl')
+
+# 编译后数据的缓存格式版本，修改缓存结构时递增
+CACHE_VERSION = 1
+
+# 流式读取JSON时每次读取的字节数
+STREAM_CHUNK_SIZE = 64 * 1024
+
+class ExcelRowReader:
+    """
+    Excel 工作表的顺序行读取器，工作簿保持打开
+    只读模式下按行号定位需要从头解析工作表，因此按行号递增读取时从上次的位置继续，只有行号倒退时才从头开始
+    """
+    
+    def __init__(self, file_path, sheet_name, mtime):
+        self.mtime = mtime
+        self._workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        if isinstance(sheet_name, int):
+            self._worksheet = self._workbook.worksheets[sheet_name]
+        else:
+            self._worksheet = self._workbook[sheet_name]
+        self._rows = None
+        self._next_row = 1
+        self.header = None
+    
+    def _restart(self):
+        self._rows = self._worksheet.iter_rows(values_only=True)
+        self.header = next(self._rows, None)
+        self._next_row = 2
+    
+    def read(self, row_number):
+        """读取指定行号（从1开始，第1行为表头）的记录"""
+        if self._rows is None or row_number < self._next_row:
+            self._restart()
+        for row in self._rows:
+            current, self._next_row = self._next_row, self._next_row + 1
+            if current == row_number:
+                return dict(zip(self.header, row))
+        self._rows = None
+        raise TestDataException(f"工作表中没有第 {row_number} 行")
+    
+    def close(self):
+        self._workbook.close()
+
 class TestData:
     """测试数据管理类，支持JSON、YAML和Excel格式的数据读取"""
     
@@ -14,23 +67,154 @@ class TestData:
             'test_data'
         )
         
+        # 内存缓存：(文件路径, 工作表) -> (修改时间, 数据, case_id索引)，按LRU淘汰
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # load_record 的读取状态：(文件路径, 工作表) -> ExcelRowReader，以及最近解析的YAML列表文档，
+        # 同一文件在每个进程内只解析一遍
+        self._row_readers = {}
+        self._yaml_document = None
+        self._record_lock = threading.Lock()
+        # 目录检查和缓存配置在第一次读取数据时进行，导入模块时没有副作用
+        self._initialized = False
+    
+    def _ensure_initialized(self):
+        """第一次读取数据时检查数据目录并读取缓存配置"""
+        if self._initialized:
+            return
         # 确保测试数据目录存在
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
             logger.warning(f"测试数据目录不存在，已自动创建: {self.data_dir}")
+        
+        config = Config()
+        self.cache_size = config.get_data_cache_size()
+        self.disk_cache_dir = (
+            os.path.join(PROJECT_ROOT, '.cache', 'test_data') if config.use_data_disk_cache() else None
+        )
+        self._initialized = True
     
     def _get_data_path(self, filename):
         """获取数据文件的完整路径"""
-        return os.path.join(self.data_dir, filename)
+        self._ensure_initialized()
+        file_path = os.path.join(self.data_dir, filename)
+        dependency_recorder.note(file_path)
+        return file_path
+    
+    def _parse_json(self, file_path):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _parse_yaml(self, file_path):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f)
+    
+    def _parse_excel(self, file_path, sheet_name=0):
+        df = pd.read_excel(file_path, sheet_name=sheet_name)
+        # 转换为列表字典格式
+        return df.to_dict('records')
+    
+    def _load_cached(self, file_path, parser, sheet_name=None):
+        """
+        读取数据文件，按 (路径, 工作表, 修改时间) 缓存解析结果
+        内存缓存未命中时优先读取磁盘上的编译缓存，都未命中才真正解析文件
+        :return: (数据, case_id索引)
+        """
+        stat = os.stat(file_path)
+        key = (file_path, sheet_name)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] == stat.st_mtime:
+                self._cache.move_to_end(key)
+                return cached[1], cached[2]
+        
+        data = self._load_disk_cache(file_path, sheet_name, stat)
+        if data is None:
+            data = parser(file_path) if sheet_name is None else parser(file_path, sheet_name)
+            self._save_disk_cache(file_path, sheet_name, stat, data)
+        index = self._build_index(data)
+        
+        with self._cache_lock:
+            self._cache[key] = (stat.st_mtime, data, index)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return data, index
+    
+    def _build_index(self, data):
+        """为列表字典格式的数据建立 case_id -> 行 的索引"""
+        index = {}
+        if isinstance(data, list):
+            for item in data:
+                if isinstance(item, dict) and item.get('case_id') is not None:
+                    index.setdefault(str(item['case_id']), item)
+        return index
+    
+    def _disk_cache_path(self, file_path, sheet_name):
+        relative = os.path.relpath(file_path, self.data_dir).replace(os.sep, '__')
+        suffix = '' if sheet_name is None else f".{sheet_name}"
+        return os.path.join(self.disk_cache_dir, f"{relative}{suffix}.pickle")
+    
+    def _load_disk_cache(self, file_path, sheet_name, stat):
+        """读取磁盘编译缓存，源文件修改时间或大小不一致时视为失效"""
+        if not self.disk_cache_dir:
+            return None
+        cache_path = self._disk_cache_path(file_path, sheet_name)
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        if (cached.get('version') != CACHE_VERSION or cached.get('mtime') != stat.st_mtime
+                or cached.get('size') != stat.st_size):
+            return None
+        logger.debug(f"命中测试数据编译缓存: {cache_path}")
+        return cached['data']
+    
+    def _save_disk_cache(self, file_path, sheet_name, stat, data):
+        """写入磁盘编译缓存，先写临时文件再替换，避免并发worker读到半个文件"""
+        if not self.disk_cache_dir:
+            return
+        cache_path = self._disk_cache_path(file_path, sheet_name)
+        try:
+            os.makedirs(self.disk_cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'version': CACHE_VERSION, 'mtime': stat.st_mtime,
+                             'size': stat.st_size, 'data': data}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except (OSError, pickle.PicklingError) as e:
+            logger.warning(f"写入测试数据编译缓存失败: {str(e)}")
+    
+    def _copy(self, data):
+        """返回数据副本，避免用例修改缓存中的数据"""
+        if isinstance(data, list):
+            return [dict(item) if isinstance(item, dict) else item for item in data]
+        if isinstance(data, dict):
+            return dict(data)
+        return data
+    
+    def clear_cache(self):
+        """清空内存缓存，并关闭 load_record 打开的工作簿"""
+        with self._cache_lock:
+            self._cache.clear()
+        self.close_record_readers()
+    
+    def close_record_readers(self):
+        """关闭 load_record 打开的工作簿，释放缓存的YAML文档，测试会话结束时调用"""
+        with self._record_lock:
+            readers, self._row_readers = self._row_readers, {}
+            self._yaml_document = None
+        for reader in readers.values():
+            reader.close()
     
     def load_json(self, filename):
         """加载JSON格式的测试数据"""
         try:
             file_path = self._get_data_path(filename)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data, _ = self._load_cached(file_path, self._parse_json)
             logger.info(f"成功加载JSON测试数据: {filename}")
-            return data
+            return self._copy(data)
         except FileNotFoundError:
             logger.error(f"JSON测试数据文件不存在: {filename}")
             raise
@@ -42,10 +226,9 @@ class TestData:
         """加载YAML格式的测试数据"""
         try:
             file_path = self._get_data_path(filename)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+            data, _ = self._load_cached(file_path, self._parse_yaml)
             logger.info(f"成功加载YAML测试数据: {filename}")
-            return data
+            return self._copy(data)
         except FileNotFoundError:
             logger.error(f"YAML测试数据文件不存在: {filename}")
             raise
@@ -57,11 +240,9 @@ class TestData:
         """加载Excel格式的测试数据"""
         try:
             file_path = self._get_data_path(filename)
-            df = pd.read_excel(file_path, sheet_name=sheet_name)
-            # 转换为列表字典格式
-            data = df.to_dict('records')
+            data, _ = self._load_cached(file_path, self._parse_excel, sheet_name)
             logger.info(f"成功加载Excel测试数据: {filename}, 工作表: {sheet_name}")
-            return data
+            return self._copy(data)
         except FileNotFoundError:
             logger.error(f"Excel测试数据文件不存在: {filename}")
             raise
@@ -69,30 +250,221 @@ class TestData:
             logger.error(f"加载Excel测试数据失败: {str(e)}")
             raise
     
-    def get_test_case_data(self, data_file, case_id):
+    def get_test_case_data(self, data_file, case_id, sheet_name=0):
         """
         从测试数据中获取指定用例ID的数据
         适用于包含多个测试用例的数据集
         """
+        file_path = self._get_data_path(data_file)
         # 根据文件扩展名判断数据格式
         if data_file.endswith('.json'):
-            all_data = self.load_json(data_file)
+            _, index = self._load_cached(file_path, self._parse_json)
         elif data_file.endswith('.yaml') or data_file.endswith('.yml'):
-            all_data = self.load_yaml(data_file)
+            _, index = self._load_cached(file_path, self._parse_yaml)
         elif data_file.endswith('.xlsx') or data_file.endswith('.xls'):
-            all_data = self.load_excel(data_file)
+            _, index = self._load_cached(file_path, self._parse_excel, sheet_name)
         else:
             raise ValueError(f"不支持的数据文件格式: {data_file}")
         
-        # 查找指定case_id的数据
-        for item in all_data:
-            if str(item.get('case_id')) == str(case_id):
-                logger.info(f"找到测试用例数据: {data_file} -> {case_id}")
-                return item
+        # 通过索引查找指定case_id的数据
+        item = index.get(str(case_id))
+        if item is not None:
+            logger.info(f"找到测试用例数据: {data_file} -> {case_id}")
+            return dict(item)
         
         logger.error(f"未找到测试用例数据: {data_file} -> {case_id}")
         raise ValueError(f"测试用例数据不存在: {case_id}")
+    
+    # 流式读取：逐条返回记录，内存占用与文件大小无关
+    def iter_records(self, data_file, sheet_name=0, with_position=False):
+        """
+        按文件扩展名流式读取测试数据
+        :param with_position: 为 True 时返回 (位置, 记录)，位置可传给 load_record 单独读取该条记录
+        """
+        if data_file.endswith('.json') or data_file.endswith('.jsonl'):
+            records = self.iter_json(data_file)
+        elif data_file.endswith('.yaml') or data_file.endswith('.yml'):
+            records = self.iter_yaml(data_file)
+        elif data_file.endswith('.xlsx'):
+            records = self.iter_excel(data_file, sheet_name)
+        elif data_file.endswith('.xls'):
+            # openpyxl 不支持 .xls，退回到整表加载
+            records = enumerate(self.load_excel(data_file, sheet_name))
+        else:
+            raise ValueError(f"不支持的数据文件格式: {data_file}")
+        
+        for position, record in records:
+            yield (position, record) if with_position else record
+    
+    def iter_json(self, filename):
+        """
+        流式读取JSON测试数据，逐条返回 (字节偏移, 记录)
+        支持顶层为数组的JSON文件和每行一条记录的JSON Lines文件
+        """
+        file_path = self._get_data_path(filename)
+        with open(file_path, 'rb') as f:
+            if filename.endswith('.jsonl'):
+                offset = 0
+                for line in f:
+                    if line.strip():
+                        yield offset, json.loads(line)
+                    offset += len(line)
+                return
+            yield from self._iter_json_values(f, 0, in_array=True)
+    
+    def _iter_json_values(self, f, base_offset, in_array):
+        """
+        增量解析JSON：每次读取一块数据，用 raw_decode 解出完整的值，补充数据时丢弃已解析部分
+        :param f: 以二进制模式打开并定位到 base_offset 的文件
+        :param in_array: True 表示从顶层数组中逐个读取元素，False 表示只读取一个值
+        """
+        decoder = json.JSONDecoder()
+        text_decoder = codecs.getincrementaldecoder('utf-8')()
+        # offset 为 buffer[index] 在文件中的字节偏移
+        buffer, index, offset = '', 0, base_offset
+        eof = False
+        started = not in_array
+        
+        def fill():
+            nonlocal buffer, index, eof
+            chunk = f.read(STREAM_CHUNK_SIZE)
+            eof = not chunk
+            buffer = buffer[index:] + text_decoder.decode(chunk, final=eof)
+            index = 0
+        
+        while True:
+            # 跳过空白、数组起始符和元素之间的逗号（均为单字节字符）
+            while True:
+                while index < len(buffer):
+                    char = buffer[index]
+                    if char == '[' and not started:
+                        started = True
+                    elif not (char in ' \t\r\n' or (char == ',' and started)):
+                        break
+                    index += 1
+                    offset += 1
+                if index < len(buffer) or eof:
+                    break
+                fill()
+            if index >= len(buffer) or (in_array and buffer[index] == ']'):
+                return
+            
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, index)
+                    # 值恰好在块末尾结束时可能被截断（如数字），补充数据后重新解析
+                    if end < len(buffer) or eof:
+                        break
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill()
+            
+            yield offset, value
+            if not in_array:
+                return
+            offset += len(buffer[index:end].encode('utf-8'))
+            index = end
+    
+    def iter_yaml(self, filename):
+        """
+        流式读取YAML多文档数据，逐个文档解析，返回 ((文档字节偏移, 序号), 记录)
+        文档本身是列表时逐条返回其中的元素
+        """
+        for doc_offset, text in self._iter_yaml_documents(filename):
+            document = yaml.safe_load(text)
+            if isinstance(document, list):
+                for item_index, item in enumerate(document):
+                    yield (doc_offset, item_index), item
+            elif document is not None:
+                yield (doc_offset, None), document
+    
+    def _iter_yaml_documents(self, filename, start_offset=0):
+        """按 '---' 分隔符切分YAML文档，返回 (文档字节偏移, 文档文本)"""
+        file_path = self._get_data_path(filename)
+        with open(file_path, 'rb') as f:
+            f.seek(start_offset)
+            offset = start_offset
+            doc_offset, lines = start_offset, []
+            for line in f:
+                if line.startswith(b'---') and any(l.strip() and not l.lstrip().startswith(b'#') for l in lines):
+                    yield doc_offset, b''.join(lines).decode('utf-8')
+                    doc_offset, lines = offset, []
+                lines.append(line)
+                offset += len(line)
+            if any(l.strip() and not l.lstrip().startswith(b'#') for l in lines):
+                yield doc_offset, b''.join(lines).decode('utf-8')
+    
+    def iter_excel(self, filename, sheet_name=0):
+        """
+        以 openpyxl 只读模式逐行读取Excel测试数据，返回 (行号, 记录)
+        第一行为表头，空行会被跳过
+        """
+        file_path = self._get_data_path(filename)
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            rows = self._get_worksheet(workbook, sheet_name).iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            for row_number, row in enumerate(rows, start=2):
+                if any(cell is not None for cell in row):
+                    yield row_number, dict(zip(header, row))
+        finally:
+            workbook.close()
+    
+    def _get_worksheet(self, workbook, sheet_name):
+        if isinstance(sheet_name, int):
+            return workbook.worksheets[sheet_name]
+        return workbook[sheet_name]
+    
+    def load_record(self, data_file, position, sheet_name=0):
+        """
+        根据 iter_records 返回的位置读取单条记录，无需解析整个文件
+        JSON 按字节偏移定位，YAML 按文档偏移定位，Excel 按行号读取
+        YAML 列表文档和 Excel 工作表在进程内缓存解析状态，按位置顺序读取所有记录时每个文件只解析一遍
+        """
+        file_path = self._get_data_path(data_file)
+        if data_file.endswith('.jsonl'):
+            with open(file_path, 'rb') as f:
+                f.seek(position)
+                return json.loads(f.readline())
+        if data_file.endswith('.json'):
+            with open(file_path, 'rb') as f:
+                f.seek(position)
+                for _, value in self._iter_json_values(f, position, in_array=False):
+                    return value
+        if data_file.endswith('.yaml') or data_file.endswith('.yml'):
+            doc_offset, item_index = position
+            if item_index is None:
+                for _, text in self._iter_yaml_documents(data_file, doc_offset):
+                    return yaml.safe_load(text)
+            return self._copy(self._load_yaml_list(data_file, file_path, doc_offset)[item_index])
+        if data_file.endswith('.xlsx'):
+            mtime = os.stat(file_path).st_mtime_ns
+            with self._record_lock:
+                reader = self._row_readers.get((file_path, sheet_name))
+                if reader is None or reader.mtime != mtime:
+                    if reader is not None:
+                        reader.close()
+                    reader = self._row_readers[(file_path, sheet_name)] = ExcelRowReader(file_path, sheet_name, mtime)
+                return reader.read(position)
+        if data_file.endswith('.xls'):
+            return self.load_excel(data_file, sheet_name)[position]
+        raise TestDataException(f"无法读取测试数据记录: {data_file} -> {position}")
+    
+    def _load_yaml_list(self, data_file, file_path, doc_offset):
+        """解析偏移处的YAML列表文档，只缓存最近一个文档，同一文档中的各条记录共用一次解析"""
+        key = (file_path, doc_offset, os.stat(file_path).st_mtime_ns)
+        with self._record_lock:
+            if self._yaml_document is None or self._yaml_document[0] != key:
+                self._yaml_document = None
+                for _, text in self._iter_yaml_documents(data_file, doc_offset):
+                    self._yaml_document = (key, yaml.safe_load(text))
+                    break
+                if self._yaml_document is None:
+                    raise TestDataException(f"无法读取测试数据记录: {data_file} -> {doc_offset}")
+            return self._yaml_document[1]
 
 # 单例实例
 test_data = TestData()
-    
\ No newline at end of file
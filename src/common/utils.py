@@ -1,57 +1,61 @@
-import os
 import time
-from datetime import datetime
+from concurrent.futures import Future
+from src.common.config import Config, PROJECT_ROOT
 from src.common.logger import logger
+from src.common.screenshot import get_screenshot_writer
 
-def take_screenshot(driver, name_prefix="screenshot"):
+def capture_screenshot(driver, name_prefix="screenshot"):
     """
-    截取当前页面截图并保存
+    截取当前页面截图，文件在后台线程中写入
     :param driver: 浏览器驱动实例
     :param name_prefix: 截图文件名前缀
-    :return: 截图文件路径
+    :return: Future，结果为截图文件路径，失败时为 None
     """
     try:
-        # 截图目录
-        screenshot_dir = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))),
-            'screenshots'
-        )
-        
-        # 确保目录存在
-        if not os.path.exists(screenshot_dir):
-            os.makedirs(screenshot_dir)
-        
-        # 生成唯一的文件名
-        timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-        screenshot_name = f"{name_prefix}_{timestamp}.png"
-        screenshot_path = os.path.join(screenshot_dir, screenshot_name)
-        
-        # 截图并保存
-        driver.save_screenshot(screenshot_path)
-        logger.info(f"截图成功，保存路径: {screenshot_path}")
-        return screenshot_path
+        return get_screenshot_writer().capture(driver, name_prefix)
     except Exception as e:
         logger.error(f"截图失败: {str(e)}")
-        return None
+        future = Future()
+        future.set_result(None)
+        return future
+
+def take_screenshot(driver, name_prefix="screenshot"):
+    """
+    截取当前页面截图并保存，等待文件写入完成
+    :param driver: 浏览器驱动实例
+    :param name_prefix: 截图文件名前缀
+    :return: 截图文件路径
+    """
+    return capture_screenshot(driver, name_prefix).result()
 
-def wait_for(condition, timeout=10, interval=0.5, message="条件未满足"):
+def wait_for(condition, timeout=10, interval=None, message="条件未满足"):
     """
     等待条件满足
     :param condition: 要满足的条件(函数)
     :param timeout: 超时时间(秒)
-    :param interval: 检查间隔(秒)
+    :param interval: 固定检查间隔(秒)，不指定时从 [wait] poll_floor 开始指数退避到 poll_max
     :param message: 超时错误信息
     :return: 条件的返回值
     """
+    if interval is None:
+        config = Config()
+        delay, max_delay = config.get_wait_poll_floor(), config.get_wait_poll_max()
+    else:
+        delay = max_delay = interval
+    
     start_time = time.time()
-    while time.time() - start_time < timeout:
+    while True:
         result = condition()
         if result:
             return result
-        time.sleep(interval)
+        remaining = timeout - (time.time() - start_time)
+        if remaining <= 0:
+            break
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
     raise TimeoutError(f"{message} (超时 {timeout} 秒)")
 
 def get_project_root():
     """获取项目根目录路径"""
-    return os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+    return PROJECT_ROOT
     
\ No newline at end of file
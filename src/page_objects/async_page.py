@@ -0,0 +1,53 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.common.config import Config
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_async_executor():
+    """获取进程内共享的有界线程池，AsyncPage 的所有调用都在其中执行"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=Config().get_concurrency_workers(), thread_name_prefix='async-page'
+                )
+    return _executor
+
+class AsyncPage:
+    """
+    页面对象的异步代理：page 的每个方法都可以 await，实际调用在有界线程池中执行
+    Selenium 客户端是同步的，同一浏览器的命令仍按顺序执行，多个会话之间并发
+    用法:
+        login_page = AsyncPage(LoginPage(driver))
+        await login_page.login("testuser", "Test@123")
+        displayed = await AsyncPage(HomePage(driver)).is_user_menu_displayed()
+    """
+    
+    def __init__(self, page, executor=None):
+        self._page = page
+        self._executor = executor
+    
+    @property
+    def page(self):
+        """被代理的同步页面对象"""
+        return self._page
+    
+    def __getattr__(self, name):
+        attribute = getattr(self._page, name)
+        if not callable(attribute):
+            return attribute
+        
+        @functools.wraps(attribute)
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            executor = self._executor or get_async_executor()
+            return await loop.run_in_executor(executor, functools.partial(attribute, *args, **kwargs))
+        return call
+    
+    def __repr__(self):
+        return f"<AsyncPage {type(self._page).__name__}>"
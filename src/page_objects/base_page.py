@@ -1,108 +1,313 @@
+import time
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as ec
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import (
+    TimeoutException as WebDriverTimeoutException, NoSuchElementException, StaleElementReferenceException,
+    WebDriverException
+)
 from src.common.logger import logger
 from src.common.config import Config
-from src.common.utils import take_screenshot
-from src.common.exceptions import ElementNotFoundException, TimeoutException
+from src.common.failure_capture import failure_capture
+from src.common.exceptions import ElementNotFoundException, PageNotFoundException, TimeoutException
+from src.common.impact import dependency_recorder
+from src.common.perf import instrumented
+from src.page_objects.locators import compile_page_locators
+from src.page_objects.scripts import (
+    FILL_FORM_SCRIPT, NAVIGATION_TIMING_SCRIPT, PAGE_SNAPSHOT_SCRIPT, READ_TEXTS_SCRIPT
+)
+from src.page_objects.snapshot import PageSnapshot
+from src.page_objects.waits import ElementWaiter
 
 class BasePage:
     """基础页面类，封装Selenium常用操作，作为所有页面对象的基类"""
     
+    # 页面对象声明的定位器 {名称: Locator}，子类定义时由 compile_page_locators 生成
+    page_locators = {}
+    _required_locators = ()
+    _verify_script = None
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # 类定义时规范化并登记定位器、编译就绪检查脚本，实例化时不再处理
+        compile_page_locators(cls)
+    
     def __init__(self, driver):
         self.driver = driver
+        # 记录当前用例使用的页面对象，用于按修改选择用例
+        dependency_recorder.note_class(type(self))
         self.config = Config()
         self.timeout = self.config.get_timeout()
         self.base_url = self.config.get_base_url()
+        self.waiter = ElementWaiter(driver, self.config)
+        self.navigation_timing = self.config.is_navigation_timing_enabled()
+        self.last_navigation = None
+        
+        # 元素缓存：同一页面内重复操作同一定位器时跳过查找，页面跳转或元素失效时清空
+        self.element_cache_enabled = self.config.is_element_cache_enabled()
+        self._element_cache = {}
+        self._cache_url = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    def invalidate_cache(self, locator=None):
+        """清空元素缓存，指定定位器时只清除该元素"""
+        if locator is None:
+            self._element_cache.clear()
+        else:
+            self._element_cache.pop(locator, None)
+    
+    def cache_stats(self):
+        """元素缓存命中统计"""
+        return {'hits': self.cache_hits, 'misses': self.cache_misses, 'size': len(self._element_cache)}
+    
+    def _with_element(self, locator, action):
+        """对元素执行操作，缓存的元素已失效时重新查找并重试一次"""
+        element = self.find_element(locator)
+        try:
+            return action(element)
+        except StaleElementReferenceException:
+            logger.info("元素已失效，重新查找: %s", locator)
+            self.invalidate_cache(locator)
+            return action(self.find_element(locator))
     
+    @instrumented
     def open(self, url=None):
         """打开页面"""
+        self.invalidate_cache()
         if url:
-            self.driver.get(url)
-            logger.info(f"打开页面: {url}")
+            self._navigate(url)
+            logger.info("打开页面: %s", url)
         elif self.base_url:
-            self.driver.get(self.base_url)
-            logger.info(f"打开基础页面: {self.base_url}")
+            self._navigate(self.base_url)
+            logger.info("打开基础页面: %s", self.base_url)
     
+    def _navigate(self, url):
+        """导航到 url，并按配置记录本次导航的耗时"""
+        start = time.perf_counter()
+        self.driver.get(url)
+        elapsed = (time.perf_counter() - start) * 1000
+        if not self.navigation_timing:
+            return
+        try:
+            timing = self.driver.execute_script(NAVIGATION_TIMING_SCRIPT) or {}
+        except WebDriverException as e:
+            logger.debug("读取导航耗时失败: %s", str(e).strip())
+            return
+        timing = dict(timing, url=url, get_ms=round(elapsed, 1))
+        self.last_navigation = timing
+        logger.info(
+            "导航耗时 %s: get %.0fms, TTFB %.0fms, DOMContentLoaded %.0fms, load %s, 资源 %s 个",
+            url, elapsed, timing.get('ttfb') or 0, timing.get('dom_content_loaded') or 0,
+            f"{timing['load']:.0f}ms" if timing.get('load') else "未完成", timing.get('resources')
+        )
+        recorder = getattr(self.driver, '_command_recorder', None)
+        if recorder is not None:
+            recorder.record_navigation(timing)
+    
+    @instrumented
     def find_element(self, locator):
-        """查找单个元素，带显式等待"""
+        """查找单个元素，带显式等待；同一页面内再次查找同一定位器时直接返回缓存的元素"""
+        if self.element_cache_enabled:
+            element = self._element_cache.get(locator)
+            if element is not None:
+                self.cache_hits += 1
+                logger.debug("元素缓存命中: %s", locator)
+                return element
+            self.cache_misses += 1
+        
         try:
-            element = WebDriverWait(self.driver, self.timeout).until(
-                ec.presence_of_element_located(locator)
-            )
-            logger.info(f"找到元素: {locator}")
-            return element
-        except TimeoutException:
+            element = self.waiter.until_present(locator, self.timeout)
+            logger.info("找到元素: %s", locator)
+        except WebDriverTimeoutException:
             msg = f"超时未找到元素: {locator}"
             logger.error(msg)
-            take_screenshot(self.driver)
+            failure_capture.request(self.driver, msg)
             raise TimeoutException(msg)
         except NoSuchElementException:
             msg = f"未找到元素: {locator}"
             logger.error(msg)
-            take_screenshot(self.driver)
+            failure_capture.request(self.driver, msg)
             raise ElementNotFoundException(msg)
+        
+        if self.element_cache_enabled:
+            self._element_cache[locator] = element
+        return element
     
+    @instrumented
     def find_elements(self, locator):
         """查找多个元素，带显式等待"""
         try:
-            elements = WebDriverWait(self.driver, self.timeout).until(
+            elements = WebDriverWait(self.driver, self.timeout, poll_frequency=self.waiter.poll_floor).until(
                 ec.presence_of_all_elements_located(locator)
             )
-            logger.info(f"找到 {len(elements)} 个元素: {locator}")
+            logger.info("找到 %d 个元素: %s", len(elements), locator)
             return elements
-        except TimeoutException:
+        except WebDriverTimeoutException:
             msg = f"超时未找到元素: {locator}"
             logger.error(msg)
-            take_screenshot(self.driver)
+            failure_capture.request(self.driver, msg)
             raise TimeoutException(msg)
     
+    @instrumented
     def click(self, locator):
         """点击元素"""
-        element = self.find_element(locator)
-        element.click()
-        logger.info(f"点击元素: {locator}")
+        self._with_element(locator, lambda element: element.click())
+        logger.info("点击元素: %s", locator)
     
+    @instrumented
     def send_keys(self, locator, text):
         """输入文本"""
-        element = self.find_element(locator)
-        element.clear()
-        element.send_keys(text)
-        logger.info(f"向元素 {locator} 输入文本: {text}")
+        def clear_and_type(element):
+            element.clear()
+            element.send_keys(text)
+        self._with_element(locator, clear_and_type)
+        logger.info("向元素 %s 输入文本: %s", locator, text)
     
+    @instrumented
     def get_text(self, locator):
         """获取元素文本"""
-        text = self.find_element(locator).text
-        logger.info(f"获取元素 {locator} 的文本: {text}")
+        text = self._with_element(locator, lambda element: element.text)
+        logger.info("获取元素 %s 的文本: %s", locator, text)
         return text
     
+    @instrumented
+    def fill_form(self, fields, native=()):
+        """
+        批量填写表单：一次 execute_script 定位并填写多个输入框
+        :param fields: {定位器: 文本} 字典，按字典顺序填写
+        :param native: 需要真实按键事件的定位器，改为逐个调用 send_keys
+        脚本中找不到或无法直接赋值的元素也会退回到 send_keys（带显式等待）
+        """
+        batch = [(locator, text) for locator, text in fields.items() if locator not in native]
+        fallback = [locator for locator in fields if locator in native]
+        if batch:
+            failed = self.driver.execute_script(
+                FILL_FORM_SCRIPT, [[by, value, str(text)] for (by, value), text in batch]
+            )
+            fallback.extend(batch[index][0] for index in failed)
+            logger.info("批量填写 %d 个输入框: %s", len(batch) - len(failed),
+                        [locator for locator, _ in batch])
+        for locator in fallback:
+            self.send_keys(locator, fields[locator])
+    
+    @instrumented
+    def read_texts(self, locators):
+        """
+        批量读取元素文本：一次 execute_script 读取多个元素
+        脚本中找不到的元素退回到 get_text（带显式等待）
+        :return: 与 locators 顺序一致的文本列表
+        """
+        locators = list(locators)
+        texts = self.driver.execute_script(READ_TEXTS_SCRIPT, [[by, value] for by, value in locators])
+        for index, text in enumerate(texts):
+            if text is None:
+                texts[index] = self.get_text(locators[index])
+            else:
+                texts[index] = text.strip()
+        logger.info("批量读取 %d 个元素文本: %s", len(texts), texts)
+        return texts
+    
+    @instrumented
+    def snapshot(self, locators, attributes=(), wait_for=None):
+        """
+        页面状态快照：一次 execute_script 读取当前URL、标题和每个定位器的
+        是否存在、是否可见、文本、value、是否可用/选中以及指定的属性
+        :param locators: 定位器列表
+        :param attributes: 需要读取的元素属性名
+        :param wait_for: 先等待该定位器的元素出现（页面跳转或异步渲染后使用），超时不报错，快照中该元素为不存在
+        :return: PageSnapshot
+        """
+        locators = [tuple(locator) for locator in locators]
+        if wait_for is not None:
+            try:
+                self.waiter.until_present(wait_for, self.timeout)
+            except WebDriverTimeoutException:
+                logger.info("等待元素超时，直接获取快照: %s", wait_for)
+        result = self.driver.execute_script(
+            PAGE_SNAPSHOT_SCRIPT, [[by, value, list(attributes)] for by, value in locators]
+        )
+        snapshot = PageSnapshot.from_script(locators, result)
+        self._track_url(snapshot.url)
+        logger.info("页面快照 %s: %s", snapshot.url,
+                    {f"{by}={value}": state.displayed for (by, value), state in snapshot.elements.items()})
+        return snapshot
+    
+    @instrumented
+    def missing_locators(self):
+        """一次脚本查找页面对象声明的所有必需定位器，返回找不到的定位器名称"""
+        if not self._required_locators:
+            return []
+        missing = self.driver.execute_script(self._verify_script)
+        return [self._required_locators[index][0] for index in missing]
+    
+    @instrumented
+    def verify_page(self, timeout=None):
+        """
+        检查页面是否加载完成：页面对象声明的必需定位器都能找到
+        每次检查只执行一次脚本，未全部找到时按退避间隔重试
+        :param timeout: 最长等待时间(秒)，默认使用配置的超时时间，0 表示只检查一次
+        超时仍缺少元素时抛出 PageNotFoundException，列出缺少的定位器
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        interval = self.waiter.poll_floor
+        while True:
+            missing = self.missing_locators()
+            if not missing:
+                logger.info("页面已就绪: %s", type(self).__name__)
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, self.waiter.poll_max)
+        msg = f"页面 {type(self).__name__} 未加载完成，找不到元素: " + ", ".join(
+            f"{name} {tuple(self.page_locators[name])}" for name in missing
+        )
+        logger.error(msg)
+        failure_capture.request(self.driver, msg)
+        raise PageNotFoundException(msg)
+    
+    @instrumented
     def is_displayed(self, locator):
         """判断元素是否可见"""
         try:
-            displayed = self.find_element(locator).is_displayed()
-            logger.info(f"元素 {locator} 可见性: {displayed}")
+            displayed = self._with_element(locator, lambda element: element.is_displayed())
+            logger.info("元素 %s 可见性: %s", locator, displayed)
             return displayed
         except:
             return False
     
+    @instrumented
     def get_current_url(self):
         """获取当前页面URL"""
         url = self.driver.current_url
-        logger.info(f"当前页面URL: {url}")
+        self._track_url(url)
+        logger.info("当前页面URL: %s", url)
         return url
     
+    def _track_url(self, url):
+        # URL 变化说明页面已跳转，缓存的元素不再可用
+        if self._cache_url is not None and url != self._cache_url:
+            self.invalidate_cache()
+        self._cache_url = url
+    
+    @instrumented
     def refresh(self):
         """刷新当前页面"""
+        self.invalidate_cache()
         self.driver.refresh()
         logger.info("刷新页面")
     
+    @instrumented
     def back(self):
         """返回上一页"""
+        self.invalidate_cache()
         self.driver.back()
         logger.info("返回上一页")
     
+    @instrumented
     def maximize_window(self):
         """最大化窗口"""
         self.driver.maximize_window()
         logger.info("窗口最大化")
-    
\ No newline at end of file
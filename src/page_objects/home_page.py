@@ -1,2 +1,43 @@
-#TODO
-# home_page页面元素的封装
\ No newline at end of file
+from selenium.webdriver.common.by import By
+from src.page_objects.base_page import BasePage
+from src.page_objects.locators import Locator
+
+class HomePage(BasePage):
+    """首页页面对象"""
+    
+    # 元素定位器
+    USER_MENU = Locator(By.ID, "userMenu")
+    USERNAME_LABEL = Locator(By.CSS_SELECTOR, "#userMenu .username")
+    LOGOUT_LINK = Locator(By.ID, "logoutLink")
+    
+    def __init__(self, driver):
+        super().__init__(driver)
+        self.page_url = f"{self.base_url}/home"
+    
+    def open(self, url=None):
+        """打开首页"""
+        super().open(self.page_url)
+    
+    def is_user_menu_displayed(self):
+        """判断用户菜单是否显示"""
+        return self.is_displayed(self.USER_MENU)
+    
+    def get_username(self):
+        """获取用户菜单中显示的用户名"""
+        return self.get_text(self.USERNAME_LABEL)
+    
+    def get_user_menu_state(self):
+        """
+        一次读取用户菜单是否显示和显示的用户名，返回 PageSnapshot
+        登录后页面跳转需要时间，先等待用户菜单出现
+        """
+        return self.snapshot([self.USER_MENU, self.USERNAME_LABEL], wait_for=self.USER_MENU)
+    
+    def is_logged_in(self):
+        """打开首页并判断是否处于登录状态：会话无效时应用会跳转回登录页"""
+        self.open()
+        return '/login' not in self.get_current_url()
+    
+    def logout(self):
+        """退出登录"""
+        self.click(self.LOGOUT_LINK)
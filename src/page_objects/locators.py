@@ -0,0 +1,145 @@
+import json
+import re
+from selenium.webdriver.common.by import By
+from src.page_objects.scripts import FIND_ELEMENT_JS, VERIFY_LOCATORS_JS
+
+# Selenium 支持的定位方式取值，用于识别页面对象中的普通元组定位器
+BY_VALUES = frozenset(value for name, value in vars(By).items() if name.isupper() and isinstance(value, str))
+
+_IDENT = r'-?[_a-zA-Z][\w-]*'
+_CSS_ID = re.compile(rf'^#({_IDENT})$')
+_CLASS_NAME = re.compile(rf'^{_IDENT}$')
+_XPATH_ID = re.compile(rf'''^//\*\[@id=(['"])({_IDENT})\1\]$''')
+_XPATH_SIMPLE = re.compile(rf'''^//({_IDENT}|\*)(?:\[@({_IDENT})=(['"])([^'"]*)\3\])?$''')
+
+def _css_string(value):
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def normalize_locator(by, value):
+    """
+    把定位器转换为查找开销最小的等价写法：能用 ID 的用 ID，其次 CSS 选择器
+    XPath 只转换 //tag、//tag[@attr='值'] 这类简单表达式；LINK_TEXT 按文本匹配，没有等价的 CSS 写法，保持不变
+    :return: (by, value)
+    """
+    if by == By.CSS_SELECTOR:
+        match = _CSS_ID.match(value.strip())
+        if match:
+            return By.ID, match.group(1)
+    elif by == By.CLASS_NAME and _CLASS_NAME.match(value):
+        return By.CSS_SELECTOR, f".{value}"
+    elif by == By.NAME:
+        return By.CSS_SELECTOR, f"[name={_css_string(value)}]"
+    elif by == By.TAG_NAME and _CLASS_NAME.match(value):
+        return By.CSS_SELECTOR, value
+    elif by == By.XPATH:
+        value = value.strip()
+        match = _XPATH_ID.match(value)
+        if match:
+            return By.ID, match.group(2)
+        match = _XPATH_SIMPLE.match(value)
+        if match:
+            tag, attribute, _, attribute_value = match.groups()
+            selector = tag if attribute is None else f"{'' if tag == '*' else tag}[{attribute}={_css_string(attribute_value)}]"
+            return By.CSS_SELECTOR, selector
+    return by, value
+
+class Locator(tuple):
+    """
+    声明式元素定位器，用法与 (by, value) 元组相同（可解包、可作为字典键、可直接传给 find_element）
+    创建时转换为开销最小的定位方式，original 保留声明时的写法
+    :param required: 是否为页面加载完成后必然存在的元素，BasePage.verify_page 只检查必需的定位器
+    """
+    
+    def __new__(cls, by, value, required=True):
+        locator = super().__new__(cls, normalize_locator(by, value))
+        locator.original = (by, value)
+        locator.required = required
+        locator.name = None
+        return locator
+    
+    def __getnewargs__(self):
+        return tuple(self)
+    
+    def __set_name__(self, owner, name):
+        # 同一个定位器被其他页面对象复用时保留第一次声明的名称
+        if self.name is None:
+            self.name = name
+    
+    @property
+    def by(self):
+        return self[0]
+    
+    @property
+    def value(self):
+        return self[1]
+    
+    def to_dict(self):
+        return {
+            'by': self.by,
+            'value': self.value,
+            'original': list(self.original),
+            'required': self.required,
+        }
+
+def _is_locator_tuple(name, value):
+    return (name.isupper() and type(value) is tuple and len(value) == 2
+            and value[0] in BY_VALUES and isinstance(value[1], str))
+
+def compile_verify_script(locators):
+    """把定位器编译进就绪检查脚本，执行时返回找不到的定位器下标"""
+    payload = json.dumps([[by, value] for by, value in locators], ensure_ascii=False)
+    return FIND_ELEMENT_JS + f"var locators = {payload};\n" + VERIFY_LOCATORS_JS
+
+class LocatorRegistry:
+    """全局定位器注册表：页面对象类定义时登记其所有定位器，供工具查询完整的页面元素清单"""
+    
+    def __init__(self):
+        self._pages = {}
+    
+    def register(self, page_class, locators):
+        self._pages[page_class] = dict(locators)
+    
+    def pages(self):
+        """已登记的页面对象类"""
+        return list(self._pages)
+    
+    def get(self, page_class):
+        """页面对象类的定位器 {名称: Locator}，包括从父类继承的"""
+        return dict(self._pages.get(page_class, {}))
+    
+    def find(self, by, value):
+        """查找使用了某个定位器的页面对象，按声明时或规范化后的写法匹配，返回 [(页面对象类, 名称)]"""
+        return [(page_class, name) for page_class, locators in self._pages.items()
+                for name, locator in locators.items() if (by, value) in (tuple(locator), locator.original)]
+    
+    def to_dict(self):
+        """{页面对象类的完整路径: {名称: 定位器信息}}"""
+        return {
+            f"{page_class.__module__}.{page_class.__qualname__}": {
+                name: locator.to_dict() for name, locator in locators.items()
+            }
+            for page_class, locators in self._pages.items()
+        }
+
+locator_registry = LocatorRegistry()
+
+def compile_page_locators(page_class):
+    """
+    收集页面对象类（包括父类）声明的定位器并登记到全局注册表，在类定义时调用
+    类中大写命名的普通 (by, value) 元组同样转换为 Locator，所有定位器都视为必需；
+    同时把必需的定位器编译为该页面的就绪检查脚本
+    """
+    locators = {}
+    for klass in reversed(page_class.__mro__):
+        for name, value in list(vars(klass).items()):
+            if klass is page_class and _is_locator_tuple(name, value):
+                value = Locator(*value)
+                value.__set_name__(page_class, name)
+                setattr(page_class, name, value)
+            if isinstance(value, Locator):
+                locators[name] = value
+    required = [(name, locator) for name, locator in locators.items() if locator.required]
+    page_class.page_locators = locators
+    page_class._required_locators = required
+    page_class._verify_script = compile_verify_script([locator for _, locator in required]) if required else None
+    locator_registry.register(page_class, locators)
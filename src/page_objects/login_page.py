@@ -1,15 +1,19 @@
+from selenium.common.exceptions import TimeoutException as WebDriverTimeoutException
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from src.common.logger import logger
 from src.page_objects.base_page import BasePage
+from src.page_objects.locators import Locator
 
 class LoginPage(BasePage):
     """登录页面对象"""
     
-    # 元素定位器
-    USERNAME_INPUT = (By.ID, "username")
-    PASSWORD_INPUT = (By.ID, "password")
-    LOGIN_BUTTON = (By.ID, "loginBtn")
-    ERROR_MESSAGE = (By.CLASS_NAME, "error-message")
-    FORGOT_PASSWORD_LINK = (By.LINK_TEXT, "忘记密码")
+    # 元素定位器，required=False 的元素不参与 verify_page 检查
+    USERNAME_INPUT = Locator(By.ID, "username")
+    PASSWORD_INPUT = Locator(By.ID, "password")
+    LOGIN_BUTTON = Locator(By.ID, "loginBtn")
+    ERROR_MESSAGE = Locator(By.CLASS_NAME, "error-message", required=False)
+    FORGOT_PASSWORD_LINK = Locator(By.LINK_TEXT, "忘记密码", required=False)
     
     def __init__(self, driver):
         super().__init__(driver)
@@ -32,12 +36,28 @@ class LoginPage(BasePage):
         self.click(self.LOGIN_BUTTON)
     
     def login(self, username, password):
-        """完整登录流程"""
+        """完整登录流程，用户名和密码在一次脚本调用中填写"""
         self.open()
-        self.enter_username(username)
-        self.enter_password(password)
+        self.fill_form({
+            self.USERNAME_INPUT: username,
+            self.PASSWORD_INPUT: password,
+        })
         self.click_login_button()
     
+    def wait_for_login_result(self, timeout=None):
+        """
+        等待登录请求完成：页面离开登录页时返回 True，显示错误提示或超时返回 False
+        eager/none 页面加载策略下点击登录后跳转可能尚未完成，不能直接读取当前URL判断结果
+        """
+        try:
+            WebDriverWait(self.driver, timeout or self.timeout, poll_frequency=self.waiter.poll_floor).until(
+                lambda driver: '/login' not in driver.current_url or driver.find_elements(*self.ERROR_MESSAGE)
+            )
+        except WebDriverTimeoutException:
+            logger.warning("等待登录结果超时，仍停留在登录页")
+            return False
+        return '/login' not in self.get_current_url()
+    
     def get_error_message(self):
         """获取错误提示信息"""
         return self.get_text(self.ERROR_MESSAGE)
@@ -46,7 +66,10 @@ class LoginPage(BasePage):
         """判断错误提示是否显示"""
         return self.is_displayed(self.ERROR_MESSAGE)
     
+    def get_error_state(self):
+        """一次读取错误提示是否显示和提示内容，返回 PageSnapshot；提示可能异步出现，先等待其出现"""
+        return self.snapshot([self.ERROR_MESSAGE], wait_for=self.ERROR_MESSAGE)
+    
     def click_forgot_password(self):
         """点击忘记密码链接"""
         self.click(self.FORGOT_PASSWORD_LINK)
-    
\ No newline at end of file
@@ -0,0 +1,185 @@
+"""页面中执行的JS脚本，用于在一次 WebDriver 往返中批量操作多个元素"""
+
+# 按 Selenium 定位方式（By.ID、By.CSS_SELECTOR 等的取值）在页面中查找元素
+FIND_ELEMENT_JS = """
+function findElement(by, value) {
+    switch (by) {
+        case 'id':
+            return document.getElementById(value);
+        case 'css selector':
+            return document.querySelector(value);
+        case 'xpath':
+            return document.evaluate(value, document, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        case 'name':
+            return document.getElementsByName(value)[0] || null;
+        case 'class name':
+            return document.getElementsByClassName(value)[0] || null;
+        case 'tag name':
+            return document.getElementsByTagName(value)[0] || null;
+        case 'link text':
+            return Array.prototype.find.call(document.links,
+                function (a) { return a.innerText.trim() === value; }) || null;
+        case 'partial link text':
+            return Array.prototype.find.call(document.links,
+                function (a) { return a.innerText.indexOf(value) !== -1; }) || null;
+    }
+    return null;
+}
+"""
+
+# 批量填写输入框：arguments[0] 为 [[by, value, text], ...]
+# 通过原生 value setter 赋值并触发 input/change 事件，兼容 React/Vue 等框架的受控组件
+# 返回无法通过脚本填写的下标（元素不存在、不可编辑或不是输入框），由调用方改用 send_keys
+FILL_FORM_SCRIPT = FIND_ELEMENT_JS + """
+var fields = arguments[0];
+var fallback = [];
+for (var i = 0; i < fields.length; i++) {
+    var el = findElement(fields[i][0], fields[i][1]);
+    var proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype
+        : el instanceof HTMLInputElement ? HTMLInputElement.prototype : null;
+    if (!proto || el.disabled || el.readOnly) {
+        fallback.push(i);
+        continue;
+    }
+    var setter = Object.getOwnPropertyDescriptor(proto, 'value').set;
+    el.focus();
+    setter.call(el, fields[i][2]);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+}
+return fallback;
+"""
+
+# 批量读取元素文本：arguments[0] 为 [[by, value], ...]，元素不存在时对应位置为 null
+READ_TEXTS_SCRIPT = FIND_ELEMENT_JS + """
+return arguments[0].map(function (locator) {
+    var el = findElement(locator[0], locator[1]);
+    return el ? el.innerText : null;
+});
+"""
+
+# 等待元素出现/可见：arguments 为 (by, value, 条件, 超时毫秒, callback)
+# 先同步检查一次；不满足时通过 MutationObserver 监听DOM变化，页面可见时再用 requestAnimationFrame
+# 补充检查样式/布局引起的可见性变化，满足条件后立即回调返回元素，超时回调 null
+WAIT_FOR_ELEMENT_SCRIPT = FIND_ELEMENT_JS + """
+var by = arguments[0], value = arguments[1], condition = arguments[2], timeoutMs = arguments[3];
+var done = arguments[arguments.length - 1];
+
+function check() {
+    var el = findElement(by, value);
+    if (!el || condition !== 'visible') {
+        return el;
+    }
+    var style = window.getComputedStyle(el);
+    var visible = (el.offsetWidth || el.offsetHeight || el.getClientRects().length) &&
+        style.visibility !== 'hidden' && style.display !== 'none';
+    return visible ? el : null;
+}
+
+var found = check();
+if (found) {
+    done(found);
+    return;
+}
+
+var finished = false, observer = null, timer = null;
+function finish(result) {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    if (observer) {
+        observer.disconnect();
+    }
+    clearTimeout(timer);
+    done(result);
+}
+
+observer = new MutationObserver(function () {
+    var el = check();
+    if (el) {
+        finish(el);
+    }
+});
+observer.observe(document.documentElement || document, {
+    childList: true, subtree: true, attributes: true, characterData: true
+});
+
+function onFrame() {
+    if (finished) {
+        return;
+    }
+    var el = check();
+    if (el) {
+        finish(el);
+    } else {
+        requestAnimationFrame(onFrame);
+    }
+}
+if (document.visibilityState === 'visible') {
+    requestAnimationFrame(onFrame);
+}
+timer = setTimeout(function () { finish(null); }, timeoutMs);
+"""
+
+# 读取最近一次导航的耗时（相对导航开始的毫秒数），优先使用 Navigation Timing Level 2，旧浏览器退回 performance.timing
+# load 为 0 表示 load 事件尚未结束（eager/none 加载策略下常见）
+NAVIGATION_TIMING_SCRIPT = """
+var nav = performance.getEntriesByType ? performance.getEntriesByType('navigation')[0] : null;
+if (nav) {
+    return {
+        ttfb: nav.responseStart, dom_content_loaded: nav.domContentLoadedEventEnd, load: nav.loadEventEnd,
+        resources: performance.getEntriesByType('resource').length, ready_state: document.readyState
+    };
+}
+var t = performance.timing;
+function since(value) { return value ? value - t.navigationStart : 0; }
+return {
+    ttfb: since(t.responseStart), dom_content_loaded: since(t.domContentLoadedEventEnd), load: since(t.loadEventEnd),
+    resources: null, ready_state: document.readyState
+};
+"""
+
+# 页面状态快照：arguments[0] 为 [[by, value, [属性名, ...]], ...]
+# 一次返回当前URL、标题和每个定位器的状态，元素不存在时对应位置为 null
+PAGE_SNAPSHOT_SCRIPT = FIND_ELEMENT_JS + """
+function isVisible(el) {
+    var style = window.getComputedStyle(el);
+    return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length) &&
+        style.visibility !== 'hidden' && style.display !== 'none';
+}
+return {
+    url: window.location.href,
+    title: document.title,
+    ready_state: document.readyState,
+    elements: arguments[0].map(function (locator) {
+        var el = findElement(locator[0], locator[1]);
+        if (!el) {
+            return null;
+        }
+        var attributes = {};
+        locator[2].forEach(function (name) { attributes[name] = el.getAttribute(name); });
+        return {
+            displayed: isVisible(el),
+            text: (el.innerText || '').trim(),
+            value: 'value' in el ? el.value : null,
+            enabled: !el.disabled,
+            selected: !!(el.checked || el.selected),
+            attributes: attributes
+        };
+    })
+};
+"""
+
+# 页面就绪检查：必需定位器在页面对象类定义时编译进脚本（var locators = [[by, value], ...];），调用时不再传参
+# 返回找不到的定位器下标
+VERIFY_LOCATORS_JS = """
+var missing = [];
+for (var i = 0; i < locators.length; i++) {
+    if (!findElement(locators[i][0], locators[i][1])) {
+        missing.push(i);
+    }
+}
+return missing;
+"""
@@ -0,0 +1,76 @@
+class ElementState:
+    """快照中单个元素的状态，元素不存在时 present 为 False，其余字段为空值"""
+    
+    __slots__ = ('locator', 'present', 'displayed', 'text', 'value', 'enabled', 'selected', 'attributes')
+    
+    def __init__(self, locator, data=None):
+        data = data or {}
+        self.locator = locator
+        self.present = bool(data)
+        self.displayed = bool(data.get('displayed'))
+        self.text = data.get('text')
+        self.value = data.get('value')
+        self.enabled = bool(data.get('enabled'))
+        self.selected = bool(data.get('selected'))
+        self.attributes = data.get('attributes') or {}
+    
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__ if name != 'locator'}
+    
+    def __repr__(self):
+        if not self.present:
+            return f"<ElementState {self.locator} 不存在>"
+        return f"<ElementState {self.locator} displayed={self.displayed} text={self.text!r}>"
+
+class PageSnapshot:
+    """
+    BasePage.snapshot 一次脚本调用得到的页面状态：当前URL、标题和各定位器的元素状态
+    读取快照不再访问浏览器，可直接用于断言
+    """
+    
+    def __init__(self, url, title, ready_state, elements):
+        self.url = url
+        self.title = title
+        self.ready_state = ready_state
+        self.elements = elements
+    
+    @classmethod
+    def from_script(cls, locators, result):
+        elements = {locator: ElementState(locator, data) for locator, data in zip(locators, result['elements'])}
+        return cls(result['url'], result['title'], result['ready_state'], elements)
+    
+    def __getitem__(self, locator):
+        """定位器对应的元素状态，快照中没有该定位器时抛出 KeyError"""
+        try:
+            return self.elements[tuple(locator)]
+        except KeyError:
+            raise KeyError(f"快照中没有定位器 {locator}，请在 snapshot() 中传入")
+    
+    def __contains__(self, locator):
+        return tuple(locator) in self.elements
+    
+    def is_present(self, locator):
+        return self[locator].present
+    
+    def is_displayed(self, locator):
+        return self[locator].displayed
+    
+    def text(self, locator):
+        return self[locator].text
+    
+    def value(self, locator):
+        return self[locator].value
+    
+    def attribute(self, locator, name):
+        return self[locator].attributes.get(name)
+    
+    def to_dict(self):
+        return {
+            'url': self.url,
+            'title': self.title,
+            'ready_state': self.ready_state,
+            'elements': {f"{by}={value}": state.to_dict() for (by, value), state in self.elements.items()},
+        }
+    
+    def __repr__(self):
+        return f"<PageSnapshot {self.url} {len(self.elements)} 个元素>"
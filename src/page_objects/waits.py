@@ -0,0 +1,83 @@
+import time
+from selenium.common.exceptions import (
+    JavascriptException, NoSuchElementException, StaleElementReferenceException,
+    TimeoutException, WebDriverException
+)
+from src.common.config import Config
+from src.common.logger import logger
+from src.page_objects.scripts import WAIT_FOR_ELEMENT_SCRIPT
+
+# 单次异步脚本的最长等待时间(秒)，小于 WebDriver 默认的30秒脚本超时，超出部分分多次等待
+MAX_SCRIPT_WAIT = 25.0
+
+class ElementWaiter:
+    """
+    事件驱动的元素等待
+    优先在页面中通过 MutationObserver 监听DOM变化，条件满足时立即返回，
+    浏览器不支持异步脚本时退回到指数退避轮询（从 poll_floor 开始，逐步放大到 poll_max）
+    """
+    
+    def __init__(self, driver, config=None):
+        config = config or Config()
+        self.driver = driver
+        self.use_events = config.get_wait_strategy() == 'event'
+        self.poll_floor = config.get_wait_poll_floor()
+        self.poll_max = config.get_wait_poll_max()
+    
+    def until_present(self, locator, timeout):
+        """等待元素出现在DOM中，返回 WebElement，超时抛出 selenium 的 TimeoutException"""
+        return self._wait(locator, 'present', timeout)
+    
+    def until_visible(self, locator, timeout):
+        """等待元素可见，返回 WebElement，超时抛出 selenium 的 TimeoutException"""
+        return self._wait(locator, 'visible', timeout)
+    
+    def _wait(self, locator, condition, timeout):
+        deadline = time.monotonic() + timeout
+        if self.use_events:
+            try:
+                element = self._wait_by_events(locator, condition, deadline)
+                if element is not None:
+                    return element
+                raise TimeoutException(f"等待元素超时: {locator}")
+            except (TimeoutException, NoSuchElementException, JavascriptException):
+                # 页面跳转导致的脚本中断已在 _wait_by_events 中处理，其余脚本错误（如无效的选择器）由调用方处理
+                raise
+            except WebDriverException as e:
+                # 异步脚本无法执行（如脚本超时、驱动不支持异步脚本），本次改为轮询，之后的等待仍优先使用事件
+                logger.warning("事件驱动等待不可用，本次改为轮询: %s", str(e).strip())
+        return self._wait_by_polling(locator, condition, deadline)
+    
+    def _wait_by_events(self, locator, condition, deadline):
+        by, value = locator
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            chunk = min(remaining, MAX_SCRIPT_WAIT)
+            try:
+                element = self.driver.execute_async_script(
+                    WAIT_FOR_ELEMENT_SCRIPT, by, value, condition, int(chunk * 1000)
+                )
+            except JavascriptException as e:
+                # 等待期间页面跳转会中断脚本，在新页面上继续等待
+                if 'unload' not in str(e) and 'navigat' not in str(e):
+                    raise
+                element = None
+            if element is not None:
+                return element
+    
+    def _wait_by_polling(self, locator, condition, deadline):
+        interval = self.poll_floor
+        while True:
+            try:
+                element = self.driver.find_element(*locator)
+                if condition != 'visible' or element.is_displayed():
+                    return element
+            except (NoSuchElementException, StaleElementReferenceException):
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutException(f"等待元素超时: {locator}")
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, self.poll_max)
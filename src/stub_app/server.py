@@ -0,0 +1,190 @@
+"""
+本地替身应用：与 LoginPage/HomePage 定位器一致的登录页和首页，用于离线运行用例和框架性能基准
+
+用法: python -m src.stub_app.server --port 8000
+"""
+import argparse
+import html
+import secrets
+import threading
+from http import cookies
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from src.common.logger import logger
+
+# 默认账号：用户名 -> (密码, 首页显示的用户名)
+DEFAULT_USERS = {
+    'testuser': ('Test@123', 'testuser'),
+}
+
+SESSION_COOKIE = 'session'
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+LOGIN_BODY = """<form id="loginForm" method="post" action="/login">
+    <input id="username" name="username" type="text" value="{username}">
+    <input id="password" name="password" type="password">
+    <button id="loginBtn" type="submit">登录</button>
+    <a href="/forgot-password">忘记密码</a>
+</form>
+{error}"""
+
+HOME_BODY = """<div id="userMenu" class="user-menu">
+    <span class="username">{display_name}</span>
+    <a id="logoutLink" href="/logout">退出登录</a>
+</div>"""
+
+class StubAppHandler(BaseHTTPRequestHandler):
+    """请求处理：GET/POST /login、GET /home、GET /logout、GET /forgot-password"""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path in ('/', '/login'):
+            self._send_login()
+        elif path == '/home':
+            display_name = self._current_user()
+            if display_name is None:
+                self._redirect('/login')
+            else:
+                self._send_page("首页", HOME_BODY.format(display_name=html.escape(display_name)))
+        elif path == '/logout':
+            self.server.sessions.pop(self._session_token(), None)
+            self._redirect('/login', clear_session=True)
+        elif path == '/forgot-password':
+            self._send_page("忘记密码", "<h1>重置密码</h1>")
+        else:
+            self._send_page("页面不存在", "<h1>404</h1>", status=404)
+    
+    def do_POST(self):
+        if self.path.split('?', 1)[0] != '/login':
+            self._send_page("页面不存在", "<h1>404</h1>", status=404)
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        form = parse_qs(self.rfile.read(length).decode('utf-8'), keep_blank_values=True)
+        username = form.get('username', [''])[0].strip()
+        password = form.get('password', [''])[0]
+        
+        if not username:
+            self._send_login(error="用户名不能为空")
+            return
+        if not password:
+            self._send_login(username, error="密码不能为空")
+            return
+        user = self.server.users.get(username)
+        if user is None or user[0] != password:
+            self._send_login(username, error="用户名或密码错误")
+            return
+        
+        token = secrets.token_hex(16)
+        self.server.sessions[token] = user[1]
+        self._redirect('/home', session=token)
+    
+    def _session_token(self):
+        jar = cookies.SimpleCookie(self.headers.get('Cookie', ''))
+        morsel = jar.get(SESSION_COOKIE)
+        return morsel.value if morsel else None
+    
+    def _current_user(self):
+        return self.server.sessions.get(self._session_token())
+    
+    def _send_login(self, username='', error=None):
+        error_html = f'<div class="error-message">{html.escape(error)}</div>' if error else ''
+        body = LOGIN_BODY.format(username=html.escape(username, quote=True), error=error_html)
+        self._send_page("登录", body)
+    
+    def _send_page(self, title, body, status=200):
+        content = PAGE_TEMPLATE.format(title=title, body=body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(content)
+    
+    def _redirect(self, location, session=None, clear_session=False):
+        self.send_response(303)
+        self.send_header('Location', location)
+        if session:
+            self.send_header('Set-Cookie', f"{SESSION_COOKIE}={session}; Path=/; HttpOnly")
+        elif clear_session:
+            self.send_header('Set-Cookie', f"{SESSION_COOKIE}=; Path=/; Max-Age=0")
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+    
+    def log_message(self, format, *args):
+        logger.debug("替身应用请求: " + format, *args)
+
+class StubAppServer:
+    """
+    在后台线程中运行的替身应用服务器
+    port 为 0 时由系统分配空闲端口，启动后通过 url 属性获取访问地址
+    """
+    
+    def __init__(self, host='127.0.0.1', port=0, users=None):
+        self.host = host
+        self.port = port
+        self.users = dict(users or DEFAULT_USERS)
+        self._httpd = None
+        self._thread = None
+    
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+    
+    def start(self):
+        """启动服务器，返回自身"""
+        if self._httpd is not None:
+            return self
+        self._httpd = ThreadingHTTPServer((self.host, self.port), StubAppHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.users = self.users
+        self._httpd.sessions = {}
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='stub-app', daemon=True)
+        self._thread.start()
+        logger.info("替身应用已启动: %s", self.url)
+        return self
+    
+    def stop(self):
+        """停止服务器"""
+        if self._httpd is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()
+        self._httpd = None
+        self._thread = None
+        logger.info("替身应用已停止")
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地替身应用")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8000, help="监听端口")
+    args = parser.parse_args(argv)
+    
+    server = StubAppServer(args.host, args.port).start()
+    print(f"替身应用运行中: {server.url}/login （账号 {', '.join(DEFAULT_USERS)}），按 Ctrl+C 停止")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -1,90 +1,322 @@
+import json
+import os
 import pytest
-import allure
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options as ChromeOptions
-from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from src.common.config import Config
+from src.common.config import Config, PROJECT_ROOT
+from src.common.driver_pool import DriverPool
+from src.common.tabs import create_pool
+from src.common.durations import DurationStore
+from src.common.grid import shutdown_grid_backend
+from src.common.impact import ImpactIndex, dependency_recorder
+from src.common.ordering import order_items, parse_strategies
+from src.common.lazy_import import lazy_import
 from src.common.logger import logger
-from src.common.utils import take_screenshot
+from src.common.perf import CommandRecorder
+from src.common.reporter import ResultReporter
+from src.common.session_cache import SessionCache, origin_of
+from src.common.concurrent_flow import run_flow
+from src.common.test_data import test_data
+from src.common.screenshot import shutdown_screenshot_writer
+from src.common.failure_capture import capture_failure_artifacts, failure_capture
+from src.common.exceptions import AutomationException
+from src.page_objects.home_page import HomePage
+from src.page_objects.login_page import LoginPage
+
+allure = lazy_import('allure')
 
 # 配置文件实例
 config = Config()
 
+# 用例耗时历史，并行执行时每个worker写入各自的文件，由 run_tests 合并
+duration_store = DurationStore(os.environ.get('WEBAUTO_DURATIONS_PATH'))
+
+# WebDriver 命令耗时记录
+command_recorder = CommandRecorder() if config.is_perf_enabled() else None
+
+# 内置流式结果报告
+result_reporter = ResultReporter(config=config) if config.is_native_report_enabled() else None
+
+# 登录会话缓存，同一进程内的用例共享
+session_cache = SessionCache(config)
+
+# 测试会话开始时创建并在后台预启动浏览器的浏览器池，由 driver_pool fixture 接管
+prewarmed_pool = None
+
 @pytest.fixture(scope="session")
 def browser_type():
     """返回浏览器类型"""
     return config.get_browser_type()
 
+@pytest.fixture(scope="session")
+def driver_pool(browser_type):
+    """浏览器池，整个测试会话内复用已启动的浏览器，优先使用会话开始时预启动的浏览器池"""
+    global prewarmed_pool
+    pool, prewarmed_pool = prewarmed_pool, None
+    if pool is None or pool.browser_type != browser_type:
+        if pool is not None:
+            pool.close()
+        pool = create_pool(config, browser_type)
+    yield pool
+    pool.close()
+
 @pytest.fixture(scope="function")
-def driver(browser_type):
-    """创建浏览器驱动，每个测试函数执行前创建，执行后关闭"""
-    logger.info(f"开始初始化 {browser_type} 浏览器驱动")
+def driver(request, driver_pool):
+    """从浏览器池获取浏览器驱动，测试结束后重置状态并归还"""
+    pooled = driver_pool.acquire()
+    if command_recorder:
+        command_recorder.instrument(pooled.driver)
+    yield pooled.driver
     
-    # 根据配置创建相应的浏览器驱动
-    if browser_type == 'chrome':
-        options = ChromeOptions()
-        if config.is_headless():
-            options.add_argument('--headless')
-            options.add_argument('--disable-gpu')
-        # 添加其他常用配置
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        driver = webdriver.Chrome(options=options)
-    elif browser_type == 'firefox':
-        options = FirefoxOptions()
-        if config.is_headless():
-            options.add_argument('--headless')
-        driver = webdriver.Firefox(options=options)
-    else:
-        raise ValueError(f"不支持的浏览器类型: {browser_type}")
+    # 把本用例的命令耗时统计添加到allure报告
+    if command_recorder:
+        report = command_recorder.test_report(request.node.nodeid)
+        if report['overall']['count']:
+            allure.attach(
+                json.dumps(report, ensure_ascii=False, indent=2),
+                name="WebDriver命令耗时",
+                attachment_type=allure.attachment_type.JSON
+            )
+    
+    # 测试结束后重置浏览器并归还到池中
+    driver_pool.release(pooled)
+
+@pytest.fixture(scope="function")
+def concurrent_flow(request):
+    """
+    返回 run(flow, sessions=None) 函数：在 sessions 个浏览器会话上并发执行 flow(driver, index)，
+    返回 FlowResult（每个会话的耗时和 p50/p95/p99 统计），统计结果同时添加到allure报告
+    浏览器在后台并行启动，用例结束时全部关闭
+    不受 execution_mode 影响，每个会话使用独立的浏览器：tab/context 模式下同一浏览器的命令串行执行，测不出并发耗时
+    """
+    pools = []
     
-    # 设置窗口大小
-    window_size = config.get_window_size()
-    width, height = map(int, window_size.split(','))
-    driver.set_window_size(width, height)
+    def run(flow, sessions=None):
+        sessions = sessions or config.get_concurrency_sessions()
+        pool = DriverPool(config, size=sessions)
+        pools.append(pool)
+        pool.prewarm(sessions)
+        pooled = []
+        try:
+            for _ in range(sessions):
+                pooled.append(pool.acquire())
+                if command_recorder:
+                    command_recorder.instrument(pooled[-1].driver)
+            result = run_flow(flow, [item.driver for item in pooled], config.get_concurrency_workers())
+        finally:
+            for item in pooled:
+                pool.release(item)
+        allure.attach(
+            result.to_json(),
+            name=f"并发流程耗时 {getattr(flow, '__name__', '')}",
+            attachment_type=allure.attachment_type.JSON
+        )
+        return result
     
-    logger.info(f"{browser_type} 浏览器驱动初始化完成")
-    yield driver
+    yield run
+    for pool in pools:
+        pool.close()
+
+@pytest.fixture(scope="function")
+def logged_in_driver(driver):
+    """
+    返回 login_as(username, password) 函数，调用后 driver 处于该用户的登录状态
+    第一次调用时通过 LoginPage 界面登录并缓存会话，之后直接注入缓存的 Cookie 和 Storage
+    """
+    def ui_login(username, password):
+        def login(driver):
+            login_page = LoginPage(driver)
+            login_page.login(username, password)
+            # 等待跳转完成后再判断和保存会话，避免缓存登录前的状态
+            if not login_page.wait_for_login_result():
+                raise AutomationException(f"用户 {username} 登录失败，仍停留在登录页")
+        return login
     
-    # 测试结束后关闭浏览器
-    logger.info(f"关闭 {browser_type} 浏览器驱动")
-    driver.quit()
+    def login_as(username, password):
+        origin = origin_of(config.get_base_url())
+        return session_cache.ensure_logged_in(
+            driver, origin, username, ui_login(username, password),
+            lambda driver: HomePage(driver).is_logged_in(), credential=password
+        )
+    return login_as
 
 @pytest.fixture(scope="function")
 def base_url():
     """返回基础URL"""
     return config.get_base_url()
 
+@pytest.fixture(scope="function")
+def case_data(request):
+    """data_stream 参数化的用例数据，运行用例时才读取对应的一条记录"""
+    data_file, sheet_name, position = request.param
+    return test_data.load_record(data_file, position, sheet_name)
+
+def pytest_addoption(parser):
+    """钩子函数：注册命令行参数"""
+    parser.addoption(
+        "--order", default=None,
+        help="用例排序策略，逗号组合: name, failed_first, longest_first, fixture_group, none（默认读取配置）"
+    )
+    parser.addoption(
+        "--run-slow", action="store_true", default=False,
+        help="执行标记为 slow 的用例（如启动多个浏览器的并发用例），默认跳过"
+    )
+
+def pytest_configure(config):
+    """钩子函数：注册自定义标记"""
+    config.addinivalue_line(
+        "markers",
+        "data_stream(data_file, sheet_name=0, id_field='case_id'): "
+        "从数据文件流式参数化用例，通过 case_data fixture 获取数据"
+    )
+    config.addinivalue_line("markers", "slow: 耗时较长的用例，只有指定 --run-slow 时才执行")
+
+def pytest_generate_tests(metafunc):
+    """
+    钩子函数：按 data_stream 标记流式参数化用例
+    收集阶段逐条读取数据文件，只保留用例ID和记录位置，不在内存中保存完整数据
+    """
+    marker = metafunc.definition.get_closest_marker("data_stream")
+    if marker is None or "case_data" not in metafunc.fixturenames:
+        return
+    data_file = marker.args[0]
+    sheet_name = marker.kwargs.get("sheet_name", 0)
+    id_field = marker.kwargs.get("id_field", "case_id")
+    
+    params, ids = [], []
+    for position, record in test_data.iter_records(data_file, sheet_name, with_position=True):
+        case_id = record.get(id_field) if isinstance(record, dict) else None
+        params.append((data_file, sheet_name, position))
+        ids.append(str(case_id if case_id is not None else len(ids)))
+    logger.info(f"从 {data_file} 流式参数化 {len(params)} 条用例: {metafunc.definition.nodeid}")
+    metafunc.parametrize("case_data", params, ids=ids, indirect=True)
+
+# 失败现场在allure报告中的名称和类型
+FAILURE_ARTIFACTS = (
+    ("screenshot", "失败截图", "PNG"),
+    ("dom", "页面DOM", "HTML"),
+    ("console_log", "浏览器控制台日志", "TEXT"),
+)
+
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_makereport(item, call):
     """
-    钩子函数：测试失败时自动截图并添加到allure报告
+    钩子函数：测试失败时采集一次失败现场（截图、页面DOM、控制台日志）并添加到allure报告
+    断言失败只登记采集请求，在这里统一处理，同一用例不会重复截图
     """
     outcome = yield
     rep = outcome.get_result()
     
-    # 只有当测试失败且有driver fixture时才截图
-    if rep.when == "call" and rep.failed:
-        for fixture_name in item.fixturenames:
-            if fixture_name == "driver":
-                driver = item.funcargs[fixture_name]
-                screenshot_path = take_screenshot(driver, "test_failure")
-                if screenshot_path:
-                    # 添加截图到allure报告
-                    with allure.step("测试失败截图"):
-                        allure.attach.file(
-                            screenshot_path,
-                            name="失败截图",
-                            attachment_type=allure.attachment_type.PNG
-                        )
-                break
-
-def pytest_collection_modifyitems(items):
+    if rep.when == "call":
+        request = failure_capture.pop(item.nodeid)
+        # 只有当测试失败且有浏览器时才采集
+        driver = request['driver'] if request else item.funcargs.get("driver")
+        if rep.failed and driver is not None:
+            # 文件在后台写入，写入完成后再添加到allure报告
+            artifacts = capture_failure_artifacts(driver, "test_failure", config)
+            if artifacts:
+                with allure.step("测试失败现场"):
+                    for name, title, attachment_type in FAILURE_ARTIFACTS:
+                        if name in artifacts:
+                            rep.user_properties.append((name, artifacts[name]))
+                            allure.attach.file(
+                                artifacts[name],
+                                name=title,
+                                attachment_type=getattr(allure.attachment_type, attachment_type)
+                            )
+    elif rep.when == "teardown":
+        # 丢弃 setup/teardown 阶段登记的采集请求
+        failure_capture.pop(item.nodeid)
+
+def pytest_collection_modifyitems(session, items):
     """
     钩子函数：修改测试用例集合
-    可以在这里实现用例排序、筛选等功能
+    并行执行时筛选分配给当前worker的用例，再按历史耗时和结果排序
     """
     logger.info(f"共收集到 {len(items)} 个测试用例")
-    # 示例：按用例名称排序
-    items.sort(key=lambda x: x.name)
-    
\ No newline at end of file
+    
+    # 并行执行时只保留分配给当前worker的用例
+    shard_file = os.environ.get('WEBAUTO_SHARD_FILE')
+    if shard_file:
+        with open(shard_file, 'r', encoding='utf-8') as f:
+            shard = set(line.strip() for line in f if line.strip())
+        selected = [item for item in items if item.nodeid in shard]
+        deselected = [item for item in items if item.nodeid not in shard]
+        if deselected:
+            session.config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+        logger.info(f"worker {os.environ.get('WEBAUTO_WORKER_ID')} 分配到 {len(items)} 个测试用例")
+    
+    # 未指定 --run-slow 时跳过耗时较长的用例
+    if not session.config.getoption("--run-slow"):
+        skip_slow = pytest.mark.skip(reason="耗时较长的用例，需要 --run-slow 才执行")
+        for item in items:
+            if item.get_closest_marker("slow"):
+                item.add_marker(skip_slow)
+    
+    # 没有用例使用浏览器时关闭预启动的浏览器
+    global prewarmed_pool
+    if prewarmed_pool is not None and not any("driver" in item.fixturenames for item in items):
+        logger.info("没有用例使用浏览器，关闭预启动的浏览器")
+        prewarmed_pool.close()
+        prewarmed_pool = None
+    
+    # 按 --order 参数或配置中的策略排序
+    order = session.config.getoption("--order") or config.get_test_order()
+    try:
+        strategies = parse_strategies(order)
+    except ValueError as e:
+        raise pytest.UsageError(str(e))
+    order_items(items, strategies, duration_store)
+
+def pytest_sessionstart(session):
+    """
+    钩子函数：在后台预启动浏览器，与用例收集并行；
+    开始新的内置结果报告，并行执行时由 run_tests 在启动worker前清空
+    """
+    global prewarmed_pool
+    if session.config.option.collectonly:
+        return
+    if config.get_prewarm_count():
+        prewarmed_pool = create_pool(config)
+        prewarmed_pool.prewarm()
+    if result_reporter and not os.environ.get('WEBAUTO_WORKER_ID'):
+        result_reporter.reset()
+
+def pytest_runtest_logreport(report):
+    """钩子函数：累计每个用例 setup/call/teardown 的耗时和结果，登记执行过的用例，并写入内置结果报告"""
+    duration_store.record_phase(report.nodeid, report.when, report.duration, report.outcome)
+    if report.when == 'setup':
+        dependency_recorder.touch(report.nodeid)
+    if result_reporter:
+        result_reporter.log_report(report)
+
+def pytest_sessionfinish(session):
+    """
+    钩子函数：测试会话结束时保存耗时历史、依赖索引和命令耗时报告，等待截图写入完成，
+    关闭远程节点的连接池，并输出队列中积压的日志
+    """
+    duration_store.save()
+    # 关闭没有被使用的预启动浏览器
+    if prewarmed_pool is not None:
+        prewarmed_pool.close()
+    # 更新用例依赖索引，并行执行时写入各worker的文件，由 run_tests 合并
+    if dependency_recorder.dependencies:
+        ImpactIndex(os.environ.get('WEBAUTO_IMPACT_PATH')).update_runtime(dependency_recorder).save()
+    if command_recorder:
+        worker_id = os.environ.get('WEBAUTO_WORKER_ID')
+        file_name = f"webdriver_commands_worker{worker_id}.json" if worker_id else "webdriver_commands.json"
+        command_recorder.dump_json(os.path.join(PROJECT_ROOT, config.get_perf_report_dir(), file_name))
+    shutdown_screenshot_writer()
+    test_data.close_record_readers()
+    # 浏览器池在 session 级 fixture 结束时已关闭，此时不再有远程会话使用连接池
+    shutdown_grid_backend()
+    logger.flush()
+
+def pytest_terminal_summary(terminalreporter):
+    """钩子函数：在终端输出最慢的定位器和页面"""
+    if not command_recorder or not config.get_perf_top():
+        return
+    lines = command_recorder.format_summary(config.get_perf_top())
+    if lines:
+        terminalreporter.write_sep("=", "WebDriver命令耗时")
+        for line in lines:
+            terminalreporter.write_line(line)
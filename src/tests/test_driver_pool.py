@@ -0,0 +1,56 @@
+import pytest
+from src.common import driver_pool
+from src.common.driver_pool import DriverPool
+from src.common.exceptions import BrowserStartupException
+
+class ConnectionLost(Exception):
+    """模拟浏览器驱动进程退出后 urllib3 抛出的连接错误"""
+
+class FakeDriver:
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.quit_count = 0
+    
+    def execute(self, driver_command, params=None):
+        return {'value': None}
+    
+    @property
+    def window_handles(self):
+        if not self.alive:
+            raise ConnectionLost("Max retries exceeded with url: /session/window/handles")
+        return ['main']
+    
+    @property
+    def current_url(self):
+        return 'about:blank'
+    
+    def quit(self):
+        self.quit_count += 1
+
+@pytest.fixture
+def pool(monkeypatch):
+    drivers = []
+    
+    def fake_create_driver(config, browser_type=None):
+        drivers.append(FakeDriver())
+        return drivers[-1]
+    monkeypatch.setattr(driver_pool, 'create_driver', fake_create_driver)
+    pool = DriverPool(size=1, max_uses=0)
+    pool.startup_timeout = 0.2
+    pool.created = drivers
+    yield pool
+    pool.close()
+
+def test_release_recycles_browser_when_reset_fails_with_connection_error(pool):
+    pooled = pool.acquire()
+    pooled.driver.alive = False
+    pool.release(pooled)
+    assert pooled.driver.quit_count == 1
+    assert pool._total == 0
+    # 名额已释放，再次获取时启动新的浏览器
+    assert pool.acquire().driver is pool.created[1]
+
+def test_acquire_times_out_when_pool_is_full(pool):
+    pool.acquire()
+    with pytest.raises(BrowserStartupException):
+        pool.acquire()
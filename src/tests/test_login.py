@@ -2,12 +2,13 @@ import allure
 import pytest
 from src.page_objects.login_page import LoginPage
 from src.page_objects.home_page import HomePage
+from src.page_objects.async_page import AsyncPage
 from src.common.test_data import test_data
 from src.common.assertions import assertions
 
 @allure.feature("登录功能")
 class TestLogin:
-    
+
     @allure.story("使用正确的用户名和密码登录")
     @allure.title("成功登录系统")
     def test_login_success(self, driver, base_url):
@@ -18,16 +19,17 @@ class TestLogin:
         login_page = LoginPage(driver)
         login_page.login(test_case["username"], test_case["password"])
         
-        # 验证登录结果
-        home_page = HomePage(driver)
-        assertions.assert_url_contains(driver, "/home", "登录后应跳转到首页", driver)
-        assertions.assert_true(home_page.is_user_menu_displayed(), "用户菜单应显示", driver)
-        assertions.assert_equal(
-            home_page.get_username(), 
-            test_case["expected_username"], 
-            "用户名显示不正确", 
-            driver
-        )
+        # 验证登录结果，各项检查的失败汇总后一起报告
+        state = HomePage(driver).get_user_menu_state()
+        with assertions.soft(driver):
+            assertions.assert_snapshot_url_contains(state, "/home", "登录后应跳转到首页")
+            assertions.assert_element_state(state, HomePage.USER_MENU, "用户菜单应显示", displayed=True)
+            assertions.assert_element_state(
+                state, 
+                HomePage.USERNAME_LABEL, 
+                "用户名显示不正确", 
+                text=test_case["expected_username"]
+            )
     
     @allure.story("使用错误的密码登录")
     @allure.title("登录失败并显示错误信息")
@@ -40,16 +42,13 @@ class TestLogin:
         login_page.login(test_case["username"], test_case["password"])
         
         # 验证错误信息
-        assertions.assert_true(
-            login_page.is_error_message_displayed(), 
-            "错误提示应显示", 
-            driver
-        )
-        assertions.assert_contains(
-            login_page.get_error_message(), 
-            test_case["expected_message"], 
-            "错误提示信息不正确", 
-            driver
+        assertions.assert_element_state(
+            login_page.get_error_state(), 
+            LoginPage.ERROR_MESSAGE, 
+            "错误提示不正确", 
+            driver, 
+            displayed=True, 
+            text_contains=test_case["expected_message"]
         )
     
     @allure.story("使用空用户名登录")
@@ -58,6 +57,7 @@ class TestLogin:
         # 执行登录操作
         login_page = LoginPage(driver)
         login_page.open()
+        login_page.verify_page()
         login_page.enter_username("")
         login_page.enter_password("any_password")
         login_page.click_login_button()
@@ -75,6 +75,19 @@ class TestLogin:
             driver
         )
     
+    @pytest.mark.slow
+    @allure.story("多个用户同时登录")
+    @allure.title("并发登录全部成功")
+    def test_concurrent_login(self, concurrent_flow):
+        test_case = test_data.get_test_case_data("login_cases.xlsx", "login_001")
+        
+        async def login(driver, index):
+            await AsyncPage(LoginPage(driver)).login(test_case["username"], test_case["password"])
+            assert await AsyncPage(HomePage(driver)).is_user_menu_displayed(), f"会话 {index} 登录后未显示用户菜单"
+        
+        # 在多个会话上同时登录，任一会话失败时列出所有失败的会话
+        concurrent_flow(login, sessions=3).raise_for_errors()
+    
     @pytest.mark.skip(reason="暂未实现忘记密码功能")
     @allure.story("忘记密码功能")
     @allure.title("点击忘记密码链接跳转到密码重置页面")
@@ -89,4 +102,3 @@ class TestLogin:
             "点击忘记密码后应跳转到密码重置页面", 
             driver
         )
-    
\ No newline at end of file
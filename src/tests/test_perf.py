@@ -0,0 +1,27 @@
+import pytest
+from src.common.perf import percentile, summarize
+
+@pytest.mark.parametrize("count, percent, expected", [
+    (100, 99, 99),
+    (100, 100, 100),
+    (100, 50, 50),
+    (20, 95, 19),
+    (10, 50, 5),
+    (10, 90, 9),
+    (10, 91, 10),
+    (1, 50, 1),
+    (5, 0, 1),
+])
+def test_percentile_nearest_rank(count, percent, expected):
+    assert percentile(list(range(1, count + 1)), percent) == expected
+
+def test_percentile_empty():
+    assert percentile([], 95) == 0.0
+
+def test_summarize():
+    summary = summarize([3.0, 1.0, 2.0, 30.0])
+    assert summary['count'] == 4
+    assert summary['total_ms'] == 36.0
+    assert (summary['p50_ms'], summary['p95_ms'], summary['max_ms']) == (2.0, 30.0, 30.0)
+    assert summary['histogram']['<=5ms'] == 3
+    assert summary['histogram']['<=50ms'] == 1
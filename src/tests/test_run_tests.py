@@ -0,0 +1,44 @@
+import os
+import run_tests
+
+SAMPLE_TESTS = """
+import pytest
+
+class TestSample:
+    def test_a(self):
+        pass
+
+@pytest.mark.parametrize("x", [1, 2])
+def test_b(x):
+    pass
+"""
+
+def write_sample(tmp_path):
+    (tmp_path / "test_sample.py").write_text(SAMPLE_TESTS, encoding="utf-8")
+    return str(tmp_path)
+
+def test_collect_node_ids_with_default_args(tmp_path):
+    # 默认参数带 -v，收集时仍应得到用例ID
+    pytest_args = [write_sample(tmp_path), *run_tests.DEFAULT_PYTEST_ARGS[1:]]
+    node_ids = run_tests.collect_node_ids(pytest_args)
+    assert [os.path.basename(node_id) for node_id in node_ids] == [
+        "test_sample.py::TestSample::test_a",
+        "test_sample.py::test_b[1]",
+        "test_sample.py::test_b[2]",
+    ]
+
+def test_collect_node_ids_ignores_verbosity_args(tmp_path):
+    path = write_sample(tmp_path)
+    for args in (["-vv"], ["-qq"], ["--verbose", "-q"], ["--verbosity=2"]):
+        assert len(run_tests.collect_node_ids([path, *args])) == 3, args
+
+def test_collect_node_ids_returns_none_on_error(tmp_path):
+    (tmp_path / "test_broken.py").write_text("import missing_module_for_test\n", encoding="utf-8")
+    assert run_tests.collect_node_ids([str(tmp_path)]) is None
+
+def test_select_affected_runs_all_when_collection_fails(monkeypatch):
+    # 收集失败时应执行全部用例，而不是当作没有受影响的用例
+    monkeypatch.setattr(run_tests, "changed_files", lambda ref: ["src/page_objects/login_page.py"])
+    for node_ids in (None, []):
+        monkeypatch.setattr(run_tests, "collect_node_ids", lambda pytest_args: node_ids)
+        assert run_tests.select_affected(["src/tests"], "HEAD~1") is None
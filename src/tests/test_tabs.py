@@ -0,0 +1,118 @@
+from selenium.webdriver.remote.command import Command
+from src.common.tabs import TabLock, make_tab_driver
+
+class FakeDriver:
+    """记录收到的命令，所有标签页驱动共用同一个命令列表"""
+    
+    def __init__(self, handles):
+        self.handles = handles
+        self.commands = []
+    
+    def execute(self, driver_command, params=None):
+        self.commands.append((driver_command, params))
+        if driver_command == Command.W3C_GET_WINDOW_HANDLES:
+            return {'value': list(self.handles)}
+        return {'value': None}
+
+def open_tabs(lock, *handles):
+    base = FakeDriver(['anchor', *handles])
+    with lock:
+        lock.current = 'anchor'
+        lock.claim('anchor')
+        for handle in handles:
+            lock.claim(handle)
+    return base, [make_tab_driver(base, handle, lock) for handle in handles]
+
+def test_tab_lock_tracks_current_and_claimed():
+    lock = TabLock()
+    with lock:
+        lock.current = 'w1'
+        lock.claim('w1')
+        lock.claim('w2')
+        lock.unclaim(['w1'])
+    assert lock.current == 'w1'
+    assert lock.claimed == ['w2']
+
+def test_file_tab_lock_shares_state(tmp_path):
+    path = str(tmp_path / 'tabs.lock')
+    first, second = TabLock(path), TabLock(path)
+    try:
+        with first:
+            first.current = 'w1'
+            first.claim('w1')
+        with second:
+            assert second.current == 'w1'
+            assert second.claimed == ['w1']
+            second.unclaim(['w1'])
+            second.current = None
+        with first:
+            assert first.current is None
+            assert first.claimed == []
+    finally:
+        first.close()
+        second.close()
+
+def test_file_tab_lock_writes_state_when_outermost_block_exits(tmp_path):
+    path = str(tmp_path / 'tabs.lock')
+    lock, other = TabLock(path), TabLock(path)
+    try:
+        with lock:
+            with lock:
+                lock.claim('w1')
+            # 嵌套的 with 退出时不写入，也不释放文件锁
+            assert open(path, encoding='utf-8').read() == ''
+        with other:
+            assert other.claimed == ['w1']
+    finally:
+        lock.close()
+        other.close()
+
+def test_tab_driver_switches_to_its_window():
+    lock = TabLock()
+    base, (first, second) = open_tabs(lock, 'w1', 'w2')
+    first.execute(Command.GET_TITLE)
+    second.execute(Command.GET_TITLE)
+    first.execute(Command.GET_TITLE)
+    assert base.commands == [
+        (Command.SWITCH_TO_WINDOW, {'handle': 'w1'}),
+        (Command.GET_TITLE, None),
+        (Command.SWITCH_TO_WINDOW, {'handle': 'w2'}),
+        (Command.GET_TITLE, None),
+        (Command.SWITCH_TO_WINDOW, {'handle': 'w1'}),
+        (Command.GET_TITLE, None),
+    ]
+    assert lock.current == 'w1'
+
+def test_tab_driver_restores_frames_after_switching_back():
+    lock = TabLock()
+    base, (first, second) = open_tabs(lock, 'w1', 'w2')
+    first.execute(Command.SWITCH_TO_FRAME, {'id': 0})
+    first.execute(Command.SWITCH_TO_FRAME, {'id': 1})
+    first.execute(Command.SWITCH_TO_PARENT_FRAME)
+    second.execute(Command.GET_TITLE)
+    del base.commands[:]
+    first.execute(Command.GET_TITLE)
+    assert base.commands == [
+        (Command.SWITCH_TO_WINDOW, {'handle': 'w1'}),
+        (Command.SWITCH_TO_FRAME, {'id': 0}),
+        (Command.GET_TITLE, None),
+    ]
+
+def test_tab_driver_forgets_frames_after_default_content_or_navigation():
+    lock = TabLock()
+    base, (first, second) = open_tabs(lock, 'w1', 'w2')
+    for reset in ((Command.SWITCH_TO_FRAME, {'id': None}), (Command.GET, {'url': 'about:blank'})):
+        first.execute(Command.SWITCH_TO_FRAME, {'id': 0})
+        first.execute(*reset)
+        second.execute(Command.GET_TITLE)
+        del base.commands[:]
+        first.execute(Command.GET_TITLE)
+        assert base.commands == [
+            (Command.SWITCH_TO_WINDOW, {'handle': 'w1'}),
+            (Command.GET_TITLE, None),
+        ]
+
+def test_tab_driver_hides_windows_of_other_tabs():
+    lock = TabLock()
+    _, (first, _) = open_tabs(lock, 'w1', 'w2')
+    assert first.execute(Command.W3C_GET_WINDOW_HANDLES)['value'] == ['w1']